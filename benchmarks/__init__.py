@@ -0,0 +1,3 @@
+"""
+בנצ'מרקים לנתיבים החמים של הבוט
+"""
@@ -0,0 +1,72 @@
+"""
+מחולל קורפוס סינתטי של מחשבות בעברית לבנצ'מרקים
+משתמש באוצר המילים של config.CATEGORIES ו-config.TOPICS, כך שהתוצאות
+משקפות את המילון האמיתי ושחזוריות לפי seed.
+"""
+
+import random
+from typing import Iterator, List
+
+from config import CATEGORIES, TOPICS
+
+# מילות מילוי ניטרליות (לא במילון) - משמשות לשליטה בצפיפות הטריגרים
+FILLER_WORDS = [
+    "היום", "אני", "הוא", "היא", "אנחנו", "עם", "על", "של", "את", "גם",
+    "בבוקר", "בערב", "אחרי", "לפני", "קצת", "הרבה", "שוב", "עוד", "כבר",
+    "הזה", "הזאת", "שלי", "שלנו", "בבית", "בדרך", "מחר", "אתמול", "עכשיו",
+    "פשוט", "באמת", "נראה", "יודע", "חושב", "אמר", "אמרה", "כתבתי", "ראיתי",
+    "שמעתי", "דיברנו", "בסוף", "בהתחלה", "באמצע", "ליד", "בתוך", "מאוד",
+]
+
+
+def lexicon_vocabulary() -> List[str]:
+    """כל הטריגרים ומילות המפתח מ-config (כולל ביטויים מרובי מילים)"""
+    vocabulary = []
+    for data in CATEGORIES.values():
+        vocabulary.extend(data["triggers"])
+    for data in TOPICS.values():
+        vocabulary.extend(data["keywords"])
+    return vocabulary
+
+
+def iter_corpus(
+    size: int,
+    seed: int = 42,
+    mean_words: float = 8.0,
+    max_words: int = 60,
+    trigger_density: float = 0.2
+) -> Iterator[str]:
+    """
+    הפקת מחשבות סינתטיות
+
+    Args:
+        size: מספר המחשבות
+        seed: seed לשחזוריות
+        mean_words: אורך ממוצע (במילים) - התפלגות גיאומטרית עם זנב ארוך
+        max_words: אורך מקסימלי (במילים)
+        trigger_density: הסתברות שכל מילה תהיה ביטוי מהמילון
+
+    Yields:
+        טקסט של מחשבה
+    """
+    rng = random.Random(seed)
+    vocabulary = lexicon_vocabulary()
+    stop_probability = 1.0 / max(mean_words, 1.0)
+
+    for _ in range(size):
+        words = []
+        while len(words) < max_words:
+            if rng.random() < trigger_density:
+                words.append(rng.choice(vocabulary))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+            if rng.random() < stop_probability:
+                break
+        yield " ".join(words)
+
+
+def generate_corpus(size: int, **kwargs) -> List[str]:
+    """
+    קורפוס סינתטי כרשימה (ראה iter_corpus לפרמטרים)
+    """
+    return list(iter_corpus(size, **kwargs))
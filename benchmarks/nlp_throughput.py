@@ -0,0 +1,140 @@
+"""
+בנצ'מרק תפוקה של מנתח ה-NLP
+
+מודד את NLPAnalyzer.analyze, batch_analyze ו-format_analysis_summary
+(הודעות לשנייה, מיקרו-שניות להודעה ושיא זיכרון) על קורפוס סינתטי,
+וכותב את התוצאות ל-JSON להשוואה בין ריצות.
+
+שימוש:
+    python -m benchmarks.nlp_throughput --sizes 1000 10000 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import generate_corpus
+from nlp_analyzer import NLPAnalyzer, _HAS_NUMPY
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _measure(func: Callable[[], object], count: int, trace_memory: bool) -> Dict:
+    """
+    מדידת זמן (ושיא זיכרון בריצה נפרדת, כדי ש-tracemalloc לא יעוות את הזמן)
+    """
+    started_at = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started_at
+
+    result = {
+        "seconds": round(seconds, 4),
+        "messages_per_sec": round(count / seconds, 1) if seconds else None,
+        "us_per_message": round(seconds * 1_000_000 / count, 3) if count else None,
+        "peak_memory_bytes": None,
+    }
+
+    if trace_memory:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_bytes"] = peak
+
+    return result
+
+
+def run_size(size: int, args: argparse.Namespace) -> List[Dict]:
+    """הרצת כל הבנצ'מרקים על קורפוס בגודל נתון"""
+    corpus = generate_corpus(
+        size,
+        seed=args.seed,
+        mean_words=args.mean_words,
+        max_words=args.max_words,
+        trigger_density=args.trigger_density,
+    )
+    # ללא מטמון ועם artifact מבוטל - מודדים את הנתיב החם עצמו
+    analyzer = NLPAnalyzer(cache_size=args.cache_size, artifact_path=None)
+
+    def run_analyze():
+        for text in corpus:
+            analyzer.analyze(text)
+
+    def run_batch():
+        for start in range(0, size, args.batch_size):
+            analyzer.batch_analyze(corpus[start:start + args.batch_size])
+
+    analyses = [analyzer.analyze(text) for text in corpus]
+
+    def run_format():
+        for analysis, text in zip(analyses, corpus):
+            analyzer.format_analysis_summary(analysis, text)
+
+    results = []
+    for name, func in (
+        ("analyze", run_analyze),
+        ("batch_analyze", run_batch),
+        ("format_analysis_summary", run_format),
+    ):
+        analyzer.clear_cache()
+        measurement = _measure(func, size, trace_memory=not args.no_memory)
+        results.append({"benchmark": name, "size": size, **measurement})
+        print(
+            f"{name:<26} n={size:<9} {measurement['messages_per_sec']:>12} msg/s "
+            f"{measurement['us_per_message']:>10} µs/msg",
+            file=sys.stderr,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="בנצ'מרק תפוקה של מנתח ה-NLP")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mean-words", type=float, default=8.0)
+    parser.add_argument("--max-words", type=int, default=60)
+    parser.add_argument("--trigger-density", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--cache-size", type=int, default=0, help="0 = בלי מטמון")
+    parser.add_argument("--no-memory", action="store_true", help="דילוג על מדידת זיכרון")
+    parser.add_argument("--output", default="-", help="קובץ JSON (ברירת מחדל: stdout)")
+    args = parser.parse_args()
+
+    # הלוג של המנתח (INFO לכל ניתוח) מעוות את המדידה
+    logging.disable(logging.INFO)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": _HAS_NUMPY,
+            "lexicon_fingerprint": NLPAnalyzer(cache_size=0, artifact_path=None).lexicon_fingerprint,
+            "params": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "sizes")
+            },
+        },
+        "results": results,
+    }
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+
+
+if __name__ == '__main__':
+    main()
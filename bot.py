@@ -3,7 +3,7 @@
 מכיל את כל ה-handlers והפקודות
 """
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -18,10 +18,14 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+import asyncio
 import logging
+import time
 
 from config import (
     TELEGRAM_BOT_TOKEN,
+    ADMIN_USER_ID,
     MESSAGES,
     BOT_STATES,
     CATEGORIES,
@@ -34,9 +38,21 @@ from config import (
     WEEKLY_REVIEW_SUNDAY_HOUR,
     WEEKLY_REVIEW_SUNDAY_MINUTE,
     WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS,
+    WEEKLY_REVIEW_PAGE_SIZE,
+    WEEKLY_REVIEW_ARCHIVE_FLUSH_THRESHOLD,
+    WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS,
+    WEEKLY_REVIEW_SESSION_IDLE_MINUTES,
+    KEYWORD_STATS_FLUSH_SECONDS,
+    USER_STATS_RECONCILE_MINUTES,
+    SIMILARITY_MAX_RESULTS,
+    EXPORT_FORMATS,
+    EXPORT_PROGRESS_INTERVAL_SECONDS,
 )
-from database import db
+from database import db, days_ago
+from exporter import export_thoughts
+from fanout import dispatcher as fanout_dispatcher
 from nlp_analyzer import nlp
+from nlp_service import analysis_service
 from activity_reporter import create_reporter
 
 reporter = create_reporter(
@@ -52,6 +68,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# מספר מחשבות בכל עמוד של /today, /week, /archive
+THOUGHT_LIST_PAGE_SIZE = 10
+
+# הגדרות הרשימות המעומדות (ה-kind נשמר ב-callback_data של כפתור "לעמוד הבא")
+THOUGHT_LIST_VIEWS = {
+    "today": {
+        "days_back": 1,
+        "status": None,
+        "header": "📅 *היום רשמת {total} מחשבות:*",
+        "empty": "לא נרשמו מחשבות היום. 🤔",
+        "counted": True,
+        "item_buttons": True,
+        "bulk_prefix": "bulk_today",
+    },
+    "week": {
+        "days_back": 7,
+        "status": None,
+        "header": "📆 *השבוע רשמת {total} מחשבות:*",
+        "empty": "לא נרשמו מחשבות השבוע. 🤔",
+        "counted": True,
+        "item_buttons": True,
+        "bulk_prefix": "bulk_week",
+    },
+    "archive": {
+        "days_back": None,
+        "status": THOUGHT_STATUS["ARCHIVED"],
+        "header": "📦 *המחשבות בארכיון:*",
+        "empty": "אין פריטים בארכיון כרגע.",
+        "counted": False,
+        "item_buttons": False,
+        "bulk_prefix": None,
+    },
+}
+
 
 class BrainDumpBot:
     """
@@ -63,12 +113,14 @@ class BrainDumpBot:
         self.application = None
         # מילון למעקב אחר מצב המשתמשים
         self.user_states = {}
-        # אחסון זמני של מחשבות במצב dump
-        self.dump_sessions = {}
+        # סשנים של מצב dump (טקסטים + ניתוחים שמחושבים ברקע)
+        self.dump_sessions: dict[int, dict] = {}
         # סשנים עבור ארכוב מרובה (בחירה מרובה)
         self.bulk_archive_sessions = {}
         # סשן סקירה שבועית לכל משתמש
         self.review_sessions: dict[int, dict] = {}
+        # משימות ייצוא שרצות ברקע (אחת לכל משתמש)
+        self.export_tasks: dict[int, asyncio.Task] = {}
         self.scheduler: AsyncIOScheduler | None = None
     
     async def setup(self, use_updater: bool = False):
@@ -137,6 +189,9 @@ class BrainDumpBot:
         app.add_handler(CommandHandler("export", self.export_command))
         app.add_handler(CommandHandler("clear", self.clear_command))
         
+        # פקודות מנהל
+        app.add_handler(CommandHandler("reload_lexicon", self.reload_lexicon_command))
+        
         # Callback queries (כפתורים)
         app.add_handler(CallbackQueryHandler(self.button_callback))
         
@@ -150,9 +205,6 @@ class BrainDumpBot:
 
     def start_schedulers(self):
         """הפעלת מתזמנים (APScheduler) לטריגרים אוטומטיים"""
-        if not WEEKLY_REVIEW_ENABLED:
-            logger.info("⏸️ Weekly review scheduling disabled via config")
-            return
         if self.scheduler:
             # למניעת אתחול כפול
             if not self.scheduler.running:
@@ -162,76 +214,106 @@ class BrainDumpBot:
         tz = ZoneInfo(TIMEZONE)
         self.scheduler = AsyncIOScheduler(timezone=tz)
 
-        # שישי 16:00
-        fri_trigger = CronTrigger(day_of_week='fri', hour=WEEKLY_REVIEW_FRIDAY_HOUR, minute=WEEKLY_REVIEW_FRIDAY_MINUTE, timezone=tz)
-        self.scheduler.add_job(self._scheduled_weekly_review_prompt, fri_trigger, id="weekly_review_fri")
+        # שמירה תקופתית של מוני מילות המפתח
+        self.scheduler.add_job(
+            db.persist_keyword_stats,
+            IntervalTrigger(seconds=KEYWORD_STATS_FLUSH_SECONDS, timezone=tz),
+            id="keyword_stats_flush",
+            max_instances=1,
+            coalesce=True,
+        )
+
+        # תיקון סטיות במוני המחשבות (לא בעלייה - ריצה ראשונה אחרי מרווח מלא)
+        self.scheduler.add_job(
+            db.reconcile_user_stats,
+            IntervalTrigger(minutes=USER_STATS_RECONCILE_MINUTES, timezone=tz),
+            id="user_stats_reconcile",
+            max_instances=1,
+            coalesce=True,
+        )
+
+        # כתיבת החלטות סקירה שממתינות וסגירת סשנים נטושים
+        self.scheduler.add_job(
+            self._sweep_review_sessions,
+            IntervalTrigger(seconds=WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS, timezone=tz),
+            id="review_sessions_sweep",
+            max_instances=1,
+            coalesce=True,
+        )
+
+        if WEEKLY_REVIEW_ENABLED:
+            # שישי 16:00
+            fri_trigger = CronTrigger(day_of_week='fri', hour=WEEKLY_REVIEW_FRIDAY_HOUR, minute=WEEKLY_REVIEW_FRIDAY_MINUTE, timezone=tz)
+            self.scheduler.add_job(self._scheduled_weekly_review_prompt, fri_trigger, id="weekly_review_fri")
 
-        # ראשון 08:00
-        sun_trigger = CronTrigger(day_of_week='sun', hour=WEEKLY_REVIEW_SUNDAY_HOUR, minute=WEEKLY_REVIEW_SUNDAY_MINUTE, timezone=tz)
-        self.scheduler.add_job(self._scheduled_weekly_review_prompt, sun_trigger, id="weekly_review_sun")
+            # ראשון 08:00
+            sun_trigger = CronTrigger(day_of_week='sun', hour=WEEKLY_REVIEW_SUNDAY_HOUR, minute=WEEKLY_REVIEW_SUNDAY_MINUTE, timezone=tz)
+            self.scheduler.add_job(self._scheduled_weekly_review_prompt, sun_trigger, id="weekly_review_sun")
+        else:
+            logger.info("⏸️ Weekly review scheduling disabled via config")
 
         self.scheduler.start()
-        logger.info("⏰ APScheduler התחיל - סקירה שבועית תישלח אוטומטית")
+        logger.info("⏰ APScheduler התחיל")
+
+    async def shutdown(self):
+        """עצירת מתזמנים, שמירת כתיבות ממתינות וסגירת ה-pool של ה-NLP לפני כיבוי"""
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        self.scheduler = None
+
+        for task in list(self.export_tasks.values()):
+            task.cancel()
+
+        for user_id in list(self.review_sessions):
+            await self._drop_review_session(user_id)
+
+        await db.flush_pending_writes()
+        # סגירת ה-pool של ה-NLP (ב-thread - ההמתנה לניתוחים שרצים חוסמת)
+        await asyncio.to_thread(analysis_service.shutdown)
+        await db.close()
 
     async def _scheduled_weekly_review_prompt(self):
         """שליחת הודעת פתיחה של סקירה שבועית לכל המשתמשים הפעילים"""
+        keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("בוא נתחיל! 🚀", callback_data="review_start")],
+            [InlineKeyboardButton("אולי מאוחר יותר ⏰", callback_data="review_later")],
+        ])
+
+        async def send_prompt(candidate: dict):
+            uid = candidate["user_id"]
+            # סקירה חדשה מתחילה מההתחלה - הסשן ייבנה בלחיצה על "בוא נתחיל"
+            await self._drop_review_session(uid)
+            text = (
+                "🗓️ *שבוע חדש מתחיל!*\n\n"
+                f"השבוע שעבר רשמת *{candidate['recent_count']}* מחשבות.\n"
+                "בוא/י נעבור עליהן ונבחר מה להשאיר ומה לארכב."
+            )
+            await self.application.bot.send_message(
+                chat_id=uid,
+                text=text,
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=keyboard,
+            )
+
+        async def mark_prompted(candidates: list[dict]):
+            await db.set_weekly_review_prompted_many([candidate["user_id"] for candidate in candidates])
+
         try:
-            user_ids = await db.list_all_user_ids()
+            # סינון ה-cooldown וספירת מחשבות השבוע נעשים בשרת; השליחה במקביל ובקצב המותר
+            summary = await fanout_dispatcher.run(
+                "weekly_review",
+                db.iter_weekly_review_candidates(WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS),
+                chat_id_of=lambda candidate: candidate["user_id"],
+                send=send_prompt,
+                on_chunk=mark_prompted,
+            )
         except Exception:
             logger.exception("❌ כשל בשליפת משתמשים לטריגר סקירה")
             return
 
-        if not user_ids:
+        if not summary["sent"] and not summary["failed"]:
             logger.info("ℹ️ אין משתמשים לשלוח להם סקירה שבועית")
-            return
 
-        tz = ZoneInfo(TIMEZONE)
-        now = datetime.now(tz=tz)
-        sent = 0
-        for uid in user_ids:
-            try:
-                # מניעת כפילויות: אם נשלחה תזכורת לאחרונה (חלון cooldown), דלג
-                user = await self._get_user_doc(uid)
-                last_prompt = None
-                if user:
-                    last_prompt = (((user.get("settings") or {}).get("weekly_review") or {}).get("last_prompted_at"))
-                if last_prompt:
-                    if last_prompt.tzinfo is None:
-                        last_prompt = last_prompt.replace(tzinfo=ZoneInfo("UTC"))
-                    hours_since = (now - last_prompt.astimezone(tz)).total_seconds() / 3600.0
-                    if hours_since < WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS:
-                        continue
-
-                items = await self._ensure_review_session(uid, refresh=True)
-                items_count = len(items)
-
-                keyboard = [
-                    [InlineKeyboardButton("בוא נתחיל! 🚀", callback_data="review_start")],
-                    [InlineKeyboardButton("אולי מאוחר יותר ⏰", callback_data="review_later")],
-                ]
-                text = (
-                    "🗓️ *שבוע חדש מתחיל!*\n\n"
-                    f"השבוע שעבר רשמת *{items_count}* מחשבות.\n"
-                    "בוא/י נעבור עליהן ונבחר מה להשאיר ומה לארכב."
-                )
-                await self.application.bot.send_message(
-                    chat_id=uid,
-                    text=text,
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                )
-                await db.set_weekly_review_prompted(uid)
-                sent += 1
-            except Exception:
-                logger.exception("❌ כשל בשליחת תזכורת סקירה למשתמש %s", uid)
-        logger.info("📣 נשלחו %d תזכורות סקירה שבועית", sent)
-
-    async def _get_user_doc(self, user_id: int) -> dict:
-        try:
-            return await db.users_collection.find_one({"user_id": user_id})
-        except Exception:
-            return {}
-    
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         פקודת /start - הודעת פתיחה
@@ -273,7 +355,7 @@ class BrainDumpBot:
         
         # הפעלת מצב dump
         self.user_states[user_id] = BOT_STATES["DUMP_MODE"]
-        self.dump_sessions[user_id] = []
+        self.dump_sessions[user_id] = self._new_dump_session()
         
         await update.message.reply_text(
             MESSAGES["dump_mode_start"],
@@ -299,36 +381,28 @@ class BrainDumpBot:
         # שליחת הודעת עיבוד
         await update.message.reply_text(MESSAGES["dump_mode_end"])
         
-        # שליפת המחשבות מהסשן
-        thoughts = self.dump_sessions.get(user_id, [])
+        # שליפת הסשן (הניתוחים רצו ברקע בזמן השפיכה) ואיפוס מצב
+        session = self.dump_sessions.pop(user_id, None) or self._new_dump_session()
+        self.user_states[user_id] = BOT_STATES["NORMAL"]
+        thoughts = session["texts"]
         
         if not thoughts:
             await update.message.reply_text(MESSAGES["empty_dump"])
-            # איפוס מצב
-            self.user_states[user_id] = BOT_STATES["NORMAL"]
-            del self.dump_sessions[user_id]
             return
         
-        # ניתוח ושמירת כל המחשבות
-        saved_count = 0
-        category_summary = {}
+        # המתנה לניתוחים שעדיין רצים, והשלמה באצווה של מה שנכשל
+        await self._complete_dump_analyses(session)
+        analyses = session["analyses"]
+        category_summary = session["category_summary"]
         
-        for thought_text in thoughts:
-            # ניתוח NLP
-            analysis = nlp.analyze(thought_text)
-            
-            # שמירה ב-DB
-            await db.save_thought(
-                user_id=user_id,
-                raw_text=thought_text,
-                nlp_analysis=analysis
-            )
-            
-            saved_count += 1
-            
-            # ספירה לסיכום
-            category = analysis["category"]
-            category_summary[category] = category_summary.get(category, 0) + 1
+        # שמירת כל המחשבות בפעולה אחת
+        result = await db.save_thoughts_bulk(
+            user_id,
+            [(thought_text, analysis, None) for thought_text, analysis in zip(thoughts, analyses)]
+        )
+        saved_count = len(result["inserted_ids"])
+        if result["errors"]:
+            logger.warning(f"⚠️ {len(result['errors'])} מחשבות מסשן dump לא נשמרו (user_id={user_id})")
         
         # עדכון סטטיסטיקות משתמש
         await db.update_user_stats(user_id)
@@ -341,10 +415,6 @@ class BrainDumpBot:
             parse_mode=ParseMode.MARKDOWN
         )
         
-        # איפוס מצב
-        self.user_states[user_id] = BOT_STATES["NORMAL"]
-        del self.dump_sessions[user_id]
-        
         logger.info(f"✅ משתמש {user_id} סיים סשן dump - {saved_count} מחשבות נשמרו")
     
     async def handle_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -357,16 +427,18 @@ class BrainDumpBot:
         
         # בדיקה אם המשתמש במצב dump
         if self.user_states.get(user_id) == BOT_STATES["DUMP_MODE"]:
-            # הוספת המחשבה לסשן
-            self.dump_sessions[user_id].append(text)
+            # הוספת המחשבה לסשן וניתוח ברקע
+            session = self.dump_sessions.setdefault(user_id, self._new_dump_session())
+            self._add_dump_thought(session, text)
             
             # תגובה שקטה (סימן V)
             await update.message.reply_text(MESSAGES["dump_mode_active"])
             return
         
         # מצב רגיל - ניתוח ושמירה מיידית
-        # ניתוח NLP
-        analysis = nlp.analyze(text)
+        # ניתוח NLP (טקסטים ארוכים רצים מחוץ ללולאת האירועים).
+        # מילות המפתח מדורגות בשמירה לפי TF-IDF - אין טעם לחלץ אותן כאן
+        analysis = await analysis_service.analyze(text, include_keywords=False)
         
         # שמירה ב-DB
         try:
@@ -413,8 +485,9 @@ class BrainDumpBot:
         reporter.report_activity(user_id)
         
         # שליפת סיכומים
-        category_summary = await db.get_category_summary(user_id)
-        topic_summary = await db.get_topic_summary(user_id)
+        summary = await db.get_user_summary(user_id)
+        category_summary = summary["categories"]
+        topic_summary = summary["topics"]
         
         if not category_summary and not topic_summary:
             await update.message.reply_text(
@@ -459,19 +532,91 @@ class BrainDumpBot:
         """
         user_id = update.effective_user.id
         reporter.report_activity(user_id)
-        
-        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=1)
-        
-        if not thoughts:
-            await update.message.reply_text("לא נרשמו מחשבות היום. 🤔")
+        await self._reply_thought_list_page(update, user_id, "today")
+
+    async def _reply_thought_list_page(self, update: Update, user_id: int, kind: str):
+        """
+        שליחת העמוד הראשון של רשימת מחשבות (/today, /week, /archive)
+        """
+        page = await self._build_thought_list_page(user_id, kind)
+        if not page:
+            await update.message.reply_text(THOUGHT_LIST_VIEWS[kind]["empty"])
             return
-        
+
+        text, reply_markup = page
+        await update.message.reply_text(
+            text,
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=reply_markup
+        )
+
+    async def _show_thought_list_page(self, query, user_id: int, data: str):
+        """
+        מעבר לעמוד הבא ברשימת מחשבות (callback: page_<kind>_<page>_<window>_<token>)
+        window = תחילת חלון הזמן (שניות epoch, 0 = ללא חלון) - נשמר מהעמוד הראשון
+        """
+        try:
+            _, kind, page_number, window_start, page_token = data.split("_", 4)
+            page_number = int(page_number)
+            window_start = int(window_start)
+        except ValueError:
+            await query.answer("העמוד לא זמין")
+            return
+        if kind not in THOUGHT_LIST_VIEWS:
+            await query.answer("העמוד לא זמין")
+            return
+
+        from_date = datetime.utcfromtimestamp(window_start) if window_start else None
+        page = await self._build_thought_list_page(user_id, kind, page_token, page_number, from_date)
+        if not page:
+            await query.edit_message_text(THOUGHT_LIST_VIEWS[kind]["empty"])
+            return
+
+        text, reply_markup = page
+        await query.edit_message_text(
+            text,
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=reply_markup
+        )
+
+    async def _build_thought_list_page(
+        self,
+        user_id: int,
+        kind: str,
+        page_token: str | None = None,
+        page_number: int = 1,
+        from_date: datetime | None = None
+    ) -> tuple[str, InlineKeyboardMarkup | None] | None:
+        """
+        בניית עמוד ברשימת מחשבות בעימוד keyset (כל עמוד = שאילתת טווח אחת).
+        from_date נקבע בעמוד הראשון ועובר בכפתור "לעמוד הבא" - החלון לא זז בזמן דפדוף.
+        """
+        view = THOUGHT_LIST_VIEWS[kind]
+        if from_date is None and view["days_back"]:
+            # עיגול לשניות - כך בדיוק הוא נשמר ב-callback_data
+            from_date = days_ago(view["days_back"]).replace(microsecond=0)
+        window_start = int((from_date - datetime(1970, 1, 1)).total_seconds()) if from_date else 0
+
+        thoughts, next_token = await db.get_thoughts_page(
+            user_id,
+            page_token=page_token,
+            page_size=THOUGHT_LIST_PAGE_SIZE,
+            status=view["status"],
+            from_date=from_date
+        )
+        if not thoughts:
+            return None
+
+        first_index = (page_number - 1) * THOUGHT_LIST_PAGE_SIZE + 1
+        total = None
+        if view["counted"]:
+            total = await db.count_user_thoughts(user_id, status=view["status"], from_date=from_date)
+
         # בניית הודעה
-        lines = [f"📅 *היום רשמת {len(thoughts)} מחשבות:*\n"]
-        display_thoughts = thoughts[:10]
+        lines = [view["header"].format(total=total) + "\n"]
         item_buttons: list[list[InlineKeyboardButton]] = []
         
-        for i, thought in enumerate(display_thoughts, 1):  # מקסימום 10
+        for i, thought in enumerate(thoughts, first_index):
             raw_text = (thought.get("raw_text") or "").strip()
             text = raw_text
             category = thought["nlp_analysis"]["category"]
@@ -485,32 +630,39 @@ class BrainDumpBot:
             safe_text = self._escape_markdown(text)
             lines.append(f"{i}. {emoji} {safe_text}")
             
-            preview_label = self._build_thought_preview_button_label(i, raw_text)
-            item_buttons.append([
+            if view["item_buttons"]:
+                preview_label = self._build_thought_preview_button_label(i, raw_text)
+                item_buttons.append([
+                    InlineKeyboardButton(
+                        preview_label,
+                        callback_data=f"view_thought_{thought_id}"
+                    )
+                ])
+        
+        shown = first_index + len(thoughts) - 1
+        if total is not None and total > shown:
+            lines.append(f"\n_ועוד {total - shown} מחשבות..._")
+        
+        if view["item_buttons"]:
+            lines.append("\n💡 *לחיצה על כפתור הפריט תפתח את המחשבה המלאה.*")
+        
+        keyboard = item_buttons
+        if next_token:
+            keyboard.append([
                 InlineKeyboardButton(
-                    preview_label,
-                    callback_data=f"view_thought_{thought_id}"
+                    "➡️ לעמוד הבא",
+                    callback_data=f"page_{kind}_{page_number + 1}_{window_start}_{next_token}"
                 )
             ])
+        if view["bulk_prefix"]:
+            # כפתורים לבחירת פריטים לארכוב/מחיקה
+            keyboard.append([
+                InlineKeyboardButton("✅ בחר פריטים לארכוב", callback_data=f"{view['bulk_prefix']}_start"),
+                InlineKeyboardButton("🗑️ מחק פריטים", callback_data=f"{view['bulk_prefix']}_delete_start"),
+            ])
         
-        if len(thoughts) > 10:
-            lines.append(f"\n_ועוד {len(thoughts) - 10} מחשבות..._")
-        
-        lines.append("\n💡 *לחיצה על כפתור הפריט תפתח את המחשבה המלאה.*")
-        
-        # כפתורים לבחירת פריטים לארכוב/מחיקה
-        bulk_row = [
-            InlineKeyboardButton("✅ בחר פריטים לארכוב", callback_data="bulk_today_start"),
-            InlineKeyboardButton("🗑️ מחק פריטים", callback_data="bulk_today_delete_start"),
-        ]
-        keyboard = item_buttons + [bulk_row]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            "\n".join(lines),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=reply_markup
-        )
+        reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+        return "\n".join(lines), reply_markup
 
     def _build_thought_preview_button_label(self, index: int, text: str) -> str:
         """
@@ -559,63 +711,52 @@ class BrainDumpBot:
             parse_mode=ParseMode.MARKDOWN
         )
     
-    async def week_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _show_similar_thoughts(self, query, user_id: int, thought_id: str):
         """
-        פקודת /week - מה נרשם השבוע
+        מציג מחשבות דומות למחשבה שנשמרה, עם כפתורים לפתיחת כל אחת.
         """
-        user_id = update.effective_user.id
-        reporter.report_activity(user_id)
-        
-        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=7)
-        
+        thoughts = await db.find_similar_thoughts(user_id, thought_id, limit=SIMILARITY_MAX_RESULTS)
+
         if not thoughts:
-            await update.message.reply_text("לא נרשמו מחשבות השבוע. 🤔")
+            await query.message.reply_text("🔍 לא נמצאו מחשבות דומות.")
             return
-        
-        # בניית הודעה בפורמט זהה ל-/today
-        lines = [f"📆 *השבוע רשמת {len(thoughts)} מחשבות:*\n"]
-        display_thoughts = thoughts[:10]
+
+        lines = [f"🔍 *נמצאו {len(thoughts)} מחשבות דומות:*\n"]
         item_buttons: list[list[InlineKeyboardButton]] = []
-        
-        for i, thought in enumerate(display_thoughts, 1):  # מקסימום 10
+
+        for i, thought in enumerate(thoughts, 1):
             raw_text = (thought.get("raw_text") or "").strip()
             text = raw_text
-            category = thought["nlp_analysis"]["category"]
-            emoji = nlp.get_category_emoji(category)
-            thought_id = str(thought.get("_id"))
-            
             if len(text) > 50:
                 text = text[:47] + "..."
-            
+
+            category = thought.get("nlp_analysis", {}).get("category", "")
+            emoji = nlp.get_category_emoji(category)
+            similarity = round(thought.get("similarity", 0.0) * 100)
+
             safe_text = self._escape_markdown(text)
-            lines.append(f"{i}. {emoji} {safe_text}")
-            
-            preview_label = self._build_thought_preview_button_label(i, raw_text)
+            lines.append(f"{i}. {emoji} {safe_text} _({similarity}%)_")
+
             item_buttons.append([
                 InlineKeyboardButton(
-                    preview_label,
-                    callback_data=f"view_thought_{thought_id}"
+                    self._build_thought_preview_button_label(i, raw_text),
+                    callback_data=f"view_thought_{thought.get('_id')}"
                 )
             ])
-        
-        if len(thoughts) > 10:
-            lines.append(f"\n_ועוד {len(thoughts) - 10} מחשבות..._")
-        
-        lines.append("\n💡 *לחיצה על כפתור הפריט תפתח את המחשבה המלאה.*")
-        
-        # כפתורים לבחירת פריטים לארכוב/מחיקה
-        bulk_row = [
-            InlineKeyboardButton("✅ בחר פריטים לארכוב", callback_data="bulk_week_start"),
-            InlineKeyboardButton("🗑️ מחק פריטים", callback_data="bulk_week_delete_start"),
-        ]
-        keyboard = item_buttons + [bulk_row]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
+
+        await query.message.reply_text(
             "\n".join(lines),
             parse_mode=ParseMode.MARKDOWN,
-            reply_markup=reply_markup
+            reply_markup=InlineKeyboardMarkup(item_buttons)
         )
+    
+    async def week_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        פקודת /week - מה נרשם השבוע
+        """
+        user_id = update.effective_user.id
+        reporter.report_activity(user_id)
+        await self._reply_thought_list_page(update, user_id, "week")
 
     async def archive_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -623,26 +764,7 @@ class BrainDumpBot:
         """
         user_id = update.effective_user.id
         reporter.report_activity(user_id)
-        thoughts = await db.get_user_thoughts(user_id, limit=10, status=THOUGHT_STATUS["ARCHIVED"])
-        
-        if not thoughts:
-            await update.message.reply_text("אין פריטים בארכיון כרגע.")
-            return
-        
-        lines = ["📦 *המחשבות בארכיון:*\n"]
-        for i, thought in enumerate(thoughts, 1):
-            text = (thought.get("raw_text") or "").strip()
-            if len(text) > 50:
-                text = text[:47] + "..."
-            category = thought["nlp_analysis"]["category"]
-            emoji = nlp.get_category_emoji(category)
-            safe_text = self._escape_markdown(text)
-            lines.append(f"{i}. {emoji} {safe_text}")
-        
-        await update.message.reply_text(
-            "\n".join(lines),
-            parse_mode=ParseMode.MARKDOWN,
-        )
+        await self._reply_thought_list_page(update, user_id, "archive")
     
     async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -699,12 +821,14 @@ class BrainDumpBot:
         user_id = update.effective_user.id
         reporter.report_activity(user_id)
 
-        items = await self._ensure_review_session(user_id, refresh=True)
-        if not items:
+        # הסשן עצמו נבנה רק בלחיצה על "בוא נתחיל" - כאן רק ספירה
+        items_count = await db.count_user_thoughts(user_id, from_date=days_ago(7))
+        if not items_count:
             await update.message.reply_text(
                 "לא נמצאו מחשבות מהשבוע האחרון.\nהמשך לכתוב ונדבר שבוע הבא! 😊"
             )
             return
+        await self._drop_review_session(user_id)
 
         keyboard = [
             [InlineKeyboardButton("בוא נתחיל! 🚀", callback_data="review_start")],
@@ -712,7 +836,7 @@ class BrainDumpBot:
         ]
         await update.message.reply_text(
             f"🗓️ *שבוע חדש מתחיל!*\n\n"
-            f"השבוע שעבר רשמת *{len(items)}* מחשבות.\n"
+            f"השבוע שעבר רשמת *{items_count}* מחשבות.\n"
             f"בוא/י נעבור עליהן ונבחר מה להשאיר לשבוע הבא.",
             parse_mode=ParseMode.MARKDOWN,
             reply_markup=InlineKeyboardMarkup(keyboard),
@@ -758,13 +882,113 @@ class BrainDumpBot:
     
     async def export_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
-        פקודת /export - ייצוא מחשבות (בסיסי)
+        פקודת /export [txt|csv|json] [gz] - ייצוא מחשבות לקובץ
         """
-        reporter.report_activity(update.effective_user.id)
-        await update.message.reply_text(
-            "🚧 הפיצ'ר של ייצוא עדיין בפיתוח!\n"
-            "בקרוב תוכלו לייצא את כל המחשבות ל-TXT/CSV 📄"
-        )
+        user_id = update.effective_user.id
+        reporter.report_activity(user_id)
+        
+        args = [arg.lower() for arg in (context.args or [])]
+        fmt = next((arg for arg in args if arg in EXPORT_FORMATS), None)
+        compress = any(arg in ("gz", "gzip") for arg in args)
+        
+        if fmt is None:
+            # בחירת פורמט בכפתורים
+            keyboard = [[
+                InlineKeyboardButton(f"📄 {export_format.upper()}", callback_data=f"export_{export_format}")
+                for export_format in EXPORT_FORMATS
+            ]]
+            await update.message.reply_text(
+                "📤 *לאיזה פורמט לייצא?*\n\n"
+                "💡 לקובץ דחוס: `/export csv gz`",
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=InlineKeyboardMarkup(keyboard)
+            )
+            return
+        
+        if self._export_running(user_id):
+            await update.message.reply_text("⏳ ייצוא קודם עדיין בתהליך - הקובץ יישלח בקרוב.")
+            return
+        
+        status_message = await update.message.reply_text("⏳ מכין את הייצוא...")
+        self._start_export(user_id, status_message, fmt, compress)
+    
+    async def _handle_export_choice(self, query, user_id: int, data: str):
+        """בחירת פורמט מהכפתורים: export_<fmt> או export_<fmt>_gz"""
+        parts = data.split("_")
+        fmt = parts[1] if len(parts) > 1 else ""
+        compress = parts[-1] == "gz"
+        if fmt not in EXPORT_FORMATS:
+            await query.edit_message_text("❌ פורמט לא נתמך.")
+            return
+        
+        if self._export_running(user_id):
+            await query.edit_message_text("⏳ ייצוא קודם עדיין בתהליך - הקובץ יישלח בקרוב.")
+            return
+        
+        await query.edit_message_text("⏳ מכין את הייצוא...")
+        self._start_export(user_id, query.message, fmt, compress)
+    
+    def _export_running(self, user_id: int) -> bool:
+        task = self.export_tasks.get(user_id)
+        return task is not None and not task.done()
+    
+    def _start_export(self, user_id: int, status_message, fmt: str, compress: bool):
+        """
+        הרצת הייצוא כמשימת רקע - ה-handler חוזר מיד והמשימה מעדכנת את הודעת הסטטוס
+        """
+        task = asyncio.create_task(self._run_export(user_id, status_message, fmt, compress))
+        self.export_tasks[user_id] = task
+        
+        def _forget(done_task: asyncio.Task):
+            if self.export_tasks.get(user_id) is done_task:
+                self.export_tasks.pop(user_id, None)
+        
+        task.add_done_callback(_forget)
+    
+    async def _run_export(self, user_id: int, status_message, fmt: str, compress: bool):
+        """
+        ייצוא ברקע: כתיבה לקובץ זמני, דיווח התקדמות ושליחה כמסמך
+        """
+        total = await db.count_export_thoughts(user_id)
+        if not total:
+            await self._edit_status(status_message, "📭 אין מחשבות לייצוא.")
+            return
+        
+        last_report = time.monotonic()
+        
+        async def report_progress(done: int):
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < EXPORT_PROGRESS_INTERVAL_SECONDS:
+                return
+            last_report = now
+            await self._edit_status(status_message, f"⏳ מייצא... {done}/{total}")
+        
+        result = None
+        try:
+            result = await export_thoughts(user_id, fmt, compress=compress, progress=report_progress)
+            # read_file_handle=False - הקובץ נקרא בזמן ההעלאה ולא נטען כולו לזיכרון
+            await status_message.get_bot().send_document(
+                chat_id=status_message.chat_id,
+                document=InputFile(result["file"], filename=result["filename"], read_file_handle=False),
+                caption=f"📤 {result['count']} מחשבות ({fmt.upper()})"
+            )
+            await self._edit_status(status_message, "✅ הייצוא מוכן!")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ שגיאה בייצוא למשתמש {user_id}: {e}")
+            await self._edit_status(status_message, "❌ הייצוא נכשל. נסו שוב מאוחר יותר.")
+        finally:
+            if result:
+                result["file"].close()
+    
+    async def _edit_status(self, message, text: str):
+        """עדכון הודעת סטטוס - כשל בעדכון לא מפיל את התהליך"""
+        try:
+            await message.edit_text(text)
+        except Exception as e:
+            logger.warning(f"⚠️ עדכון הודעת סטטוס נכשל: {e}")
     
     async def clear_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -787,6 +1011,28 @@ class BrainDumpBot:
             reply_markup=reply_markup
         )
     
+    async def reload_lexicon_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        פקודת /reload_lexicon - טעינה מחדש של מילון ה-NLP (מנהל בלבד)
+        """
+        user_id = update.effective_user.id
+        if not ADMIN_USER_ID or user_id != ADMIN_USER_ID:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, nlp.reload_lexicon)
+        except Exception:
+            logger.exception("❌ כשל בטעינה מחדש של מילון ה-NLP")
+            await update.message.reply_text("❌ טעינת המילון נכשלה - המילון הקודם נשאר פעיל.")
+            return
+        
+        await update.message.reply_text(
+            f"🔄 המילון נטען מחדש ({result['source']})\n"
+            f"ביטויים: {result['phrases']}\n"
+            f"שינוי: {'כן' if result['changed'] else 'לא'}"
+        )
+    
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         טיפול בלחיצות על כפתורים
@@ -801,6 +1047,8 @@ class BrainDumpBot:
         if data == "show_all":
             # הצגת כל המחשבות
             await self._show_recent_thoughts(query, user_id)
+        elif data.startswith("page_"):
+            await self._show_thought_list_page(query, user_id, data)
         elif data.startswith("view_thought_"):
             thought_id = data.replace("view_thought_", "")
             await self._send_thought_details(query, user_id, thought_id)
@@ -847,8 +1095,12 @@ class BrainDumpBot:
         elif data == "cancel_clear":
             await query.edit_message_text("✅ בוטל. המחשבות נשארות.")
         
+        elif data.startswith("export_"):
+            await self._handle_export_choice(query, user_id, data)
+        
         elif data.startswith("similar_"):
-            await query.edit_message_text("🚧 חיפוש דומים בפיתוח...")
+            thought_id = data.replace("similar_", "")
+            await self._show_similar_thoughts(query, user_id, thought_id)
 
         # ===== סקירה שבועית - זרימה =====
         elif data == "review_later":
@@ -870,7 +1122,7 @@ class BrainDumpBot:
         אתחול סשן לבחירה מרובה של מחשבות לארכוב
         """
         # שליפת מחשבות לפי טווח ימים (פעילות)
-        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=days_back)
+        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=days_back, limit=20, projection="preview")
         if not thoughts:
             await query.edit_message_text("לא נרשמו מחשבות היום. 🤔")
             return
@@ -909,7 +1161,7 @@ class BrainDumpBot:
         """
         אתחול סשן לבחירה מרובה של מחשבות למחיקה
         """
-        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=days_back)
+        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=days_back, limit=20, projection="preview")
         if not thoughts:
             await query.edit_message_text("לא נרשמו מחשבות רלוונטיות. 🤔")
             return
@@ -1037,7 +1289,7 @@ class BrainDumpBot:
         """
         הצגת מחשבות אחרונות
         """
-        thoughts = await db.get_user_thoughts(user_id, limit=10)
+        thoughts = await db.get_user_thoughts(user_id, limit=10, projection="preview")
         
         if not thoughts:
             await query.edit_message_text("אין מחשבות להצגה.")
@@ -1076,6 +1328,66 @@ class BrainDumpBot:
             except Exception:
                 logger.exception("❌ כשל בשליחת הודעת שגיאה למשתמש")
     
+    def _new_dump_session(self) -> dict:
+        """
+        יצירת סשן dump ריק
+        """
+        return {
+            "texts": [],
+            "analyses": [],
+            "category_summary": {},
+            "tasks": set(),
+        }
+
+    def _add_dump_thought(self, session: dict, text: str):
+        """
+        הוספת מחשבה לסשן dump והפעלת ניתוח שלה ברקע
+        """
+        index = len(session["texts"])
+        session["texts"].append(text)
+        session["analyses"].append(None)
+
+        task = asyncio.create_task(self._analyze_dump_thought(session, index, text))
+        session["tasks"].add(task)
+        task.add_done_callback(session["tasks"].discard)
+
+    async def _analyze_dump_thought(self, session: dict, index: int, text: str):
+        """
+        ניתוח מחשבה בודדת מסשן dump ועדכון הסיכום המצטבר
+        """
+        try:
+            analysis = await analysis_service.analyze(text, include_keywords=False)
+        except Exception:
+            logger.exception("❌ כשל בניתוח רקע של מחשבה בסשן dump")
+            return
+        self._record_dump_analysis(session, index, analysis)
+
+    def _record_dump_analysis(self, session: dict, index: int, analysis: dict):
+        """
+        שמירת ניתוח בסשן ועדכון ספירת הקטגוריות
+        """
+        session["analyses"][index] = analysis
+        category = analysis["category"]
+        summary = session["category_summary"]
+        summary[category] = summary.get(category, 0) + 1
+
+    async def _complete_dump_analyses(self, session: dict):
+        """
+        המתנה לניתוחי הרקע של הסשן והשלמת ניתוחים חסרים באצווה אחת
+        """
+        if session["tasks"]:
+            await asyncio.gather(*list(session["tasks"]), return_exceptions=True)
+
+        missing = [i for i, analysis in enumerate(session["analyses"]) if analysis is None]
+        if not missing:
+            return
+
+        analyses = await analysis_service.batch_analyze(
+            [session["texts"][i] for i in missing], include_keywords=False
+        )
+        for index, analysis in zip(missing, analyses):
+            self._record_dump_analysis(session, index, analysis)
+
     def _build_dump_summary(self, count: int, category_summary: dict) -> str:
         """
         בניית הודעת סיכום לסשן dump
@@ -1104,53 +1416,111 @@ class BrainDumpBot:
             return ""
         return escape_markdown(text, version=1)
 
-    async def _ensure_review_session(self, user_id: int, refresh: bool = False) -> list[dict]:
+    async def _start_review_session(self, user_id: int) -> dict | None:
         """
-        בונה או מאפס סשן סקירה שבועית עבור המשתמש ומחזיר את הפריטים.
+        פתיחת סשן סקירה שבועית: חלון זמן קבוע, סמן keyset ומונים.
+        הפריטים נשלפים בעמודים קטנים תוך כדי מעבר. None אם אין מחשבות.
         """
-        session = self.review_sessions.get(user_id)
-        if session and session.get("items") and not refresh:
-            return session["items"]
-
-        thoughts = await db.get_thoughts_by_date_range(user_id, days_back=7)
-        if not thoughts:
-            self.review_sessions.pop(user_id, None)
-            return []
-
-        items: list[dict] = []
-        for thought in thoughts:
-            items.append({
-                "id": str(thought.get("_id")),
-                "text": (thought.get("raw_text") or "").strip(),
-                "created_at": thought.get("created_at"),
-                "category": thought.get("nlp_analysis", {}).get("category", "")
-            })
-
-        self.review_sessions[user_id] = {
-            "items": items,
-            "index": 0,
+        session = {
+            "from_date": days_ago(7),
+            "buffer": [],
+            "next_token": None,
+            "exhausted": False,
+            "position": 0,
             "kept": 0,
             "archived": 0,
+            # יומן החלטות: מזהי מחשבות לארכוב שעוד לא נכתבו
+            "pending_archive": [],
+            "pending_since": None,
+            "last_activity": time.monotonic(),
         }
-        return items
+        if await self._review_current_item(user_id, session) is None:
+            self.review_sessions.pop(user_id, None)
+            return None
+
+        self.review_sessions[user_id] = session
+        return session
+
+    async def _review_current_item(self, user_id: int, session: dict) -> dict | None:
+        """
+        הפריט הנוכחי בסשן - שליפת העמוד הבא מהסמן כשהחלון התרוקן.
+        None כשהסקירה הגיעה לסוף.
+        """
+        if not session["buffer"] and not session["exhausted"]:
+            thoughts, next_token = await db.get_thoughts_page(
+                user_id,
+                page_token=session["next_token"],
+                page_size=WEEKLY_REVIEW_PAGE_SIZE,
+                from_date=session["from_date"],
+                projection="preview"
+            )
+            session["buffer"] = [
+                {
+                    "id": str(thought.get("_id")),
+                    "text": (thought.get("raw_text") or "").strip(),
+                    "created_at": thought.get("created_at"),
+                    "category": thought.get("nlp_analysis", {}).get("category", "")
+                }
+                for thought in thoughts
+            ]
+            session["next_token"] = next_token
+            session["exhausted"] = next_token is None
+
+        return session["buffer"][0] if session["buffer"] else None
+
+    async def _flush_review_decisions(self, user_id: int, session: dict) -> int:
+        """
+        כתיבת החלטות הארכוב שנאספו בסשן בקריאה אחת ל-archive_thoughts_bulk
+        """
+        thought_ids = session["pending_archive"]
+        if not thought_ids:
+            return 0
+        session["pending_archive"] = []
+        session["pending_since"] = None
+
+        archived = await db.archive_thoughts_bulk(user_id, thought_ids)
+        if archived < len(thought_ids):
+            logger.warning(
+                f"⚠️ סקירה שבועית: ארכוב {archived}/{len(thought_ids)} מחשבות למשתמש {user_id}"
+            )
+        return archived
+
+    async def _drop_review_session(self, user_id: int):
+        """סגירת סשן סקירה (נטוש/מוחלף) - ההחלטות שנאספו נכתבות לפני ההסרה"""
+        session = self.review_sessions.pop(user_id, None)
+        if session:
+            await self._flush_review_decisions(user_id, session)
+
+    async def _sweep_review_sessions(self):
+        """כתיבת החלטות שממתינות יותר מדי זמן וסגירת סשנים ללא פעילות"""
+        now = time.monotonic()
+        idle_seconds = WEEKLY_REVIEW_SESSION_IDLE_MINUTES * 60
+        for user_id, session in list(self.review_sessions.items()):
+            try:
+                if now - session["last_activity"] >= idle_seconds:
+                    await self._drop_review_session(user_id)
+                elif (
+                    session["pending_since"] is not None
+                    and now - session["pending_since"] >= WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS
+                ):
+                    await self._flush_review_decisions(user_id, session)
+            except Exception:
+                logger.exception("❌ כשל בכתיבת החלטות סקירה למשתמש %s", user_id)
 
     # ===== Weekly Review helpers =====
     async def _review_show_current(self, query, user_id: int):
         session = self.review_sessions.get(user_id)
-        if not session or not session.get("items"):
-            items = await self._ensure_review_session(user_id, refresh=True)
-            session = self.review_sessions.get(user_id)
-            if not items or not session:
+        if not session:
+            session = await self._start_review_session(user_id)
+            if not session:
                 await query.edit_message_text("לא נמצאו מחשבות מהשבוע האחרון. תוסיפו כמה ונחזור לזה! 😊")
                 return
 
-        idx = session.get("index", 0)
-        items = session["items"]
-        if idx >= len(items):
+        item = await self._review_current_item(user_id, session)
+        if item is None:
             await self._review_finish(query, user_id)
             return
 
-        item = items[idx]
         text = item.get("text", "")
         if len(text) > 140:
             text = text[:137] + "..."
@@ -1206,33 +1576,43 @@ class BrainDumpBot:
         if not session:
             await query.answer("אין סקירה פעילה")
             return
-        idx = session.get("index", 0)
-        items = session.get("items", [])
-        if idx >= len(items):
+        current = await self._review_current_item(user_id, session)
+        if current is None:
             await self._review_finish(query, user_id)
             return
 
-        current = items[idx]
         # ודא התאמה מזהה כאשר מדובר בפעולה ספציפית
         if thought_id and current.get("id") != thought_id:
             # אם לא תואם, מציגים הנוכחי ללא שינוי
             await self._review_show_current(query, user_id)
             return
 
+        now = time.monotonic()
+        session["last_activity"] = now
         if action == "archive":
-            await db.update_thought_status(current["id"], THOUGHT_STATUS["ARCHIVED"])
+            # נרשם ביומן ההחלטות - נכתב באצווה (סף / זמן / סיום הסקירה)
+            session["pending_archive"].append(current["id"])
+            if session["pending_since"] is None:
+                session["pending_since"] = now
             session["archived"] = session.get("archived", 0) + 1
         elif action == "keep":
             session["kept"] = session.get("kept", 0) + 1
         # skip לא משנה מונים
 
-        # מעבר לפריט הבא
-        session["index"] = idx + 1
+        # מעבר לפריט הבא (השליפה הבאה ממשיכה מהסמן)
+        session["buffer"].pop(0)
+        session["position"] += 1
 
-        if session["index"] >= len(items):
-            await self._review_finish(query, user_id)
-        else:
-            await self._review_show_current(query, user_id)
+        if (
+            len(session["pending_archive"]) >= WEEKLY_REVIEW_ARCHIVE_FLUSH_THRESHOLD
+            or (
+                session["pending_since"] is not None
+                and now - session["pending_since"] >= WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS
+            )
+        ):
+            await self._flush_review_decisions(user_id, session)
+
+        await self._review_show_current(query, user_id)
 
     async def _review_finish(self, query, user_id: int):
         session = self.review_sessions.pop(user_id, None)
@@ -1240,9 +1620,10 @@ class BrainDumpBot:
             await query.edit_message_text("✅ סקירה הושלמה!")
             return
 
+        await self._flush_review_decisions(user_id, session)
+
         kept = session.get("kept", 0)
         archived = session.get("archived", 0)
-        total = kept + archived + (len(session.get("items", [])) - session.get("index", 0))
 
         lines = [
             "✅ *סקירה הושלמה!*\n",
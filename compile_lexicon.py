@@ -0,0 +1,48 @@
+"""
+קומפילציה של מילון ה-NLP לקובץ artifact
+מריצים בשלב ה-build כדי שהבוט יטען את המילון המוכן בעלייה
+
+שימוש:
+    python compile_lexicon.py [--output lexicon.pkl] [--source lexicon.json]
+"""
+
+import argparse
+import logging
+import time
+
+from config import CATEGORIES, TOPICS, NLP_LEXICON_ARTIFACT, NLP_LEXICON_FILE
+from nlp_analyzer import CompiledLexicon, load_lexicon_source, save_lexicon_artifact
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="קומפילציה של מילון ה-NLP")
+    parser.add_argument(
+        "--output",
+        default=NLP_LEXICON_ARTIFACT,
+        help="נתיב קובץ ה-artifact (ברירת מחדל: NLP_LEXICON_ARTIFACT)"
+    )
+    parser.add_argument(
+        "--source",
+        default=NLP_LEXICON_FILE,
+        help="קובץ JSON של מקור המילון (ברירת מחדל: NLP_LEXICON_FILE, ובלעדיו config.py)"
+    )
+    args = parser.parse_args()
+
+    categories, topics = load_lexicon_source(args.source) if args.source else (CATEGORIES, TOPICS)
+
+    started_at = time.perf_counter()
+    lexicon = CompiledLexicon(categories, topics)
+    save_lexicon_artifact(lexicon, args.output)
+
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    logger.info(f"✅ המילון קומפל ב-{elapsed_ms:.1f}ms (source_hash={lexicon.source_hash[:12]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,8 @@ load_dotenv()
 # ===== הגדרות Telegram =====
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 ADMIN_USER_ID = int(os.getenv("ADMIN_USER_ID", "0"))
+# טוקן לנקודות /metrics (כותרת X-Metrics-Token) - סוד נפרד מטוקן הבוט. ריק = גישה מ-localhost בלבד
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 # ===== הגדרות MongoDB =====
 MONGODB_URI = os.getenv("MONGODB_URI")
@@ -21,6 +23,19 @@ MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TI
 MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
 MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "10000"))
 MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "10"))
+MONGODB_INSERT_BATCH_SIZE = int(os.getenv("MONGODB_INSERT_BATCH_SIZE", "500"))
+# Write-behind: צבירת מחשבות חדשות בזיכרון וכתיבה באצוות (כבוי כברירת מחדל)
+MONGODB_WRITE_BEHIND_ENABLED = os.getenv("MONGODB_WRITE_BEHIND_ENABLED", "False").lower() == "true"
+MONGODB_WRITE_BEHIND_FLUSH_MS = int(os.getenv("MONGODB_WRITE_BEHIND_FLUSH_MS", "200"))
+MONGODB_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("MONGODB_WRITE_BEHIND_BATCH_SIZE", "100"))
+MONGODB_WRITE_BEHIND_MAX_PENDING = int(os.getenv("MONGODB_WRITE_BEHIND_MAX_PENDING", "1000"))
+# מטמון מסמכי משתמשים (read-through) - זמן חיים וגודל מקסימלי
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "5000"))
+# כל כמה דקות מתקנים סטיות במוני המחשבות של המשתמשים
+USER_STATS_RECONCILE_MINUTES = int(os.getenv("USER_STATS_RECONCILE_MINUTES", "360"))
+# כמה משתמשים נבדקים בכל אצווה של התיקון
+USER_STATS_RECONCILE_BATCH = int(os.getenv("USER_STATS_RECONCILE_BATCH", "200"))
 
 # ===== הגדרות Render =====
 PORT = int(os.getenv("PORT", 10000))
@@ -206,7 +221,7 @@ MESSAGES = {
 
 *פקודות ניהול:*
 /stats - סטטיסטיקה אישית
-/export - ייצוא המידע לקובץ
+/export [txt|csv|json] [gz] - ייצוא המידע לקובץ
 /clear - ניקוי כל המידע (זהירות!)
 
 *טיפים:*
@@ -237,6 +252,10 @@ THOUGHT_STATUS = {
 # הגדרות ייצוא
 EXPORT_FORMATS = ["txt", "csv", "json"]
 MAX_EXPORT_SIZE = 10000  # מקסימום מחשבות בייצוא
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))  # מחשבות לכל אצווה מהסמן
+# עד גודל זה הקובץ נבנה בזיכרון; מעבר לו - קובץ זמני בדיסק
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(1024 * 1024)))
+EXPORT_PROGRESS_INTERVAL_SECONDS = int(os.getenv("EXPORT_PROGRESS_INTERVAL_SECONDS", "3"))
 
 # הגדרות זמן
 TIMEZONE = "Asia/Jerusalem"
@@ -262,3 +281,73 @@ WEEKLY_REVIEW_SUNDAY_MINUTE = _int_env("WEEKLY_REVIEW_SUNDAY_MINUTE", 0)
 
 # חלון מניעת כפילויות (בשעות) בין טריגרים אוטומטיים
 WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS = _int_env("WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS", 36)
+
+# כמה פריטים נשלפים בכל פעם לסשן סקירה (הסשן מחזיק רק את החלון הזה + סמן)
+WEEKLY_REVIEW_PAGE_SIZE = _int_env("WEEKLY_REVIEW_PAGE_SIZE", 5)
+# החלטות "ארכב" נאספות ונכתבות יחד: בסיום, בהגעה לסף, או אחרי המתנה של כך וכך שניות
+WEEKLY_REVIEW_ARCHIVE_FLUSH_THRESHOLD = _int_env("WEEKLY_REVIEW_ARCHIVE_FLUSH_THRESHOLD", 10)
+WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS = _int_env("WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS", 60)
+# סשן סקירה ללא פעילות זמן זה נסגר (וההחלטות שלו נכתבות)
+WEEKLY_REVIEW_SESSION_IDLE_MINUTES = _int_env("WEEKLY_REVIEW_SESSION_IDLE_MINUTES", 60)
+
+# ===== שליחה המונית (fan-out) של תזכורות =====
+# מגבלות טלגרם: כ-30 הודעות לשנייה לבוט, הודעה אחת לשנייה לצ'אט
+FANOUT_MAX_CONCURRENCY = _int_env("FANOUT_MAX_CONCURRENCY", 20)
+FANOUT_GLOBAL_RATE_PER_SECOND = _int_env("FANOUT_GLOBAL_RATE_PER_SECOND", 25)
+FANOUT_PER_CHAT_INTERVAL_SECONDS = _int_env("FANOUT_PER_CHAT_INTERVAL_SECONDS", 1)
+FANOUT_MAX_RETRIES = _int_env("FANOUT_MAX_RETRIES", 3)
+# כמה נמענים שהצליחו נכתבים ל-DB בכל bulk_write
+FANOUT_WRITE_CHUNK_SIZE = _int_env("FANOUT_WRITE_CHUNK_SIZE", 100)
+FANOUT_PROGRESS_LOG_SECONDS = _int_env("FANOUT_PROGRESS_LOG_SECONDS", 10)
+
+# ===== ביצועי NLP =====
+# גודל מטמון ה-LRU של תוצאות ניתוח (0 = ללא מטמון)
+NLP_CACHE_SIZE = _int_env("NLP_CACHE_SIZE", 2048)
+
+# הרצת ניתוחים מחוץ ללולאת האירועים של הבוט
+# טקסטים עד אורך זה (בתווים) מנותחים במקום; ארוכים יותר ואצוות נשלחים ל-pool
+NLP_INLINE_MAX_CHARS = _int_env("NLP_INLINE_MAX_CHARS", 400)
+# מספר ה-threads ב-pool (משתפים את המנתח, המטמון והמילון של התהליך)
+NLP_EXECUTOR_WORKERS = _int_env("NLP_EXECUTOR_WORKERS", 2)
+# מקסימום ניתוחים שממתינים/רצים ב-pool בו-זמנית (מעבר לכך - המתנה)
+NLP_EXECUTOR_MAX_PENDING = _int_env("NLP_EXECUTOR_MAX_PENDING", 16)
+
+# artifact של המילון המקומפל (נבנה עם: python compile_lexicon.py)
+NLP_LEXICON_ARTIFACT = os.getenv(
+    "NLP_LEXICON_ARTIFACT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.pkl")
+)
+
+# קובץ JSON אופציונלי עם מילון ה-NLP ({"categories": ..., "topics": ...}).
+# כשמוגדר - המנתח טוען ממנו (במקום CATEGORIES/TOPICS) ו-/reload_lexicon קורא אותו מחדש
+NLP_LEXICON_FILE = os.getenv("NLP_LEXICON_FILE")
+
+# מדידת זמנים לכל שלב בניתוח (היסטוגרמות p50/p95/p99 ב-/metrics)
+NLP_TIMING_ENABLED = os.getenv("NLP_TIMING_ENABLED", "False").lower() == "true"
+
+# ===== מילות מפתח (TF-IDF) =====
+# מספר מילות המפתח שנשמרות לכל מחשבה
+KEYWORDS_PER_THOUGHT = _int_env("KEYWORDS_PER_THOUGHT", 5)
+# כל כמה שניות נשמרים מוני השכיחות (document frequency) למונגו
+KEYWORD_STATS_FLUSH_SECONDS = _int_env("KEYWORD_STATS_FLUSH_SECONDS", 60)
+# מקסימום משתמשים שהמונים שלהם מוחזקים בזיכרון
+KEYWORD_STATS_MAX_USERS = _int_env("KEYWORD_STATS_MAX_USERS", 1000)
+# מקסימום מילים שהשכיחות הגלובלית שלהן מוחזקת בזיכרון (השאר נטענות לפי הצורך)
+KEYWORD_GLOBAL_TERMS_MAX = _int_env("KEYWORD_GLOBAL_TERMS_MAX", 50000)
+
+# ===== חיפוש דומים (MinHash/LSH) =====
+# מספר פונקציות ה-hash בחתימת MinHash (חייב להתחלק במספר ה-bands)
+SIMILARITY_NUM_PERM = _int_env("SIMILARITY_NUM_PERM", 64)
+# מספר ה-bands באינדקס ה-LSH (יותר bands = רגישות גבוהה יותר לדמיון חלש)
+SIMILARITY_BANDS = _int_env("SIMILARITY_BANDS", 32)
+# מספר התוצאות המקסימלי בחיפוש דומים
+SIMILARITY_MAX_RESULTS = _int_env("SIMILARITY_MAX_RESULTS", 5)
+# מקסימום משתמשים שהאינדקס שלהם מוחזק בזיכרון
+SIMILARITY_MAX_USERS = _int_env("SIMILARITY_MAX_USERS", 500)
+
+# ===== חיפוש (אינדקס הפוך בזיכרון) =====
+# מקסימום משתמשים שהאינדקס שלהם מוחזק בזיכרון
+SEARCH_INDEX_MAX_USERS = _int_env("SEARCH_INDEX_MAX_USERS", 200)
+
+# אורך תצוגה מקדימה של מחשבה - מעט מעבר ל-140 התווים שמוצגים בסקירה השבועית
+PREVIEW_TEXT_LENGTH = 150
@@ -4,9 +4,17 @@
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Any, Set, Tuple
+import asyncio
+import base64
+import copy
 import logging
+import time
+from collections import OrderedDict
 from config import (
     MONGODB_URI,
     MONGODB_DB_NAME,
@@ -17,7 +25,22 @@ from config import (
     MONGODB_CONNECT_TIMEOUT_MS,
     MONGODB_SOCKET_TIMEOUT_MS,
     MONGODB_MAX_POOL_SIZE,
+    MONGODB_INSERT_BATCH_SIZE,
+    MONGODB_WRITE_BEHIND_ENABLED,
+    MONGODB_WRITE_BEHIND_FLUSH_MS,
+    MONGODB_WRITE_BEHIND_BATCH_SIZE,
+    MONGODB_WRITE_BEHIND_MAX_PENDING,
+    USER_CACHE_TTL_SECONDS,
+    USER_CACHE_MAX_SIZE,
+    USER_STATS_RECONCILE_BATCH,
+    MAX_EXPORT_SIZE,
+    EXPORT_BATCH_SIZE,
+    PREVIEW_TEXT_LENGTH,
 )
+from keyword_engine import keyword_engine
+from nlp_analyzer import nlp
+from search_engine import search_index
+from similarity_engine import similarity_index
 
 # הגדרת לוגר
 logging.basicConfig(
@@ -26,6 +49,372 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# אינדקסים ישנים -> האינדקס שמחליף אותם (ישן מוסר רק אחרי שהמחליף קיים)
+LEGACY_THOUGHT_INDEXES = {
+    "user_id_1_created_at_-1": "user_status_created",
+    "raw_text_text": "user_raw_text",
+    "nlp_analysis.category_1": "user_status_created",
+    "status_1": "user_status_created",
+}
+
+# אינדקס הטקסט הישן (לשחזור אם יצירת המחליף נכשלה)
+_LEGACY_TEXT_INDEX = ("raw_text_text", [("raw_text", "text")])
+
+# פרופילי projection לשליפת מחשבות - מחזירים רק את השדות שכל מסך צריך
+THOUGHT_PROJECTIONS: Dict[str, Dict[str, Any]] = {
+    # רשימות: טקסט מקוצר (ב-_truncate_previews), תאריך וקטגוריה
+    "preview": {
+        "raw_text": 1,
+        "created_at": 1,
+        "status": 1,
+        "nlp_analysis.category": 1,
+    },
+    # מחשבה בודדת: טקסט מלא וניתוח, בלי חתימות ו-metadata
+    "detail": {
+        "raw_text": 1,
+        "created_at": 1,
+        "status": 1,
+        "nlp_analysis": 1,
+    },
+    # ייצוא: כל מה שהמשתמש כתב והניתוח שלו
+    "export": {
+        "raw_text": 1,
+        "created_at": 1,
+        "status": 1,
+        "nlp_analysis.category": 1,
+        "nlp_analysis.topics": 1,
+        "nlp_analysis.keywords": 1,
+        "nlp_analysis.sentiment": 1,
+    },
+}
+
+
+# סטטוסים שנכללים בייצוא (כל מה שלא נמחק)
+EXPORT_STATUSES = [
+    THOUGHT_STATUS["ACTIVE"],
+    THOUGHT_STATUS["ARCHIVED"],
+    THOUGHT_STATUS["TASK_CREATED"],
+]
+
+
+def thought_projection(profile: Optional[str]) -> Optional[Dict[str, Any]]:
+    """projection לפי שם פרופיל (None = מסמך מלא)"""
+    if profile is None:
+        return None
+    return THOUGHT_PROJECTIONS[profile]
+
+
+def _truncate_previews(thoughts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    קיצור הטקסט של מחשבות בפרופיל "preview".
+    נעשה בפייתון - ביטוי ($substrCP) ב-projection של find נתמך רק מ-MongoDB 4.4.
+    """
+    for thought in thoughts:
+        if "raw_text" in thought:
+            thought["raw_text"] = (thought["raw_text"] or "")[:PREVIEW_TEXT_LENGTH]
+    return thoughts
+
+
+# created_at נשמר כ-datetime נאיבי ב-UTC
+_EPOCH = datetime(1970, 1, 1)
+
+# מספר ניסיונות כתיבה של אצווה ב-write-behind לפני ויתור (שגיאות רשת וכו')
+_WRITE_BEHIND_MAX_ATTEMPTS = 3
+
+
+def _user_term_id(user_id: int, term: str) -> str:
+    """מזהה מסמך השכיחות של מילה אצל משתמש (keyword_user_df)"""
+    return f"{user_id}:{term}"
+
+
+def days_ago(days_back: int) -> datetime:
+    """תחילת חלון של days_back ימים אחורה (UTC, כמו created_at)"""
+    return datetime.utcnow() - timedelta(days=days_back)
+
+
+def weekly_review_counts_pipeline(days_back: int = 7, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    aggregation על thoughts: מספר המחשבות הפעילות לכל משתמש ב-days_back הימים האחרונים.
+    מתחיל מהמחשבות (טווח על active_created) ולא מ-$lookup לכל משתמש - לפני MongoDB 5.0
+    $lookup עם let + $expr לא משתמש באינדקס user_id וסורק את כל המחשבות לכל משתמש.
+    """
+    now = now or datetime.utcnow()
+    return [
+        {"$match": {
+            "status": THOUGHT_STATUS["ACTIVE"],
+            "created_at": {"$gte": now - timedelta(days=days_back)},
+        }},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+    ]
+
+
+def weekly_review_users_filter(cooldown_hours: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    סינון users: משתמשים שמחוץ לחלון ה-cooldown של תזכורת הסקירה
+    """
+    now = now or datetime.utcnow()
+    last_prompted_field = "settings.weekly_review.last_prompted_at"
+    return {
+        "user_id": {"$ne": None},
+        "$or": [
+            # None תופס גם שדה חסר
+            {last_prompted_field: None},
+            {last_prompted_field: {"$lt": now - timedelta(hours=cooldown_hours)}},
+        ],
+    }
+
+
+def encode_page_token(created_at: datetime, thought_id: ObjectId) -> str:
+    """
+    טוקן עמוד אטום: created_at (מילישניות) + ObjectId, ב-base64 ללא ריפוד.
+    27 תווים - נכנס ב-callback_data של טלגרם (עד 64 בתים).
+    """
+    epoch_ms = (created_at - _EPOCH) // timedelta(milliseconds=1)
+    raw = epoch_ms.to_bytes(8, "big", signed=True) + thought_id.binary
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> Optional[Tuple[datetime, ObjectId]]:
+    """
+    פענוח טוקן עמוד
+
+    Returns:
+        (created_at, _id), או None אם הטוקן לא תקין
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        if len(raw) != 20:
+            return None
+        epoch_ms = int.from_bytes(raw[:8], "big", signed=True)
+        return _EPOCH + timedelta(milliseconds=epoch_ms), ObjectId(raw[8:])
+    except Exception:
+        logger.warning("⚠️ טוקן עמוד לא תקין: %s", token)
+        return None
+
+
+class WriteBehindBuffer:
+    """
+    חוצץ כתיבה בזיכרון: פריטים נצברים ונכתבים באצווה כל N מילישניות
+    או כשמצטברים M פריטים. כשהחוצץ מלא, put ממתין (backpressure).
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[List[Any]], Awaitable[None]],
+        after_flush: Optional[Callable[[], Awaitable[None]]] = None,
+        flush_interval_ms: int = MONGODB_WRITE_BEHIND_FLUSH_MS,
+        batch_size: int = MONGODB_WRITE_BEHIND_BATCH_SIZE,
+        max_pending: int = MONGODB_WRITE_BEHIND_MAX_PENDING
+    ):
+        """
+        Args:
+            flush_batch: כתיבת אצווה של פריטים
+            after_flush: פעולה שרצה אחרי כל סבב כתיבה (למשל עדכוני סטטיסטיקה מאוחדים)
+            flush_interval_ms: מרווח הזמן בין כתיבות
+            batch_size: מקסימום פריטים באצווה (וגם סף לכתיבה מיידית)
+            max_pending: מקסימום פריטים ממתינים לפני חסימת put
+        """
+        self._flush_batch = flush_batch
+        self._after_flush = after_flush
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.batch_size = max(batch_size, 1)
+        self.max_pending = max(max_pending, self.batch_size)
+
+        self._items: List[Any] = []
+        # האצווה שנכתבת כרגע
+        self._in_flight: List[Any] = []
+        # נוצרים בעצלות בתוך לולאת האירועים של הבוט
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._drain_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.flushed = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_pending)
+                self._wakeup = asyncio.Event()
+                self._drain_lock = asyncio.Lock()
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, item: Any):
+        """הוספת פריט לחוצץ (ממתין אם החוצץ מלא)"""
+        self._ensure_started()
+        if self._slots.locked():
+            self.backpressure_waits += 1
+            logger.debug("⏳ חוצץ הכתיבה מלא - ממתינים לכתיבה")
+        await self._slots.acquire()
+
+        self._items.append(item)
+        if len(self._items) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self._drain()
+            if self._closing and not self._items:
+                return
+
+    async def _drain(self):
+        # נעילה - flush() שמגיע באמצע כתיבה ממתין שהאצווה הנוכחית תסתיים
+        async with self._drain_lock:
+            while self._items:
+                batch = self._items[:self.batch_size]
+                del self._items[:self.batch_size]
+                self._in_flight = batch
+                try:
+                    await self._flush_batch(batch)
+                    self.flushed += len(batch)
+                    self.batches += 1
+                except Exception:
+                    logger.exception("❌ כשל בכתיבת אצווה מהחוצץ")
+                finally:
+                    self._in_flight = []
+                    for _ in batch:
+                        self._slots.release()
+
+            if self._after_flush:
+                try:
+                    await self._after_flush()
+                except Exception:
+                    logger.exception("❌ כשל בפעולה שלאחר כתיבת החוצץ")
+
+    def has_pending(self, predicate: Callable[[Any], bool]) -> bool:
+        """האם יש פריט שממתין (או נכתב כרגע) שעונה על התנאי"""
+        return any(predicate(item) for item in self._in_flight) or any(
+            predicate(item) for item in self._items
+        )
+
+    async def flush(self):
+        """כתיבה מיידית של כל מה שממתין (בלי לעצור את משימת הרקע)"""
+        if self._drain_lock is None:
+            return
+        await self._drain()
+
+    async def close(self):
+        """כתיבת כל מה שממתין ועצירת משימת הרקע"""
+        self._closing = True
+        if self._task and not self._task.done():
+            self._wakeup.set()
+            await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._items),
+            "max_pending": self.max_pending,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+
+class AsyncTTLCache:
+    """
+    מטמון read-through אסינכרוני: זמן חיים לכל רשומה, גודל חסום (LRU),
+    ואיחוד החטאות מקבילות לאותו מפתח לשליפה אחת
+    """
+
+    def __init__(self, ttl_seconds: float = USER_CACHE_TTL_SECONDS, max_size: int = USER_CACHE_MAX_SIZE):
+        """
+        Args:
+            ttl_seconds: זמן חיים לרשומה (0 = ללא מטמון)
+            max_size: מקסימום רשומות
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max(max_size, 1)
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Any, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        שליפה מהמטמון, או טעינה עם loader בהחטאה
+
+        Returns:
+            עותק של הערך (שינוי שלו לא משפיע על המטמון)
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # שליפה לאותו מפתח כבר רצה - ממתינים לה במקום לשלוח עוד אחת
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_exception(e)
+            # מונע אזהרת "exception was never retrieved" כשאין ממתינים
+            future.exception()
+            raise
+
+        # אם הרשומה בוטלה בזמן הטעינה (כתיבה במקביל) - לא שומרים ערך שאולי ישן
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            self._store(key, value)
+        future.set_result(value)
+        return copy.deepcopy(value)
+
+    def _store(self, key: Any, value: Any):
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put(self, key: Any, value: Any):
+        """עדכון רשומה אחרי כתיבה שהערך שלה ידוע"""
+        self._inflight.pop(key, None)
+        self._store(key, copy.deepcopy(value))
+
+    def invalidate(self, key: Any):
+        """הסרת רשומה (אחרי כתיבה)"""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
 
 class Database:
     """
@@ -38,6 +427,20 @@ class Database:
         self.db = None
         self.thoughts_collection = None
         self.users_collection = None
+        self.keyword_stats_collection = None
+        self.keyword_df_collection = None
+        self.keyword_user_df_collection = None
+        self.summaries_collection = None
+        # Write-behind (אופציונלי) - מחשבות חדשות נכתבות באצוות
+        self.write_behind: Optional[WriteBehindBuffer] = None
+        if MONGODB_WRITE_BEHIND_ENABLED:
+            self.write_behind = WriteBehindBuffer(
+                self._flush_thought_batch,
+                after_flush=self._flush_pending_user_stats
+            )
+        self._pending_stats_users: Set[int] = set()
+        # מטמון מסמכי משתמשים (כל כתיבה דרך Database מבטלת את הרשומה)
+        self.user_cache = AsyncTTLCache()
     
     async def connect(self):
         """
@@ -67,9 +470,17 @@ class Database:
 
             self.thoughts_collection = self.db.thoughts
             self.users_collection = self.db.users
+            self.keyword_stats_collection = self.db.keyword_stats
+            # שכיחות גלובלית - מסמך לכל מילה ({_id: מילה, df})
+            self.keyword_df_collection = self.db.keyword_df
+            # שכיחות לכל משתמש - מסמך לכל (משתמש, מילה) ({_id: "user_id:מילה", user_id, df})
+            self.keyword_user_df_collection = self.db.keyword_user_df
+            self.summaries_collection = self.db.user_summaries
 
             # יצירת אינדקסים
             await self._create_indexes()
+            await self._migrate_global_keyword_df()
+            await self._migrate_user_keyword_df()
 
             logger.info("✅ התחברות למונגו DB הצליחה")
             return True
@@ -81,34 +492,113 @@ class Database:
     
     async def _create_indexes(self):
         """
-        יצירת אינדקסים לביצועים מיטביים
+        יצירת אינדקסים לפי צורות השאילתות בפועל (כל שאילתה מסננת לפי user_id + status).
+        אינדקסים ישנים מוסרים פעם אחת, רק אחרי שהמחליף שלהם קיים.
+        לבדיקת התוכניות: python verify_indexes.py
         """
         try:
-            # אינדקס על user_id ותאריך (לשליפות מהירות)
-            await self.thoughts_collection.create_index([
+            existing = set(await self.thoughts_collection.index_information())
+        except Exception as e:
+            logger.error(f"⚠️ שגיאה בקריאת האינדקסים הקיימים: {e}")
+            existing = set()
+
+        indexes = [
+            # רשימות/סיכומים/סקירה: user_id + status, מיון לפי תאריך (ו-_id לעימוד יציב)
+            (self.thoughts_collection, [
+                ("user_id", 1),
+                ("status", 1),
+                ("created_at", -1),
+                ("_id", -1)
+            ], {"name": "user_status_created"}),
+
+            # אינדקס חלקי למחשבות פעילות בלבד (רוב השאילתות) - קטן יותר ונשאר בזיכרון
+            (self.thoughts_collection, [
                 ("user_id", 1),
+                ("created_at", -1),
+                ("_id", -1)
+            ], {
+                "name": "active_user_created",
+                "partialFilterExpression": {"status": THOUGHT_STATUS["ACTIVE"]}
+            }),
+
+            # ספירת מחשבות השבוע לכל המשתמשים (תזכורת הסקירה השבועית)
+            (self.thoughts_collection, [
                 ("created_at", -1)
-            ])
-            
-            # אינדקס טקסט לחיפוש (Full Text Search)
-            await self.thoughts_collection.create_index([
-                ("raw_text", "text")
-            ])
-            
-            # אינדקס על קטגוריות
-            await self.thoughts_collection.create_index([
-                ("nlp_analysis.category", 1)
-            ])
-            
-            # אינדקס על סטטוס
-            await self.thoughts_collection.create_index([
-                ("status", 1)
-            ])
-            
+            ], {
+                "name": "active_created",
+                "partialFilterExpression": {"status": THOUGHT_STATUS["ACTIVE"]}
+            }),
+
+            # משתמשים - שליפה לפי user_id
+            (self.users_collection, [
+                ("user_id", 1)
+            ], {"name": "user_id"}),
+        ]
+
+        created = 0
+        for collection, keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+                created += 1
+                if collection is self.thoughts_collection:
+                    existing.add(options["name"])
+            except Exception as e:
+                logger.error(f"⚠️ שגיאה ביצירת אינדקס {options['name']}: {e}")
+
+        if await self._create_text_index(existing):
+            created += 1
+
+        # הסרת אינדקסים ישנים שהמחליף שלהם כבר קיים (אחרי ההסרה - לא רץ שוב)
+        for legacy_index, replacement in LEGACY_THOUGHT_INDEXES.items():
+            if legacy_index not in existing or replacement not in existing:
+                continue
+            try:
+                await self.thoughts_collection.drop_index(legacy_index)
+                existing.discard(legacy_index)
+                logger.info(f"🧹 אינדקס ישן הוסר: {legacy_index} (הוחלף ב-{replacement})")
+            except OperationFailure:
+                pass
+            except Exception as e:
+                logger.error(f"⚠️ שגיאה בהסרת אינדקס {legacy_index}: {e}")
+
+        if created == len(indexes) + 1:
             logger.info("✅ אינדקסים נוצרו בהצלחה")
-            
+
+    async def _create_text_index(self, existing: Set[str]) -> bool:
+        """
+        אינדקס טקסט עם קידומת user_id - כל חיפוש נשאר בתוך המחשבות של המשתמש.
+        מותר אינדקס טקסט אחד לאוסף, ולכן הישן מוסר רגע לפני היצירה
+        ומשוחזר אם היצירה נכשלה.
+
+        Returns:
+            האם האינדקס קיים בסיום
+        """
+        if "user_raw_text" in existing:
+            return True
+
+        legacy_name, legacy_keys = _LEGACY_TEXT_INDEX
+        had_legacy = legacy_name in existing
+        try:
+            if had_legacy:
+                await self.thoughts_collection.drop_index(legacy_name)
+                existing.discard(legacy_name)
+            await self.thoughts_collection.create_index(
+                [("user_id", 1), ("raw_text", "text")],
+                name="user_raw_text"
+            )
+            existing.add("user_raw_text")
+            if had_legacy:
+                logger.info(f"🧹 אינדקס ישן הוסר: {legacy_name} (הוחלף ב-user_raw_text)")
+            return True
         except Exception as e:
-            logger.error(f"⚠️ שגיאה ביצירת אינדקסים: {e}")
+            logger.error(f"⚠️ שגיאה ביצירת אינדקס user_raw_text: {e}")
+            if had_legacy and legacy_name not in existing:
+                try:
+                    await self.thoughts_collection.create_index(legacy_keys, name=legacy_name)
+                    existing.add(legacy_name)
+                except Exception as restore_error:
+                    logger.error(f"❌ שגיאה בשחזור אינדקס {legacy_name}: {restore_error}")
+            return False
     
     async def close(self):
         """
@@ -122,9 +612,73 @@ class Database:
         self.db = None
         self.thoughts_collection = None
         self.users_collection = None
+        self.keyword_stats_collection = None
+        self.keyword_df_collection = None
+        self.keyword_user_df_collection = None
+        self.summaries_collection = None
+
+    async def flush_pending_writes(self):
+        """
+        שמירת כל מה שמוחזק בזיכרון וטרם נכתב (לפני כיבוי)
+        """
+        if self.write_behind:
+            await self.write_behind.close()
+        await self._flush_pending_user_stats()
+        await self.persist_keyword_stats()
     
     # ===== פעולות על מחשבות (Thoughts) =====
     
+    def _build_thought(
+        self,
+        user_id: int,
+        raw_text: str,
+        nlp_analysis: Dict[str, Any],
+        metadata: Optional[Dict] = None,
+        keyword_candidates: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        בניית מסמך מחשבה לשמירה (מוני מילות המפתח של המשתמש חייבים להיות טעונים)
+
+        Returns:
+            (מסמך המחשבה, מילות המועמדות לעדכון מוני השכיחות)
+        """
+        # דירוג מילות מפתח לפי TF-IDF (מעדכן את הניתוח במקום)
+        if keyword_candidates is None:
+            keyword_candidates = nlp.keyword_candidates(raw_text)
+        nlp_analysis["keywords"] = keyword_engine.rank(user_id, keyword_candidates)
+
+        # חתימת MinHash לחיפוש דומים (נשמרת כדי לבנות את האינדקס מחדש אחרי הפעלה)
+        signature = similarity_index.signature_for_tokens(nlp.tokenize(raw_text))
+
+        thought = {
+            "user_id": user_id,
+            "raw_text": raw_text,
+            "created_at": datetime.utcnow(),
+            "nlp_analysis": nlp_analysis,
+            "status": THOUGHT_STATUS["ACTIVE"],
+            "metadata": metadata or {}
+        }
+        if signature:
+            thought["minhash"] = signature
+
+        return thought, keyword_candidates
+
+    async def _record_inserted(self, user_id: int, thoughts: List[Dict[str, Any]]):
+        """
+        עדכון המונים והסיכום המצטבר אחרי כתיבת מחשבות חדשות (פעילות)
+        """
+        await self._inc_user_counters(user_id, {THOUGHT_STATUS["ACTIVE"]: len(thoughts)})
+        await self._inc_user_summary(user_id, [thought["nlp_analysis"] for thought in thoughts], 1)
+
+    def _on_thought_inserted(self, thought: Dict[str, Any], keyword_candidates: List[str]):
+        """
+        עדכון המבנים שבזיכרון אחרי שמחשבה נכתבה בהצלחה
+        """
+        keyword_engine.observe(thought["user_id"], keyword_candidates)
+        similarity_index.add(thought["user_id"], str(thought["_id"]), thought.get("minhash"))
+        if search_index.is_user_loaded(thought["user_id"]):
+            search_index.add(thought["user_id"], thought, nlp.tokenize(thought["raw_text"]))
+
     async def save_thought(
         self,
         user_id: int,
@@ -145,23 +699,143 @@ class Database:
             מזהה המחשבה שנשמרה
         """
         try:
-            thought = {
-                "user_id": user_id,
-                "raw_text": raw_text,
-                "created_at": datetime.utcnow(),
-                "nlp_analysis": nlp_analysis,
-                "status": THOUGHT_STATUS["ACTIVE"],
-                "metadata": metadata or {}
-            }
+            keyword_candidates = nlp.keyword_candidates(raw_text)
+            await self._ensure_keyword_stats_loaded(user_id, keyword_candidates)
+            thought, keyword_candidates = self._build_thought(
+                user_id, raw_text, nlp_analysis, metadata, keyword_candidates
+            )
+
+            if self.write_behind:
+                # מזהה נקבע בצד הלקוח - זמין מיד לכפתורי התגובה
+                thought["_id"] = ObjectId()
+                await self.write_behind.put((thought, keyword_candidates))
+                return str(thought["_id"])
             
             result = await self.thoughts_collection.insert_one(thought)
             logger.info(f"💾 מחשבה נשמרה: {result.inserted_id}")
+
+            self._on_thought_inserted(thought, keyword_candidates)
+            await self._record_inserted(user_id, [thought])
             
             return str(result.inserted_id)
             
         except Exception as e:
             logger.error(f"❌ שגיאה בשמירת מחשבה: {e}")
             raise
+
+    async def save_thoughts_bulk(
+        self,
+        user_id: int,
+        records: List[Tuple[str, Dict[str, Any], Optional[Dict]]],
+        batch_size: int = MONGODB_INSERT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        שמירת מחשבות מרובות ב-insert_many לא מסודר (unordered), בחלוקה לאצוות
+
+        Args:
+            user_id: מזהה המשתמש
+            records: רשימת (טקסט מקורי, ניתוח NLP, metadata)
+            batch_size: מקסימום מסמכים לכל insert_many
+
+        Returns:
+            {"inserted_ids": [...], "errors": [{"index": i, "error": "..."}]}
+            (index מתייחס למיקום ב-records)
+        """
+        inserted_ids: List[str] = []
+        inserted: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        if not records:
+            return {"inserted_ids": inserted_ids, "errors": errors}
+
+        candidates_per_record = [nlp.keyword_candidates(raw_text) for raw_text, _, _ in records]
+        await self._ensure_keyword_stats_loaded(
+            user_id, [term for candidates in candidates_per_record for term in candidates]
+        )
+
+        prepared = []
+        for (raw_text, nlp_analysis, metadata), keyword_candidates in zip(records, candidates_per_record):
+            thought, keyword_candidates = self._build_thought(
+                user_id, raw_text, nlp_analysis, metadata, keyword_candidates
+            )
+            # מזהה נקבע בצד הלקוח כדי לדעת בדיוק אילו מסמכים נכשלו
+            thought["_id"] = ObjectId()
+            prepared.append((thought, keyword_candidates))
+
+        batch_size = max(batch_size, 1)
+        for start in range(0, len(prepared), batch_size):
+            chunk = prepared[start:start + batch_size]
+            failed: Dict[int, str] = {}
+
+            try:
+                await self.thoughts_collection.insert_many(
+                    [thought for thought, _ in chunk],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed[write_error["index"]] = write_error.get("errmsg", "write error")
+            except Exception as e:
+                logger.error(f"❌ שגיאה בשמירה מרובה: {e}")
+                failed = {offset: str(e) for offset in range(len(chunk))}
+
+            for offset, (thought, keyword_candidates) in enumerate(chunk):
+                if offset in failed:
+                    errors.append({"index": start + offset, "error": failed[offset]})
+                    continue
+                inserted_ids.append(str(thought["_id"]))
+                inserted.append(thought)
+                self._on_thought_inserted(thought, keyword_candidates)
+
+        if inserted:
+            await self._record_inserted(user_id, inserted)
+
+        logger.info(f"💾 נשמרו {len(inserted_ids)}/{len(records)} מחשבות בשמירה מרובה (user_id={user_id})")
+
+        return {"inserted_ids": inserted_ids, "errors": errors}
+
+    async def _flush_thought_batch(self, batch: List[Tuple[Dict[str, Any], List[str]]]):
+        """
+        כתיבת אצווה מחוצץ ה-write-behind (ניסיון חוזר בשגיאות רשת)
+        """
+        failed: Dict[int, str] = {}
+        for attempt in range(1, _WRITE_BEHIND_MAX_ATTEMPTS + 1):
+            try:
+                await self.thoughts_collection.insert_many(
+                    [thought for thought, _ in batch],
+                    ordered=False
+                )
+                break
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed[write_error["index"]] = write_error.get("errmsg", "write error")
+                break
+            except Exception as e:
+                if attempt == _WRITE_BEHIND_MAX_ATTEMPTS:
+                    logger.error(f"❌ אצווה של {len(batch)} מחשבות לא נכתבה: {e}")
+                    return
+                logger.warning(f"⚠️ כשל בכתיבת אצווה (ניסיון {attempt}): {e}")
+                await asyncio.sleep(0.5 * attempt)
+
+        inserted_per_user: Dict[int, List[Dict[str, Any]]] = {}
+        for offset, (thought, keyword_candidates) in enumerate(batch):
+            if offset in failed:
+                logger.error(f"❌ מחשבה {thought['_id']} לא נכתבה: {failed[offset]}")
+                continue
+            self._on_thought_inserted(thought, keyword_candidates)
+            inserted_per_user.setdefault(thought["user_id"], []).append(thought)
+
+        for user_id, thoughts in inserted_per_user.items():
+            await self._record_inserted(user_id, thoughts)
+
+        logger.info(f"💾 נכתבו {len(batch) - len(failed)} מחשבות מהחוצץ")
+
+    def user_cache_stats(self) -> Dict[str, Any]:
+        """מדדי מטמון מסמכי המשתמשים"""
+        return self.user_cache.stats()
+
+    def write_behind_stats(self) -> Optional[Dict[str, Any]]:
+        """מדדי חוצץ ה-write-behind (None כשהוא כבוי)"""
+        return self.write_behind.stats() if self.write_behind else None
     
     async def get_user_thoughts(
         self,
@@ -172,7 +846,9 @@ class Database:
         topic: Optional[str] = None,
         status: Optional[str] = None,
         from_date: Optional[datetime] = None,
-        to_date: Optional[datetime] = None
+        to_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        projection: Optional[str] = None
     ) -> List[Dict]:
         """
         שליפת מחשבות של משתמש עם אפשרויות סינון
@@ -180,46 +856,39 @@ class Database:
         Args:
             user_id: מזהה המשתמש
             limit: מקסימום תוצאות
-            skip: דילוג על תוצאות (לעימוד)
+            skip: דילוג על תוצאות (לעימוד ישן - עדיף after)
             category: סינון לפי קטגוריה
             topic: סינון לפי נושא
             status: סינון לפי סטטוס
             from_date: מתאריך
             to_date: עד תאריך
+            after: (created_at, _id) של הפריט האחרון בעמוד הקודם (עימוד keyset)
+            projection: פרופיל שדות ("preview"/"detail"/"export", None = מסמך מלא)
         
         Returns:
-            רשימת מחשבות
+            רשימת מחשבות (מהחדשה לישנה)
         """
         try:
-            # בניית query
-            query = {"user_id": user_id}
-            
-            if category:
-                query["nlp_analysis.category"] = category
-            
-            if topic:
-                query["nlp_analysis.topics"] = topic
-            
-            if status:
-                query["status"] = status
-            else:
-                # ברירת מחדל - רק מחשבות פעילות
-                query["status"] = THOUGHT_STATUS["ACTIVE"]
-            
-            # סינון תאריכים
-            if from_date or to_date:
-                query["created_at"] = {}
-                if from_date:
-                    query["created_at"]["$gte"] = from_date
-                if to_date:
-                    query["created_at"]["$lte"] = to_date
+            # מחשבות שעדיין בחוצץ ה-write-behind חייבות להופיע ברשימה
+            await self._flush_user_writes(user_id)
+            query = self._thoughts_query(user_id, category, topic, status, from_date, to_date)
+
+            if after:
+                # עימוד keyset: רק פריטים "אחרי" הפריט האחרון - שאילתת טווח אחת על האינדקס
+                after_created_at, after_id = after
+                query["$or"] = [
+                    {"created_at": {"$lt": after_created_at}},
+                    {"created_at": after_created_at, "_id": {"$lt": after_id}},
+                ]
             
             # שליפה
-            cursor = self.thoughts_collection.find(query).sort(
-                "created_at", -1
+            cursor = self.thoughts_collection.find(query, thought_projection(projection)).sort(
+                [("created_at", -1), ("_id", -1)]
             ).skip(skip).limit(limit)
             
             thoughts = await cursor.to_list(length=limit)
+            if projection == "preview":
+                _truncate_previews(thoughts)
             
             logger.info(f"📥 נשלפו {len(thoughts)} מחשבות למשתמש {user_id}")
             
@@ -229,14 +898,165 @@ class Database:
             logger.error(f"❌ שגיאה בשליפת מחשבות: {e}")
             return []
 
+    def _thoughts_query(
+        self,
+        user_id: int,
+        category: Optional[str] = None,
+        topic: Optional[str] = None,
+        status: Optional[str] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        בניית query לשליפת מחשבות של משתמש
+        """
+        query: Dict[str, Any] = {"user_id": user_id}
+        
+        if category:
+            query["nlp_analysis.category"] = category
+        
+        if topic:
+            query["nlp_analysis.topics"] = topic
+        
+        if status:
+            query["status"] = status
+        else:
+            # ברירת מחדל - רק מחשבות פעילות
+            query["status"] = THOUGHT_STATUS["ACTIVE"]
+        
+        # סינון תאריכים
+        if from_date or to_date:
+            query["created_at"] = {}
+            if from_date:
+                query["created_at"]["$gte"] = from_date
+            if to_date:
+                query["created_at"]["$lte"] = to_date
+
+        return query
+
+    async def get_thoughts_page(
+        self,
+        user_id: int,
+        page_token: Optional[str] = None,
+        page_size: int = 10,
+        status: Optional[str] = None,
+        from_date: Optional[datetime] = None,
+        projection: Optional[str] = "preview"
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        שליפת עמוד של מחשבות בעימוד keyset על (created_at, _id)
+        
+        Args:
+            user_id: מזהה המשתמש
+            page_token: טוקן העמוד (None לעמוד הראשון)
+            page_size: מספר פריטים בעמוד
+            status: סינון לפי סטטוס (ברירת מחדל: פעילות)
+            from_date: מתאריך
+            projection: פרופיל שדות (created_at ו-_id נדרשים לטוקן)
+        
+        Returns:
+            (מחשבות העמוד, טוקן לעמוד הבא או None אם זה העמוד האחרון)
+        """
+        after = decode_page_token(page_token) if page_token else None
+
+        # פריט אחד נוסף מגלה אם יש עמוד הבא, בלי ספירה
+        thoughts = await self.get_user_thoughts(
+            user_id=user_id,
+            limit=page_size + 1,
+            status=status,
+            from_date=from_date,
+            after=after,
+            projection=projection
+        )
+
+        next_token = None
+        if len(thoughts) > page_size:
+            thoughts = thoughts[:page_size]
+            last = thoughts[-1]
+            next_token = encode_page_token(last["created_at"], last["_id"])
+
+        return thoughts, next_token
+
+    async def count_user_thoughts(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        from_date: Optional[datetime] = None
+    ) -> int:
+        """
+        ספירת מחשבות (לכותרות של רשימות מעומדות)
+        """
+        try:
+            await self._flush_user_writes(user_id)
+            return await self.thoughts_collection.count_documents(
+                self._thoughts_query(user_id, status=status, from_date=from_date)
+            )
+        except Exception as e:
+            logger.error(f"❌ שגיאה בספירת מחשבות: {e}")
+            return 0
+
+    def _export_query(self, user_id: int) -> Dict[str, Any]:
+        # $in על הסטטוס (ולא $ne) - מאפשר ל-user_status_created למזג טווחים ממוינים בלי SORT
+        return {"user_id": user_id, "status": {"$in": EXPORT_STATUSES}}
+
+    async def count_export_thoughts(self, user_id: int, limit: int = MAX_EXPORT_SIZE) -> int:
+        """
+        ספירת המחשבות שייכללו בייצוא (לדיווח התקדמות)
+        """
+        try:
+            await self._flush_user_writes(user_id)
+            return await self.thoughts_collection.count_documents(
+                self._export_query(user_id), limit=limit
+            )
+        except Exception as e:
+            logger.error(f"❌ שגיאה בספירת מחשבות לייצוא: {e}")
+            return 0
+
+    async def iter_export_batches(
+        self,
+        user_id: int,
+        limit: int = MAX_EXPORT_SIZE,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        מעבר על מחשבות המשתמש לייצוא באצוות (מהחדשה לישנה).
+        הסמן מחזיק בכל רגע אצווה אחת בלבד - הזיכרון לא תלוי בכמות המחשבות.
+        
+        Args:
+            user_id: מזהה המשתמש
+            limit: מקסימום מחשבות בייצוא
+            batch_size: גודל אצווה (גם batch_size של הסמן)
+        
+        Yields:
+            רשימות מחשבות בפרופיל "export"
+        """
+        batch_size = max(batch_size, 1)
+        await self._flush_user_writes(user_id)
+        cursor = self.thoughts_collection.find(
+            self._export_query(user_id), THOUGHT_PROJECTIONS["export"]
+        ).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit).batch_size(batch_size)
+
+        batch: List[Dict] = []
+        async for thought in cursor:
+            batch.append(thought)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     async def get_thought_by_id(
         self,
         user_id: int,
         thought_id: str,
-        include_archived: bool = True
+        include_archived: bool = True,
+        projection: Optional[str] = "detail"
     ) -> Optional[Dict]:
         """
         שליפת מחשבה בודדת לפי מזהה, כולל וידוא שייכות למשתמש.
+        projection: פרופיל שדות (None = מסמך מלא)
         """
         try:
             from bson import ObjectId
@@ -251,12 +1071,14 @@ class Database:
             status_filter = THOUGHT_STATUS["ACTIVE"]
 
         try:
+            await self._flush_pending_writes(lambda thought: thought["_id"] == object_id)
             thought = await self.thoughts_collection.find_one(
                 {
                     "_id": object_id,
                     "user_id": user_id,
                     "status": status_filter,
-                }
+                },
+                thought_projection(projection)
             )
             return thought
         except Exception as e:
@@ -270,7 +1092,8 @@ class Database:
         limit: int = 20
     ) -> List[Dict]:
         """
-        חיפוש טקסט חופשי במחשבות
+        חיפוש טקסט חופשי במחשבות - מילים חלקיות ואותיות שימוש בעברית.
+        החיפוש רץ באינדקס בזיכרון; בפעם הראשונה למשתמש נטענות מחשבותיו הפעילות.
         
         Args:
             user_id: מזהה המשתמש
@@ -281,7 +1104,46 @@ class Database:
             רשימת מחשבות מתאימות
         """
         try:
-            # חיפוש עם MongoDB text search
+            # מחשבה שעדיין בחוצץ נכנסת לאינדקס רק כשהיא נכתבת
+            await self._flush_user_writes(user_id)
+            await self._ensure_search_index_loaded(user_id)
+            results = search_index.search(user_id, nlp.tokenize(search_term), limit=limit)
+            
+            logger.info(f"🔍 נמצאו {len(results)} תוצאות עבור '{search_term}'")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ שגיאה בחיפוש באינדקס, מעבר לחיפוש טקסט במונגו: {e}")
+            return await self._text_search_thoughts(user_id, search_term, limit)
+
+    async def _ensure_search_index_loaded(self, user_id: int):
+        """
+        טעינה עצלה של אינדקס החיפוש של המשתמש (שליפה אחת של המחשבות הפעילות)
+        """
+        if search_index.is_user_loaded(user_id):
+            return
+
+        cursor = self.thoughts_collection.find(
+            {"user_id": user_id, "status": THOUGHT_STATUS["ACTIVE"]},
+            {"raw_text": 1, "created_at": 1, "nlp_analysis.category": 1}
+        )
+        thoughts = [
+            (thought, nlp.tokenize(thought.get("raw_text") or ""))
+            async for thought in cursor
+        ]
+        search_index.load_user(user_id, thoughts)
+
+    async def _text_search_thoughts(
+        self,
+        user_id: int,
+        search_term: str,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        חיפוש עם MongoDB text search (גיבוי כשאינדקס הזיכרון לא זמין)
+        """
+        try:
             query = {
                 "user_id": user_id,
                 "status": THOUGHT_STATUS["ACTIVE"],
@@ -290,16 +1152,12 @@ class Database:
             
             cursor = self.thoughts_collection.find(
                 query,
-                {"score": {"$meta": "textScore"}}
+                {**THOUGHT_PROJECTIONS["preview"], "score": {"$meta": "textScore"}}
             ).sort(
                 [("score", {"$meta": "textScore"})]
             ).limit(limit)
             
-            results = await cursor.to_list(length=limit)
-            
-            logger.info(f"🔍 נמצאו {len(results)} תוצאות עבור '{search_term}'")
-            
-            return results
+            return _truncate_previews(await cursor.to_list(length=limit))
             
         except Exception as e:
             logger.error(f"❌ שגיאה בחיפוש: {e}")
@@ -308,7 +1166,9 @@ class Database:
     async def get_thoughts_by_date_range(
         self,
         user_id: int,
-        days_back: int = 1
+        days_back: int = 1,
+        limit: int = 100,
+        projection: Optional[str] = None
     ) -> List[Dict]:
         """
         שליפת מחשבות מטווח זמן אחורה
@@ -316,16 +1176,17 @@ class Database:
         Args:
             user_id: מזהה המשתמש
             days_back: כמה ימים אחורה
+            limit: מקסימום תוצאות
+            projection: פרופיל שדות (None = מסמך מלא)
         
         Returns:
             רשימת מחשבות
         """
-        from_date = datetime.utcnow() - timedelta(days=days_back)
-        
         return await self.get_user_thoughts(
             user_id=user_id,
-            from_date=from_date,
-            limit=100
+            from_date=days_ago(days_back),
+            limit=limit,
+            projection=projection
         )
     
     async def get_category_summary(self, user_id: int) -> Dict[str, int]:
@@ -363,46 +1224,141 @@ class Database:
             return summary
             
         except Exception as e:
-            logger.error(f"❌ שגיאה בסיכום קטגוריות: {e}")
-            return {}
-    
-    async def get_topic_summary(self, user_id: int) -> Dict[str, int]:
+            logger.error(f"❌ שגיאה בסיכום קטגוריות: {e}")
+            return {}
+    
+    async def get_topic_summary(self, user_id: int) -> Dict[str, int]:
+        """
+        סיכום כמות מחשבות לפי נושאים
+        
+        Args:
+            user_id: מזהה המשתמש
+        
+        Returns:
+            מילון: {נושא: כמות}
+        """
+        try:
+            pipeline = [
+                {
+                    "$match": {
+                        "user_id": user_id,
+                        "status": THOUGHT_STATUS["ACTIVE"]
+                    }
+                },
+                {"$unwind": "$nlp_analysis.topics"},
+                {
+                    "$group": {
+                        "_id": "$nlp_analysis.topics",
+                        "count": {"$sum": 1}
+                    }
+                },
+                {"$sort": {"count": -1}}
+            ]
+            
+            results = await self.thoughts_collection.aggregate(pipeline).to_list(None)
+            
+            summary = {item["_id"]: item["count"] for item in results if item["_id"]}
+            
+            return summary
+            
+        except Exception as e:
+            logger.error(f"❌ שגיאה בסיכום נושאים: {e}")
+            return {}
+    
+    # ===== סיכום מצטבר (קטגוריות/נושאים) =====
+
+    async def get_user_summary(self, user_id: int) -> Dict[str, Dict[str, int]]:
+        """
+        סיכום קטגוריות ונושאים של המחשבות הפעילות - ממסמך סיכום אחד.
+        אם המסמך לא קיים הוא נבנה מחדש מהמחשבות.
+        
+        Args:
+            user_id: מזהה המשתמש
+        
+        Returns:
+            {"categories": {קטגוריה: כמות}, "topics": {נושא: כמות}}
+        """
+        try:
+            summary = await self.summaries_collection.find_one({"_id": user_id})
+            if summary is None:
+                return await self.rebuild_user_summary(user_id)
+
+            return {
+                "categories": {k: v for k, v in (summary.get("categories") or {}).items() if v > 0},
+                "topics": {k: v for k, v in (summary.get("topics") or {}).items() if v > 0},
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ שגיאה בשליפת סיכום משתמש: {e}")
+            return {"categories": {}, "topics": {}}
+
+    async def rebuild_user_summary(self, user_id: int) -> Dict[str, Dict[str, int]]:
+        """
+        בנייה מחדש של מסמך הסיכום מתוך המחשבות הפעילות
+        
+        Args:
+            user_id: מזהה המשתמש
+        
+        Returns:
+            הסיכום שנבנה
+        """
+        categories = await self.get_category_summary(user_id)
+        topics = await self.get_topic_summary(user_id)
+
+        try:
+            await self.summaries_collection.replace_one(
+                {"_id": user_id},
+                {
+                    "categories": categories,
+                    "topics": topics,
+                    "rebuilt_at": datetime.utcnow(),
+                },
+                upsert=True
+            )
+            logger.info(f"📊 סיכום מצטבר נבנה מחדש למשתמש {user_id}")
+        except Exception as e:
+            logger.error(f"❌ שגיאה בשמירת סיכום משתמש: {e}")
+
+        return {"categories": categories, "topics": topics}
+
+    async def invalidate_user_summary(self, user_id: int):
+        """
+        מחיקת מסמך הסיכום (ייבנה מחדש בקריאה הבאה)
+        """
+        try:
+            await self.summaries_collection.delete_one({"_id": user_id})
+        except Exception as e:
+            logger.error(f"❌ שגיאה במחיקת סיכום משתמש: {e}")
+
+    async def _inc_user_summary(self, user_id: int, analyses: List[Optional[Dict[str, Any]]], sign: int):
         """
-        סיכום כמות מחשבות לפי נושאים
-        
+        עדכון $inc של מסמך הסיכום
+
         Args:
             user_id: מזהה המשתמש
-        
-        Returns:
-            מילון: {נושא: כמות}
+            analyses: ניתוחי ה-NLP של המחשבות שנוספו/הוסרו
+            sign: 1 להוספה, -1 להסרה
         """
+        inc: Dict[str, int] = {}
+        for analysis in analyses:
+            analysis = analysis or {}
+            category = analysis.get("category")
+            if category:
+                key = f"categories.{category}"
+                inc[key] = inc.get(key, 0) + sign
+            for topic in set(analysis.get("topics") or []):
+                key = f"topics.{topic}"
+                inc[key] = inc.get(key, 0) + sign
+
+        if not inc:
+            return
+
         try:
-            pipeline = [
-                {
-                    "$match": {
-                        "user_id": user_id,
-                        "status": THOUGHT_STATUS["ACTIVE"]
-                    }
-                },
-                {"$unwind": "$nlp_analysis.topics"},
-                {
-                    "$group": {
-                        "_id": "$nlp_analysis.topics",
-                        "count": {"$sum": 1}
-                    }
-                },
-                {"$sort": {"count": -1}}
-            ]
-            
-            results = await self.thoughts_collection.aggregate(pipeline).to_list(None)
-            
-            summary = {item["_id"]: item["count"] for item in results if item["_id"]}
-            
-            return summary
-            
+            # ללא upsert: אם אין מסמך הוא ייבנה מחדש במלואו בקריאה הבאה
+            await self.summaries_collection.update_one({"_id": user_id}, {"$inc": inc})
         except Exception as e:
-            logger.error(f"❌ שגיאה בסיכום נושאים: {e}")
-            return {}
+            logger.error(f"❌ שגיאה בעדכון סיכום משתמש: {e}")
+            await self.invalidate_user_summary(user_id)
     
     async def update_thought_status(
         self,
@@ -420,14 +1376,43 @@ class Database:
             האם העדכון הצליח
         """
         try:
-            from bson import ObjectId
-            
-            result = await self.thoughts_collection.update_one(
-                {"_id": ObjectId(thought_id)},
-                {"$set": {"status": new_status}}
+            object_id = ObjectId(thought_id)
+            # מחשבה שעדיין בחוצץ ה-write-behind לא קיימת במסד - כותבים אותה קודם
+            await self._flush_pending_writes(lambda thought: thought["_id"] == object_id)
+
+            # המסמך לפני העדכון - נדרש הסטטוס הקודם לעדכון המונים
+            previous = await self.thoughts_collection.find_one_and_update(
+                {"_id": object_id, "status": {"$ne": new_status}},
+                {"$set": {"status": new_status}},
+                projection={
+                    "user_id": 1,
+                    "status": 1,
+                    "minhash": 1,
+                    "raw_text": 1,
+                    "created_at": 1,
+                    "nlp_analysis.category": 1,
+                    "nlp_analysis.topics": 1,
+                }
             )
+            if not previous:
+                return False
+
+            user_id = previous["user_id"]
+            await self._inc_user_counters(user_id, {previous.get("status"): -1, new_status: 1})
+
+            was_active = previous.get("status") == THOUGHT_STATUS["ACTIVE"]
+            if was_active != (new_status == THOUGHT_STATUS["ACTIVE"]):
+                await self._inc_user_summary(user_id, [previous.get("nlp_analysis")], -1 if was_active else 1)
+
+            if new_status == THOUGHT_STATUS["ACTIVE"]:
+                similarity_index.add(user_id, thought_id, previous.get("minhash"))
+                if search_index.is_user_loaded(user_id):
+                    search_index.add(user_id, previous, nlp.tokenize(previous.get("raw_text") or ""))
+            else:
+                similarity_index.remove([thought_id], user_id=user_id)
+                search_index.remove([thought_id], user_id=user_id)
             
-            return result.modified_count > 0
+            return True
             
         except Exception as e:
             logger.error(f"❌ שגיאה בעדכון סטטוס: {e}")
@@ -466,27 +1451,17 @@ class Database:
             if not object_ids:
                 return 0
 
-            result = await self.thoughts_collection.update_many(
-                {
-                    "_id": {"$in": object_ids},
-                    "user_id": user_id,
-                    "status": THOUGHT_STATUS["ACTIVE"],
-                },
-                {
-                    "$set": {
-                        "status": THOUGHT_STATUS["ARCHIVED"],
-                        "archived_at": datetime.utcnow(),
-                    }
-                },
+            modified_count = await self._deactivate_thoughts(
+                user_id, object_ids, THOUGHT_STATUS["ARCHIVED"], "archived_at"
             )
 
             logger.info(
                 "📦 נארכבו %d מחשבות (user_id=%s)",
-                result.modified_count,
+                modified_count,
                 user_id,
             )
 
-            return result.modified_count
+            return modified_count
 
         except Exception as e:
             logger.error(f"❌ שגיאה בארכוב מרובה: {e}")
@@ -524,32 +1499,85 @@ class Database:
             if not object_ids:
                 return 0
 
-            result = await self.thoughts_collection.update_many(
-                {
-                    "_id": {"$in": object_ids},
-                    "user_id": user_id,
-                    "status": THOUGHT_STATUS["ACTIVE"],
-                },
-                {
-                    "$set": {
-                        "status": THOUGHT_STATUS["DELETED"],
-                        "deleted_at": datetime.utcnow(),
-                    }
-                },
+            modified_count = await self._deactivate_thoughts(
+                user_id, object_ids, THOUGHT_STATUS["DELETED"], "deleted_at"
             )
 
             logger.info(
                 "🗑️ נמחקו (soft) %d מחשבות (user_id=%s)",
-                result.modified_count,
+                modified_count,
                 user_id,
             )
 
-            return result.modified_count
+            return modified_count
 
         except Exception as e:
             logger.error(f"❌ שגיאה במחיקה מרובה: {e}")
             return 0
     
+    async def _deactivate_thoughts(
+        self,
+        user_id: int,
+        object_ids: List[ObjectId],
+        new_status: str,
+        timestamp_field: str
+    ) -> int:
+        """
+        העברת מחשבות פעילות לסטטוס לא-פעיל (ארכוב/מחיקה), כולל עדכון
+        המונים, הסיכום המצטבר ואינדקס הדמיון
+
+        Returns:
+            מספר המחשבות שעודכנו
+        """
+        # מחשבות שעדיין בחוצץ ה-write-behind חייבות להיות במסד לפני העדכון
+        pending_ids = set(object_ids)
+        await self._flush_pending_writes(lambda thought: thought["_id"] in pending_ids)
+
+        # הקטגוריות והנושאים של המחשבות נדרשים לעדכון הסיכום המצטבר
+        cursor = self.thoughts_collection.find(
+            {
+                "_id": {"$in": object_ids},
+                "user_id": user_id,
+                "status": THOUGHT_STATUS["ACTIVE"],
+            },
+            {"nlp_analysis.category": 1, "nlp_analysis.topics": 1}
+        )
+        thoughts = await cursor.to_list(length=len(object_ids))
+        if not thoughts:
+            return 0
+
+        result = await self.thoughts_collection.update_many(
+            {
+                "_id": {"$in": [thought["_id"] for thought in thoughts]},
+                "user_id": user_id,
+                "status": THOUGHT_STATUS["ACTIVE"],
+            },
+            {
+                "$set": {
+                    "status": new_status,
+                    timestamp_field: datetime.utcnow(),
+                }
+            },
+        )
+
+        modified_count = result.modified_count
+        if modified_count:
+            removed_ids = [str(thought["_id"]) for thought in thoughts]
+            similarity_index.remove(removed_ids, user_id=user_id)
+            search_index.remove(removed_ids, user_id=user_id)
+            await self._inc_user_counters(user_id, {
+                THOUGHT_STATUS["ACTIVE"]: -modified_count,
+                new_status: modified_count,
+            })
+
+        if modified_count == len(thoughts):
+            await self._inc_user_summary(user_id, [thought.get("nlp_analysis") for thought in thoughts], -1)
+        else:
+            # מחשבה שינתה סטטוס במקביל - לא ידוע מה בדיוק עודכן, בונים מחדש בקריאה הבאה
+            await self.invalidate_user_summary(user_id)
+
+        return modified_count
+
     async def delete_all_user_thoughts(self, user_id: int) -> int:
         """
         מחיקה מוחלטת של כל מחשבות המשתמש
@@ -561,9 +1589,19 @@ class Database:
             כמות המחשבות שנמחקו
         """
         try:
+            # אחרת מחשבות מהחוצץ ייכתבו אחרי המחיקה
+            await self._flush_user_writes(user_id)
             result = await self.thoughts_collection.delete_many(
                 {"user_id": user_id}
             )
+            similarity_index.drop_user(user_id)
+            search_index.drop_user(user_id)
+            await self.users_collection.update_one(
+                {"user_id": user_id},
+                {"$set": {"stats.total_thoughts": 0, "stats.by_status": {}}}
+            )
+            self.user_cache.invalidate(user_id)
+            await self.invalidate_user_summary(user_id)
             
             logger.warning(f"🗑️ נמחקו {result.deleted_count} מחשבות למשתמש {user_id}")
             
@@ -573,8 +1611,291 @@ class Database:
             logger.error(f"❌ שגיאה במחיקת מחשבות: {e}")
             return 0
     
+    # ===== חיפוש דומים (MinHash/LSH) =====
+
+    async def _ensure_similarity_index_loaded(self, user_id: int):
+        """
+        טעינה עצלה של אינדקס הדמיון של המשתמש מהחתימות השמורות.
+        מחשבות ישנות ללא חתימה מקבלות חתימה ונשמרות (backfill).
+        """
+        if similarity_index.is_user_loaded(user_id):
+            return
+
+        query = {"user_id": user_id, "status": THOUGHT_STATUS["ACTIVE"]}
+
+        cursor = self.thoughts_collection.find(
+            {**query, "minhash": {"$exists": True}},
+            {"minhash": 1}
+        )
+        entries = [(str(doc["_id"]), doc.get("minhash")) async for doc in cursor]
+
+        backfill = []
+        cursor = self.thoughts_collection.find(
+            {**query, "minhash": {"$exists": False}},
+            {"raw_text": 1}
+        )
+        async for doc in cursor:
+            signature = similarity_index.signature_for_tokens(nlp.tokenize(doc.get("raw_text") or ""))
+            if not signature:
+                continue
+            entries.append((str(doc["_id"]), signature))
+            backfill.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"minhash": signature}}))
+
+        if backfill:
+            try:
+                await self.thoughts_collection.bulk_write(backfill, ordered=False)
+                logger.info(f"🧬 נוספו חתימות MinHash ל-{len(backfill)} מחשבות ישנות (user_id={user_id})")
+            except Exception as e:
+                logger.error(f"⚠️ שגיאה בשמירת חתימות MinHash: {e}")
+
+        similarity_index.load_user(user_id, entries)
+
+    async def _flush_pending_writes(self, predicate: Callable[[Dict[str, Any]], bool]):
+        """כתיבת החוצץ אם יש בו מחשבה שעונה על התנאי (לפני פעולה שחייבת לראות אותה)"""
+        if self.write_behind and self.write_behind.has_pending(lambda item: predicate(item[0])):
+            await self.write_behind.flush()
+
+    async def _flush_user_writes(self, user_id: int):
+        """כתיבת החוצץ אם יש בו מחשבות של המשתמש"""
+        await self._flush_pending_writes(lambda thought: thought["user_id"] == user_id)
+
+    async def find_similar_thoughts(
+        self,
+        user_id: int,
+        thought_id: str,
+        limit: int = 5
+    ) -> List[Dict]:
+        """
+        חיפוש מחשבות פעילות דומות למחשבה נתונה
+
+        Args:
+            user_id: מזהה המשתמש
+            thought_id: מזהה המחשבה המקורית
+            limit: מקסימום תוצאות
+
+        Returns:
+            רשימת מחשבות (מהדומה ביותר), כל אחת עם שדה similarity
+        """
+        try:
+            # מחשבה שעדיין בחוצץ ה-write-behind עוד לא באינדקס ולא במסד
+            await self._flush_user_writes(user_id)
+            await self._ensure_similarity_index_loaded(user_id)
+
+            signature = similarity_index.get_signature(user_id, thought_id)
+            if signature is None:
+                # המחשבה המקורית אינה פעילה (למשל בארכיון) - שליפת החתימה מהמסמך
+                thought = await self.get_thought_by_id(user_id, thought_id, projection=None)
+                if not thought:
+                    return []
+                signature = thought.get("minhash") or similarity_index.signature_for_tokens(
+                    nlp.tokenize(thought.get("raw_text") or "")
+                )
+
+            matches = similarity_index.query(user_id, signature, limit=limit, exclude=thought_id)
+            if not matches:
+                return []
+
+            scores = dict(matches)
+            cursor = self.thoughts_collection.find(
+                {
+                    "_id": {"$in": [ObjectId(match_id) for match_id in scores]},
+                    "user_id": user_id,
+                    "status": THOUGHT_STATUS["ACTIVE"],
+                },
+                THOUGHT_PROJECTIONS["preview"]
+            )
+            thoughts = _truncate_previews(await cursor.to_list(length=len(scores)))
+
+            for thought in thoughts:
+                thought["similarity"] = scores.get(str(thought["_id"]), 0.0)
+            thoughts.sort(key=lambda thought: thought["similarity"], reverse=True)
+
+            logger.info(f"🧬 נמצאו {len(thoughts)} מחשבות דומות ל-{thought_id}")
+
+            return thoughts
+
+        except Exception as e:
+            logger.error(f"❌ שגיאה בחיפוש מחשבות דומות: {e}")
+            return []
+
+    # ===== מוני מילות מפתח (TF-IDF) =====
+
+    async def _ensure_keyword_stats_loaded(self, user_id: int, terms: Optional[List[str]] = None):
+        """
+        טעינה עצלה של מוני השכיחות לזיכרון: מספר המסמכים הגלובלי ושל המשתמש,
+        והשכיחות הגלובלית והאישית של המילים המבוקשות בלבד.
+        משתמש שהטעינה שלו נכשלה לא מסומן כטעון - ינסה שוב בפעם הבאה.
+        """
+        try:
+            if not keyword_engine.global_loaded:
+                doc = await self.keyword_stats_collection.find_one({"_id": "global"}, {"docs": 1}) or {}
+                keyword_engine.load_global(doc.get("docs", 0))
+
+            if not keyword_engine.is_user_loaded(user_id):
+                doc = await self.keyword_stats_collection.find_one(
+                    {"_id": f"user:{user_id}"}, {"docs": 1}
+                ) or {}
+                keyword_engine.load_user(user_id, doc.get("docs", 0))
+
+            missing = keyword_engine.missing_user_terms(user_id, terms or [])
+            if missing:
+                cursor = self.keyword_user_df_collection.find(
+                    {"_id": {"$in": [_user_term_id(user_id, term) for term in missing]}},
+                    {"df": 1}
+                )
+                prefix_length = len(_user_term_id(user_id, ""))
+                df = {doc["_id"][prefix_length:]: doc.get("df", 0) async for doc in cursor}
+                keyword_engine.load_user_terms(user_id, missing, df)
+
+            missing = keyword_engine.missing_global_terms(terms or [])
+            if missing:
+                cursor = self.keyword_df_collection.find({"_id": {"$in": missing}}, {"df": 1})
+                df = {doc["_id"]: doc.get("df", 0) async for doc in cursor}
+                keyword_engine.load_global_terms(missing, df)
+
+        except Exception as e:
+            logger.error(f"⚠️ שגיאה בטעינת מוני מילות מפתח: {e}")
+
+    async def _migrate_global_keyword_df(self):
+        """
+        העברה חד-פעמית של מפת df.<מילה> מהמסמך הגלובלי הישן למסמך לכל מילה.
+        $max (ולא $inc) - הרצה חוזרת אחרי כשל באמצע לא מכפילה ספירות.
+        """
+        try:
+            doc = await self.keyword_stats_collection.find_one(
+                {"_id": "global", "df": {"$exists": True}}, {"df": 1}
+            )
+            if not doc:
+                return
+
+            requests = [
+                UpdateOne({"_id": term}, {"$max": {"df": count}}, upsert=True)
+                for term, count in (doc.get("df") or {}).items()
+            ]
+            for start in range(0, len(requests), MONGODB_INSERT_BATCH_SIZE):
+                await self.keyword_df_collection.bulk_write(
+                    requests[start:start + MONGODB_INSERT_BATCH_SIZE], ordered=False
+                )
+            await self.keyword_stats_collection.update_one({"_id": "global"}, {"$unset": {"df": ""}})
+            logger.info(f"🔤 שכיחויות גלובליות הועברו למסמך לכל מילה ({len(requests)} מילים)")
+
+        except Exception as e:
+            logger.error(f"❌ שגיאה בהעברת שכיחויות גלובליות: {e}")
+
+    async def _migrate_user_keyword_df(self):
+        """
+        העברה חד-פעמית של מפות df.<מילה> ממסמכי המשתמשים הישנים למסמך לכל (משתמש, מילה).
+        $max (ולא $inc) - הרצה חוזרת אחרי כשל באמצע לא מכפילה ספירות.
+        """
+        try:
+            migrated_users = 0
+            cursor = self.keyword_stats_collection.find(
+                {"_id": {"$regex": "^user:"}, "df": {"$exists": True}}, {"df": 1}
+            )
+            async for doc in cursor:
+                user_id = int(doc["_id"].split(":", 1)[1])
+                requests = [
+                    UpdateOne(
+                        {"_id": _user_term_id(user_id, term)},
+                        {"$max": {"df": count}, "$setOnInsert": {"user_id": user_id}},
+                        upsert=True
+                    )
+                    for term, count in (doc.get("df") or {}).items()
+                ]
+                for start in range(0, len(requests), MONGODB_INSERT_BATCH_SIZE):
+                    await self.keyword_user_df_collection.bulk_write(
+                        requests[start:start + MONGODB_INSERT_BATCH_SIZE], ordered=False
+                    )
+                await self.keyword_stats_collection.update_one({"_id": doc["_id"]}, {"$unset": {"df": ""}})
+                migrated_users += 1
+
+            if migrated_users:
+                logger.info(f"🔤 שכיחויות משתמשים הועברו למסמך לכל מילה ({migrated_users} משתמשים)")
+
+        except Exception as e:
+            logger.error(f"❌ שגיאה בהעברת שכיחויות משתמשים: {e}")
+
+    async def persist_keyword_stats(self) -> int:
+        """
+        שמירת השינויים שנצברו במוני השכיחות (מופעל מתוזמן ובכיבוי)
+
+        Returns:
+            מספר המסמכים שעודכנו
+        """
+        if self.keyword_stats_collection is None or not keyword_engine.has_pending():
+            return 0
+
+        global_docs, global_df, users = keyword_engine.drain_deltas()
+
+        stats_requests = []
+        if global_docs:
+            stats_requests.append(UpdateOne({"_id": "global"}, {"$inc": {"docs": global_docs}}, upsert=True))
+        for user_id, (docs, _) in users.items():
+            stats_requests.append(UpdateOne({"_id": f"user:{user_id}"}, {"$inc": {"docs": docs}}, upsert=True))
+        user_term_requests = [
+            UpdateOne(
+                {"_id": _user_term_id(user_id, term)},
+                {"$inc": {"df": count}, "$setOnInsert": {"user_id": user_id}},
+                upsert=True
+            )
+            for user_id, (_, df) in users.items()
+            for term, count in df.items()
+        ]
+        term_requests = [
+            UpdateOne({"_id": term}, {"$inc": {"df": count}}, upsert=True)
+            for term, count in global_df.items()
+        ]
+
+        if not stats_requests and not user_term_requests and not term_requests:
+            return 0
+
+        try:
+            if stats_requests:
+                await self.keyword_stats_collection.bulk_write(stats_requests, ordered=False)
+        except Exception as e:
+            logger.error(f"❌ שגיאה בשמירת מוני מילות מפתח: {e}")
+            keyword_engine.restore_deltas(global_docs, global_df, users)
+            return 0
+
+        try:
+            if user_term_requests:
+                await self.keyword_user_df_collection.bulk_write(user_term_requests, ordered=False)
+        except Exception as e:
+            logger.error(f"❌ שגיאה בשמירת שכיחויות משתמשים: {e}")
+            keyword_engine.restore_deltas(
+                0, global_df, {user_id: (0, df) for user_id, (_, df) in users.items()}
+            )
+            return len(stats_requests)
+
+        try:
+            if term_requests:
+                await self.keyword_df_collection.bulk_write(term_requests, ordered=False)
+        except Exception as e:
+            logger.error(f"❌ שגיאה בשמירת שכיחויות גלובליות: {e}")
+            keyword_engine.restore_deltas(0, global_df, {})
+            return len(stats_requests) + len(user_term_requests)
+
+        written = len(stats_requests) + len(user_term_requests) + len(term_requests)
+        logger.info(f"🔤 מוני מילות מפתח נשמרו ({written} מסמכים)")
+        return written
+
     # ===== פעולות על משתמשים =====
     
+    async def get_user(self, user_id: int) -> Optional[Dict]:
+        """
+        שליפת מסמך משתמש דרך המטמון (read-through)
+        
+        Args:
+            user_id: מזהה טלגרם
+        
+        Returns:
+            מסמך המשתמש, או None אם אינו קיים
+        """
+        return await self.user_cache.get(
+            user_id,
+            lambda: self.users_collection.find_one({"user_id": user_id})
+        )
+    
     async def get_or_create_user(self, user_id: int, user_data: Dict) -> Dict:
         """
         שליפה או יצירת משתמש
@@ -587,7 +1908,7 @@ class Database:
             מסמך המשתמש
         """
         try:
-            user = await self.users_collection.find_one({"user_id": user_id})
+            user = await self.get_user(user_id)
             
             if not user:
                 # יצירת משתמש חדש
@@ -611,6 +1932,7 @@ class Database:
                 }
                 
                 await self.users_collection.insert_one(user)
+                self.user_cache.put(user_id, user)
                 logger.info(f"👤 משתמש חדש נוצר: {user_id}")
             
             return user
@@ -621,31 +1943,166 @@ class Database:
     
     async def update_user_stats(self, user_id: int):
         """
-        עדכון סטטיסטיקות משתמש
+        עדכון זמן הפעילות האחרונה של המשתמש.
+        המונים (stats.total_thoughts, stats.by_status) מתעדכנים ב-$inc בכל כתיבה.
+        (כש-write-behind פעיל - העדכון מאוחד ורץ אחרי כתיבת האצווה הבאה)
         
         Args:
             user_id: מזהה המשתמש
         """
+        if self.write_behind:
+            self._pending_stats_users.add(user_id)
+            return
+        await self._touch_user_activity(user_id)
+
+    async def _flush_pending_user_stats(self):
+        """
+        ביצוע עדכוני פעילות שנדחו (פעם אחת לכל משתמש)
+        """
+        if not self._pending_stats_users:
+            return
+        user_ids = list(self._pending_stats_users)
+        self._pending_stats_users.clear()
+        for user_id in user_ids:
+            await self._touch_user_activity(user_id)
+
+    async def _touch_user_activity(self, user_id: int):
         try:
-            # ספירת מחשבות
-            total_thoughts = await self.thoughts_collection.count_documents({
-                "user_id": user_id,
-                "status": THOUGHT_STATUS["ACTIVE"]
-            })
-            
-            # עדכון
             await self.users_collection.update_one(
                 {"user_id": user_id},
-                {
-                    "$set": {
-                        "stats.total_thoughts": total_thoughts,
-                        "stats.last_activity": datetime.utcnow()
-                    }
-                }
+                {"$set": {"stats.last_activity": datetime.utcnow()}}
             )
-            
+            self.user_cache.invalidate(user_id)
         except Exception as e:
             logger.error(f"❌ שגיאה בעדכון סטטיסטיקות: {e}")
+
+    async def _inc_user_counters(self, user_id: int, deltas: Dict[str, int]):
+        """
+        עדכון אטומי של מוני המחשבות לפי סטטוס
+
+        Args:
+            user_id: מזהה המשתמש
+            deltas: {סטטוס: שינוי}
+        """
+        inc = {
+            f"stats.by_status.{status}": delta
+            for status, delta in deltas.items()
+            if status and delta
+        }
+        active_delta = deltas.get(THOUGHT_STATUS["ACTIVE"], 0)
+        if active_delta:
+            inc["stats.total_thoughts"] = active_delta
+        if not inc:
+            return
+
+        try:
+            await self.users_collection.update_one({"user_id": user_id}, {"$inc": inc})
+            self.user_cache.invalidate(user_id)
+        except Exception as e:
+            # סטייה תתוקן ע"י reconcile_user_stats
+            logger.error(f"❌ שגיאה בעדכון מוני משתמש: {e}")
+
+    async def reconcile_user_stats(self, batch_size: int = USER_STATS_RECONCILE_BATCH) -> int:
+        """
+        תיקון סטיות במוני המשתמשים מול הספירה האמיתית (מופעל מתוזמן).
+        עובר על המשתמשים באצוות: ספירה לפי user_id + status לאצווה בלבד,
+        וכתיבה מותנית (compare-and-set) - אם המונים השתנו מאז שנקראו
+        (עדכון $inc מקביל), המשתמש מדולג ויתוקן בסבב הבא.
+
+        Args:
+            batch_size: מספר משתמשים לכל אצווה
+
+        Returns:
+            מספר המשתמשים שהמונים שלהם תוקנו
+        """
+        corrected = 0
+        batch: List[Dict[str, Any]] = []
+        try:
+            cursor = self.users_collection.find(
+                {"user_id": {"$ne": None}},
+                {"user_id": 1, "stats.total_thoughts": 1, "stats.by_status": 1},
+                batch_size=batch_size
+            )
+            async for user in cursor:
+                batch.append(user)
+                if len(batch) >= batch_size:
+                    corrected += await self._reconcile_user_batch(batch)
+                    batch = []
+            if batch:
+                corrected += await self._reconcile_user_batch(batch)
+
+        except Exception as e:
+            logger.error(f"❌ שגיאה בתיקון מוני משתמשים: {e}")
+
+        if corrected:
+            logger.info(f"🧮 מוני מחשבות תוקנו עבור {corrected} משתמשים")
+        return corrected
+
+    async def _reconcile_user_batch(self, users: List[Dict[str, Any]]) -> int:
+        """
+        תיקון המונים של אצוות משתמשים (המסמכים כפי שנקראו לפני הספירה)
+
+        Returns:
+            מספר המשתמשים שתוקנו
+        """
+        # משתמשים עם כתיבות שעדיין בחוצץ - הספירה לא משקפת אותן עדיין
+        if self.write_behind:
+            users = [
+                user for user in users
+                if not self.write_behind.has_pending(
+                    lambda item, user_id=user["user_id"]: item[0]["user_id"] == user_id
+                )
+            ]
+        if not users:
+            return 0
+
+        actual: Dict[int, Dict[str, int]] = {}
+        pipeline = [
+            {"$match": {"user_id": {"$in": [user["user_id"] for user in users]}}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "status": "$status"},
+                "count": {"$sum": 1}
+            }}
+        ]
+        async for row in self.thoughts_collection.aggregate(pipeline):
+            key = row["_id"]
+            if not key.get("status"):
+                continue
+            actual.setdefault(key["user_id"], {})[key["status"]] = row["count"]
+
+        requests = []
+        corrected_user_ids = []
+        for user in users:
+            user_id = user["user_id"]
+            stats = user.get("stats") or {}
+            stored_total = stats.get("total_thoughts")
+            stored_by_status = stats.get("by_status")
+            by_status = actual.get(user_id, {})
+            total = by_status.get(THOUGHT_STATUS["ACTIVE"], 0)
+            stored = {status: count for status, count in (stored_by_status or {}).items() if count}
+
+            if stored_total != total or stored != by_status:
+                requests.append(UpdateOne(
+                    # רק אם המונים לא השתנו מאז הקריאה
+                    {
+                        "_id": user["_id"],
+                        "stats.total_thoughts": stored_total,
+                        "stats.by_status": stored_by_status,
+                    },
+                    {"$set": {"stats.total_thoughts": total, "stats.by_status": by_status}}
+                ))
+                corrected_user_ids.append(user_id)
+
+        if not requests:
+            return 0
+
+        result = await self.users_collection.bulk_write(requests, ordered=False)
+        for user_id in corrected_user_ids:
+            self.user_cache.invalidate(user_id)
+        skipped = len(requests) - result.modified_count
+        if skipped:
+            logger.info(f"ℹ️ {skipped} משתמשים עודכנו במקביל - יתוקנו בסבב הבא")
+        return result.modified_count
     
     async def get_user_stats(self, user_id: int) -> Dict:
         """
@@ -658,21 +2115,20 @@ class Database:
             מילון עם סטטיסטיקות
         """
         try:
-            user = await self.users_collection.find_one({"user_id": user_id})
+            user = await self.get_user(user_id)
             
             if not user:
                 return {}
             
-            # סיכומים
-            category_summary = await self.get_category_summary(user_id)
-            topic_summary = await self.get_topic_summary(user_id)
+            # סיכומים (ממסמך הסיכום המצטבר)
+            summary = await self.get_user_summary(user_id)
             
             stats = {
                 "total_thoughts": user.get("stats", {}).get("total_thoughts", 0),
                 "joined_at": user.get("joined_at"),
                 "last_activity": user.get("stats", {}).get("last_activity"),
-                "categories": category_summary,
-                "topics": topic_summary
+                "categories": summary["categories"],
+                "topics": summary["topics"]
             }
             
             return stats
@@ -687,13 +2143,55 @@ class Database:
         שליפה מהירה של כל מזהי המשתמשים הרשומים במערכת.
         """
         try:
-            cursor = self.users_collection.find({}, {"user_id": 1, "_id": 0})
+            # הסינון מאפשר סריקה מכוסה של אינדקס user_id (ללא קריאת המסמכים עצמם)
+            cursor = self.users_collection.find({"user_id": {"$ne": None}}, {"user_id": 1, "_id": 0})
             users = await cursor.to_list(None)
             return [int(u.get("user_id")) for u in users if u.get("user_id") is not None]
         except Exception as e:
             logger.error(f"❌ שגיאה בשליפת רשימת משתמשים: {e}")
             return []
 
+    async def iter_weekly_review_candidates(
+        self,
+        cooldown_hours: int,
+        days_back: int = 7,
+        batch_size: int = 200
+    ) -> AsyncIterator[Dict]:
+        """
+        זרם המשתמשים שזכאים לתזכורת סקירה שבועית - שתי שאילתות במקום שאילתה לכל משתמש:
+        ספירת מחשבות השבוע מקובצת לפי משתמש, וסמן על המשתמשים שמחוץ ל-cooldown
+        
+        Args:
+            cooldown_hours: משתמשים שקיבלו תזכורת בחלון הזה לא יוחזרו
+            days_back: חלון ספירת המחשבות הפעילות
+            batch_size: גודל אצווה של הסמן
+        
+        Yields:
+            {"user_id", "last_prompted_at", "recent_count"}
+        """
+        now = datetime.utcnow()
+        # רק משתמשים שכתבו השבוע - המילון קטן ממספר המשתמשים
+        recent_counts: Dict[int, int] = {}
+        counts_cursor = self.thoughts_collection.aggregate(
+            weekly_review_counts_pipeline(days_back, now),
+            batchSize=batch_size
+        )
+        async for row in counts_cursor:
+            recent_counts[row["_id"]] = row["count"]
+
+        cursor = self.users_collection.find(
+            weekly_review_users_filter(cooldown_hours, now),
+            {"_id": 0, "user_id": 1, "settings.weekly_review.last_prompted_at": 1},
+            batch_size=batch_size
+        )
+        async for user in cursor:
+            user_id = user["user_id"]
+            yield {
+                "user_id": user_id,
+                "last_prompted_at": ((user.get("settings") or {}).get("weekly_review") or {}).get("last_prompted_at"),
+                "recent_count": recent_counts.get(user_id, 0),
+            }
+
     async def set_weekly_review_prompted(self, user_id: int) -> None:
         """
         עדכון timestamp של שליחת תזכורת סקירה שבועית למשתמש.
@@ -704,9 +2202,34 @@ class Database:
                 {"$set": {"settings.weekly_review.last_prompted_at": datetime.utcnow()}},
                 upsert=False,
             )
+            self.user_cache.invalidate(user_id)
         except Exception as e:
             logger.error(f"❌ שגיאה בעדכון שעת תזכורת סקירה: {e}")
 
+    async def set_weekly_review_prompted_many(self, user_ids: List[int]) -> None:
+        """
+        עדכון שעת תזכורת הסקירה לאצוות משתמשים ב-bulk_write אחד
+        """
+        if not user_ids:
+            return
+        now = datetime.utcnow()
+        try:
+            await self.users_collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"user_id": user_id},
+                        {"$set": {"settings.weekly_review.last_prompted_at": now}}
+                    )
+                    for user_id in user_ids
+                ],
+                ordered=False
+            )
+        except Exception as e:
+            logger.error(f"❌ שגיאה בעדכון שעת תזכורת סקירה ל-{len(user_ids)} משתמשים: {e}")
+        finally:
+            for user_id in user_ids:
+                self.user_cache.invalidate(user_id)
+
     async def set_weekly_review_completed(self, user_id: int) -> None:
         """
         עדכון timestamp של השלמת סקירה שבועית למשתמש.
@@ -717,6 +2240,7 @@ class Database:
                 {"$set": {"settings.weekly_review.last_completed_at": datetime.utcnow()}},
                 upsert=False,
             )
+            self.user_cache.invalidate(user_id)
         except Exception as e:
             logger.error(f"❌ שגיאה בעדכון השלמת סקירה: {e}")
 
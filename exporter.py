@@ -0,0 +1,190 @@
+"""
+ייצוא מחשבות לקובץ (TXT / CSV / JSON)
+המחשבות נכתבות שורה-אחר-שורה לקובץ זמני (SpooledTemporaryFile), אופציונלית
+דרך gzip, כך שצריכת הזיכרון קבועה ולא תלויה במספר המחשבות
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, IO, Optional
+from zoneinfo import ZoneInfo
+
+from config import (
+    EXPORT_FORMATS,
+    EXPORT_SPOOL_MAX_BYTES,
+    MAX_EXPORT_SIZE,
+    TIMEZONE,
+)
+from database import db
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_TZ = ZoneInfo(TIMEZONE)
+
+# עמודות ה-CSV (וגם סדר השדות ב-JSON)
+_FIELDS = ["created_at", "status", "category", "topics", "keywords", "sentiment", "text"]
+
+
+def _local_time(created_at: Optional[datetime]) -> Optional[datetime]:
+    """created_at נשמר כ-UTC נאיבי - המרה לאזור הזמן של הבוט"""
+    if not isinstance(created_at, datetime):
+        return None
+    return created_at.replace(tzinfo=timezone.utc).astimezone(_LOCAL_TZ)
+
+
+def _export_row(thought: Dict) -> Dict[str, Any]:
+    """שטיחת מסמך מחשבה (פרופיל export) לשורת ייצוא"""
+    analysis = thought.get("nlp_analysis") or {}
+    created_at = _local_time(thought.get("created_at"))
+    return {
+        "created_at": created_at.isoformat(timespec="seconds") if created_at else "",
+        "status": thought.get("status", ""),
+        "category": analysis.get("category", ""),
+        "topics": list(analysis.get("topics") or []),
+        "keywords": list(analysis.get("keywords") or []),
+        "sentiment": analysis.get("sentiment", ""),
+        "text": thought.get("raw_text") or "",
+    }
+
+
+class _TxtWriter:
+    """טקסט קריא - בלוק לכל מחשבה"""
+
+    encoding = "utf-8"
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def begin(self):
+        pass
+
+    def write(self, row: Dict[str, Any]):
+        created_at = row["created_at"].replace("T", " ")[:16]
+        self.stream.write(f"[{created_at}] {row['category']} ({row['status']})\n")
+        self.stream.write(f"{row['text']}\n")
+        if row["topics"]:
+            self.stream.write(f"נושאים: {', '.join(row['topics'])}\n")
+        self.stream.write("---\n")
+
+    def end(self):
+        pass
+
+
+class _CsvWriter:
+    """CSV עם BOM (כדי שאקסל יזהה עברית)"""
+
+    encoding = "utf-8-sig"
+
+    def __init__(self, stream: IO[str]):
+        self.writer = csv.DictWriter(stream, fieldnames=_FIELDS)
+
+    def begin(self):
+        self.writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self.writer.writerow({
+            **row,
+            "topics": ", ".join(row["topics"]),
+            "keywords": ", ".join(row["keywords"]),
+        })
+
+    def end(self):
+        pass
+
+
+class _JsonWriter:
+    """מערך JSON שנכתב איבר-איבר (בלי להחזיק את כל הרשימה בזיכרון)"""
+
+    encoding = "utf-8"
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self._first = True
+
+    def begin(self):
+        self.stream.write("[\n")
+
+    def write(self, row: Dict[str, Any]):
+        if not self._first:
+            self.stream.write(",\n")
+        self._first = False
+        self.stream.write(json.dumps(row, ensure_ascii=False))
+
+    def end(self):
+        self.stream.write("\n]\n")
+
+
+_WRITERS = {
+    "txt": _TxtWriter,
+    "csv": _CsvWriter,
+    "json": _JsonWriter,
+}
+
+
+async def export_thoughts(
+    user_id: int,
+    fmt: str,
+    compress: bool = False,
+    progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    limit: int = MAX_EXPORT_SIZE
+) -> Dict[str, Any]:
+    """
+    ייצוא מחשבות המשתמש לקובץ זמני
+
+    Args:
+        user_id: מזהה המשתמש
+        fmt: פורמט (אחד מ-EXPORT_FORMATS)
+        compress: דחיסת gzip
+        progress: callback שמקבל את מספר המחשבות שנכתבו עד כה (נקרא אחרי כל אצווה)
+        limit: מקסימום מחשבות
+
+    Returns:
+        מילון עם file (ממוקם בתחילתו - באחריות הקורא לסגור), filename, count, size
+    """
+    if fmt not in EXPORT_FORMATS or fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    filename = f"thoughts_{datetime.utcnow():%Y%m%d_%H%M}.{fmt}"
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES, mode="w+b")
+    gz = None
+    try:
+        target = spool
+        if compress:
+            gz = gzip.GzipFile(filename=filename, mode="wb", fileobj=spool)
+            target = gz
+            filename += ".gz"
+
+        writer_cls = _WRITERS[fmt]
+        # newline="" - מודול csv מנהל בעצמו את סופי השורות
+        stream = io.TextIOWrapper(target, encoding=writer_cls.encoding, newline="")
+        writer = writer_cls(stream)
+        writer.begin()
+
+        count = 0
+        async for batch in db.iter_export_batches(user_id, limit=limit):
+            for thought in batch:
+                writer.write(_export_row(thought))
+            count += len(batch)
+            if progress:
+                await progress(count)
+
+        writer.end()
+        stream.flush()
+        # ניתוק ה-wrapper בלי לסגור את הקובץ שמתחתיו
+        stream.detach()
+        if gz:
+            gz.close()
+
+        size = spool.tell()
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+
+    logger.info(f"📤 ייצוא {fmt} למשתמש {user_id}: {count} מחשבות, {size} בתים")
+    return {"file": spool, "filename": filename, "count": count, "size": size}
@@ -0,0 +1,272 @@
+"""
+שליחת הודעות המונית (fan-out) במקביליות חסומה ובקצב המותר של טלגרם
+token bucket גלובלי + מרווח מינימלי לכל צ'אט, טיפול ב-RetryAfter וכתיבות DB באצוות
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+from config import (
+    FANOUT_MAX_CONCURRENCY,
+    FANOUT_GLOBAL_RATE_PER_SECOND,
+    FANOUT_PER_CHAT_INTERVAL_SECONDS,
+    FANOUT_MAX_RETRIES,
+    FANOUT_WRITE_CHUNK_SIZE,
+    FANOUT_PROGRESS_LOG_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# המתנה בסיסית (בשניות) לפני ניסיון חוזר אחרי שגיאת רשת - מוכפלת בכל ניסיון
+_NETWORK_BACKOFF_SECONDS = 1.0
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """retry_after הוא int ב-PTB 21 ו-timedelta בגרסאות חדשות יותר"""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class TokenBucket:
+    """
+    token bucket אסינכרוני (לולאת אירועים אחת - ללא נעילות)
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: אסימונים לשנייה
+            capacity: גודל פרץ מקסימלי
+        """
+        self.rate = max(float(rate), 0.001)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """עצירת כל הצרכנים (flood control של טלגרם הוא גלובלי לבוט)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self):
+        """המתנה לאסימון אחד"""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class _FanOutRun:
+    """מצב של ריצת fan-out אחת"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.delivered: List[Any] = []
+        # מתי מותר לשלוח שוב לכל צ'אט
+        self.chat_next_at: Dict[int, float] = {}
+        self.last_progress = self.started
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "name": self.name,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "elapsed_seconds": round(elapsed, 2),
+            "messages_per_second": round(self.sent / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class FanOutDispatcher:
+    """
+    שליחה מקבילית לרשימת נמענים (זרם) בקצב המותר.
+    ה-bucket הגלובלי משותף לכל הריצות - המגבלה של טלגרם היא לבוט כולו.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = FANOUT_MAX_CONCURRENCY,
+        global_rate: float = FANOUT_GLOBAL_RATE_PER_SECOND,
+        per_chat_interval: float = FANOUT_PER_CHAT_INTERVAL_SECONDS,
+        max_retries: int = FANOUT_MAX_RETRIES,
+        chunk_size: int = FANOUT_WRITE_CHUNK_SIZE,
+        progress_seconds: float = FANOUT_PROGRESS_LOG_SECONDS
+    ):
+        """
+        Args:
+            max_concurrency: מקסימום שליחות בו-זמנית
+            global_rate: מקסימום הודעות לשנייה לכל הבוט
+            per_chat_interval: מרווח מינימלי (בשניות) בין הודעות לאותו צ'אט
+            max_retries: ניסיונות חוזרים להודעה (RetryAfter / שגיאות רשת)
+            chunk_size: כמות נמענים שהצליחו לכל קריאה ל-on_chunk
+            progress_seconds: מרווח בין לוגים של התקדמות
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max(max_retries, 0)
+        self.chunk_size = max(chunk_size, 1)
+        self.progress_seconds = progress_seconds
+        self.bucket = TokenBucket(global_rate)
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    async def _wait_for_chat(self, run: _FanOutRun, chat_id: int):
+        now = time.monotonic()
+        next_at = run.chat_next_at.get(chat_id, now)
+        run.chat_next_at[chat_id] = max(now, next_at) + self.per_chat_interval
+        if next_at > now:
+            await asyncio.sleep(next_at - now)
+
+    async def _deliver(self, run: _FanOutRun, chat_id: int, send: Callable[[], Awaitable[Any]]) -> bool:
+        """שליחה אחת עם ניסיונות חוזרים. מחזיר האם ההודעה נמסרה"""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_chat(run, chat_id)
+            await self.bucket.acquire()
+            try:
+                await send()
+                return True
+            except RetryAfter as e:
+                delay = _retry_after_seconds(e)
+                logger.warning(f"⏳ RetryAfter ב-fan-out ({run.name}): המתנה של {delay:.0f} שניות")
+                self.bucket.pause(delay)
+            except (Forbidden, BadRequest) as e:
+                # משתמש חסם את הבוט / צ'אט לא קיים - אין טעם לנסות שוב
+                logger.info(f"🚫 הודעה ל-{chat_id} לא נמסרה: {e}")
+                return False
+            except NetworkError as e:
+                delay = _NETWORK_BACKOFF_SECONDS * (2 ** attempt)
+                logger.warning(f"⚠️ שגיאת רשת בשליחה ל-{chat_id}: {e} - ניסיון חוזר בעוד {delay:.0f} שניות")
+                await asyncio.sleep(delay)
+            except Exception:
+                logger.exception(f"❌ כשל בשליחה ל-{chat_id}")
+                return False
+            run.retries += 1
+
+        logger.error(f"❌ הודעה ל-{chat_id} לא נמסרה אחרי {self.max_retries + 1} ניסיונות")
+        return False
+
+    async def _flush_chunk(
+        self,
+        run: _FanOutRun,
+        on_chunk: Optional[Callable[[List[Any]], Awaitable[None]]],
+        force: bool = False
+    ):
+        if not run.delivered or (len(run.delivered) < self.chunk_size and not force):
+            return
+        chunk, run.delivered = run.delivered, []
+        if on_chunk is None:
+            return
+        try:
+            await on_chunk(chunk)
+        except Exception:
+            logger.exception(f"❌ כשל בעיבוד אצוות נמענים ב-fan-out ({run.name})")
+
+    def _log_progress(self, run: _FanOutRun):
+        now = time.monotonic()
+        if now - run.last_progress < self.progress_seconds:
+            return
+        run.last_progress = now
+        summary = run.summary()
+        logger.info(
+            f"📤 fan-out {run.name}: {summary['sent']} נשלחו, {summary['failed']} נכשלו "
+            f"({summary['messages_per_second']} הודעות/שנייה)"
+        )
+
+    async def run(
+        self,
+        name: str,
+        recipients: AsyncIterable[Any],
+        chat_id_of: Callable[[Any], int],
+        send: Callable[[Any], Awaitable[Any]],
+        on_chunk: Optional[Callable[[List[Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        שליחה לכל הנמענים בזרם
+
+        Args:
+            name: שם הריצה (ללוגים ולמדדים)
+            recipients: זרם נמענים (נקרא בהדרגה - לא נטען כולו לזיכרון)
+            chat_id_of: חילוץ chat_id מנמען
+            send: שליחה לנמען בודד
+            on_chunk: נקרא עם אצוות הנמענים שההודעה נמסרה להם (לכתיבה מרוכזת ל-DB)
+
+        Returns:
+            סיכום הריצה (נשלחו, נכשלו, ניסיונות חוזרים, קצב)
+        """
+        run = _FanOutRun(name)
+        # תור חסום - הזרם לא נקרא מהר יותר ממה שהשליחה מתקדמת
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+
+        async def worker():
+            while True:
+                recipient = await queue.get()
+                try:
+                    if recipient is None:
+                        return
+                    try:
+                        delivered = await self._deliver(run, chat_id_of(recipient), lambda: send(recipient))
+                    except Exception:
+                        logger.exception(f"❌ כשל בטיפול בנמען ב-fan-out ({name})")
+                        delivered = False
+                    if delivered:
+                        run.sent += 1
+                        run.delivered.append(recipient)
+                        await self._flush_chunk(run, on_chunk)
+                    else:
+                        run.failed += 1
+                    self._log_progress(run)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            async for recipient in recipients:
+                await queue.put(recipient)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await self._flush_chunk(run, on_chunk, force=True)
+
+        self._last_run = run.summary()
+        logger.info(
+            f"📣 fan-out {name} הסתיים: {run.sent} נשלחו, {run.failed} נכשלו, "
+            f"{run.retries} ניסיונות חוזרים, {self._last_run['elapsed_seconds']} שניות "
+            f"({self._last_run['messages_per_second']} הודעות/שנייה)"
+        )
+        return self._last_run
+
+    def stats(self) -> Dict[str, Any]:
+        """הגדרות + סיכום הריצה האחרונה"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "global_rate_per_second": self.bucket.rate,
+            "per_chat_interval_seconds": self.per_chat_interval,
+            "last_run": self._last_run,
+        }
+
+
+# יצירת אובייקט גלובלי
+dispatcher = FanOutDispatcher()
@@ -0,0 +1,257 @@
+"""
+מנוע מילות מפתח מבוסס TF-IDF
+מחזיק מוני שכיחות מסמכים (document frequency) גלובליים ולכל משתמש,
+מתעדכן בהדרגה עם כל מחשבה שנשמרת ומדרג מועמדים ב-O(מילים)
+"""
+
+import logging
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import KEYWORDS_PER_THOUGHT, KEYWORD_STATS_MAX_USERS, KEYWORD_GLOBAL_TERMS_MAX
+
+logger = logging.getLogger(__name__)
+
+# ככל שלמשתמש יש יותר מחשבות, ה-IDF האישי שלו מקבל משקל גבוה יותר
+_USER_IDF_HALF_WEIGHT_DOCS = 10
+
+
+class KeywordEngine:
+    """
+    מוני שכיחות בזיכרון + דירוג TF-IDF.
+    השמירה למונגו נעשית ע"י Database בעזרת drain_deltas / restore_deltas.
+    שכיחויות גלובליות נטענות לפי מילה (רק מילים שמופיעות בטקסטים) ונשמרות במטמון LRU.
+    גם שכיחויות המשתמש נטענות לפי מילה - רק המילים שהמשתמש השתמש בהן מאז שנטען.
+    """
+
+    def __init__(
+        self,
+        max_keywords: int = KEYWORDS_PER_THOUGHT,
+        max_users: int = KEYWORD_STATS_MAX_USERS,
+        max_global_terms: int = KEYWORD_GLOBAL_TERMS_MAX
+    ):
+        """
+        Args:
+            max_keywords: מספר מילות המפתח לדירוג
+            max_users: מקסימום משתמשים בזיכרון (פינוי LRU של משתמשים ללא שינויים)
+            max_global_terms: מקסימום מילים במטמון השכיחויות הגלובלי
+        """
+        self.max_keywords = max_keywords
+        self.max_users = max(max_users, 1)
+        self.max_global_terms = max(max_global_terms, 1)
+
+        self.global_loaded = False
+        self.global_docs = 0
+        # מטמון LRU: מילה -> שכיחות גלובלית (כולל שינויים שטרם נשמרו)
+        self.global_df: "OrderedDict[str, int]" = OrderedDict()
+
+        # user_id -> (מספר מסמכים, מונה שכיחויות של המילים שנטענו)
+        self._users: "OrderedDict[int, Tuple[int, Counter]]" = OrderedDict()
+
+        # שינויים שעדיין לא נשמרו
+        self._pending_global_docs = 0
+        self._pending_global_df: Counter = Counter()
+        self._pending_users: Dict[int, Tuple[int, Counter]] = {}
+
+        self._lock = threading.Lock()
+
+    # ===== טעינה =====
+
+    def is_user_loaded(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+    def load_global(self, docs: int):
+        """טעינת מספר המסמכים הגלובלי מהמסד (פעם אחת)"""
+        with self._lock:
+            if self.global_loaded:
+                return
+            # שינויים שנצברו לפני הטעינה נשמרים מעל הערך מהמסד
+            self.global_docs += docs
+            self.global_loaded = True
+
+    def missing_global_terms(self, terms: Iterable[str]) -> List[str]:
+        """מילים שהשכיחות הגלובלית שלהן עדיין לא במטמון"""
+        with self._lock:
+            return [term for term in set(terms) if term not in self.global_df]
+
+    def load_global_terms(self, terms: Iterable[str], df: Dict[str, int]):
+        """
+        טעינת שכיחויות גלובליות מהמסד למטמון
+
+        Args:
+            terms: המילים שנשלפו (מילה שלא נמצאה במסד = 0)
+            df: השכיחויות שנמצאו
+        """
+        with self._lock:
+            for term in terms:
+                if term in self.global_df:
+                    continue
+                # שינויים שטרם נשמרו לא נמצאים עדיין במסד
+                self.global_df[term] = df.get(term, 0) + self._pending_global_df.get(term, 0)
+            while len(self.global_df) > self.max_global_terms:
+                self.global_df.popitem(last=False)
+
+    def load_user(self, user_id: int, docs: int):
+        """טעינת מספר המסמכים של משתמש מהמסד (השכיחויות נטענות לפי מילה)"""
+        with self._lock:
+            if user_id in self._users:
+                return
+            # שינויים שנצברו כשהמשתמש לא היה טעון טרם נשמרו במסד
+            pending_docs, _ = self._pending_users.get(user_id, (0, Counter()))
+            self._users[user_id] = (docs + pending_docs, Counter())
+            self._evict_users()
+
+    def missing_user_terms(self, user_id: int, terms: Iterable[str]) -> List[str]:
+        """מילים שהשכיחות של המשתמש בהן עדיין לא במטמון"""
+        with self._lock:
+            _, user_df = self._users.get(user_id, (0, Counter()))
+            return [term for term in set(terms) if term not in user_df]
+
+    def load_user_terms(self, user_id: int, terms: Iterable[str], df: Dict[str, int]):
+        """
+        טעינת שכיחויות משתמש מהמסד למטמון (המשתמש חייב להיות טעון)
+
+        Args:
+            user_id: מזהה המשתמש
+            terms: המילים שנשלפו (מילה שלא נמצאה במסד = 0)
+            df: השכיחויות שנמצאו
+        """
+        with self._lock:
+            if user_id not in self._users:
+                return
+            _, user_df = self._users[user_id]
+            _, pending_df = self._pending_users.get(user_id, (0, Counter()))
+            for term in terms:
+                if term not in user_df:
+                    user_df[term] = df.get(term, 0) + pending_df.get(term, 0)
+
+    def _evict_users(self):
+        """פינוי משתמשים ישנים שאין להם שינויים ממתינים"""
+        for user_id in list(self._users):
+            if len(self._users) <= self.max_users:
+                break
+            if user_id not in self._pending_users:
+                del self._users[user_id]
+
+    # ===== דירוג ועדכון =====
+
+    def rank(
+        self,
+        user_id: int,
+        candidates: List[str],
+        max_keywords: Optional[int] = None
+    ) -> List[str]:
+        """
+        דירוג מועמדים לפי TF-IDF (שילוב של IDF אישי וגלובלי)
+
+        Args:
+            user_id: מזהה המשתמש
+            candidates: מילים מהטקסט (לפי סדר, כולל חזרות)
+            max_keywords: מספר מילות מפתח להחזרה
+
+        Returns:
+            מילות המפתח המדורגות
+        """
+        max_keywords = max_keywords or self.max_keywords
+        if not candidates:
+            return []
+
+        term_counts = Counter(candidates)
+        # מיקום ראשון - שובר שוויון לטובת מילים מוקדמות בטקסט
+        first_position: Dict[str, int] = {}
+        for position, term in enumerate(candidates):
+            first_position.setdefault(term, position)
+
+        with self._lock:
+            user_docs, user_df = self._users.get(user_id, (0, Counter()))
+            if user_id in self._users:
+                self._users.move_to_end(user_id)
+            global_docs = self.global_docs
+            user_weight = user_docs / (user_docs + _USER_IDF_HALF_WEIGHT_DOCS)
+
+            scores = {}
+            for term, tf in term_counts.items():
+                global_df = self.global_df.get(term, 0)
+                if term in self.global_df:
+                    self.global_df.move_to_end(term)
+                global_idf = math.log((1 + global_docs) / (1 + global_df)) + 1
+                user_idf = math.log((1 + user_docs) / (1 + user_df.get(term, 0))) + 1
+                idf = user_weight * user_idf + (1 - user_weight) * global_idf
+                scores[term] = tf * idf
+
+        ranked = sorted(scores, key=lambda term: (-scores[term], first_position[term]))
+        return ranked[:max_keywords]
+
+    def observe(self, user_id: int, candidates: List[str]):
+        """
+        עדכון המונים עם מסמך חדש.
+        מונים שאינם טעונים (משתמש שפונה / מילה שלא במטמון) לא נוצרים כאן -
+        השינוי נשמר רק כ-delta ומתווסף בטעינה הבאה מהמסד.
+
+        Args:
+            user_id: מזהה המשתמש
+            candidates: מילים מהטקסט
+        """
+        terms = set(candidates)
+        with self._lock:
+            self.global_docs += 1
+            self._pending_global_docs += 1
+            self._pending_global_df.update(terms)
+            for term in terms:
+                if term in self.global_df:
+                    self.global_df[term] += 1
+
+            if user_id in self._users:
+                user_docs, user_df = self._users[user_id]
+                for term in terms:
+                    if term in user_df:
+                        user_df[term] += 1
+                self._users[user_id] = (user_docs + 1, user_df)
+                self._users.move_to_end(user_id)
+
+            pending_docs, pending_df = self._pending_users.get(user_id, (0, Counter()))
+            pending_df.update(terms)
+            self._pending_users[user_id] = (pending_docs + 1, pending_df)
+
+    # ===== שמירה =====
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._pending_global_docs or self._pending_global_df or self._pending_users)
+
+    def drain_deltas(self) -> Tuple[int, Counter, Dict[int, Tuple[int, Counter]]]:
+        """
+        שליפה ואיפוס של השינויים שטרם נשמרו
+
+        Returns:
+            (מסמכים גלובליים, שכיחויות גלובליות, {user_id: (מסמכים, שכיחויות)})
+        """
+        with self._lock:
+            deltas = (self._pending_global_docs, self._pending_global_df, self._pending_users)
+            self._pending_global_docs = 0
+            self._pending_global_df = Counter()
+            self._pending_users = {}
+            self._evict_users()
+        return deltas
+
+    def restore_deltas(
+        self,
+        global_docs: int,
+        global_df: Counter,
+        users: Dict[int, Tuple[int, Counter]]
+    ):
+        """החזרת שינויים שהשמירה שלהם נכשלה (יישמרו בניסיון הבא)"""
+        with self._lock:
+            self._pending_global_docs += global_docs
+            self._pending_global_df.update(global_df)
+            for user_id, (docs, df) in users.items():
+                pending_docs, pending_df = self._pending_users.get(user_id, (0, Counter()))
+                pending_df.update(df)
+                self._pending_users[user_id] = (pending_docs + docs, pending_df)
+
+
+# יצירת אובייקט גלובלי
+keyword_engine = KeywordEngine()
@@ -4,7 +4,9 @@
 """
 
 import asyncio
+import atexit
 import concurrent.futures
+import hmac
 import logging
 import threading
 import time
@@ -14,8 +16,12 @@ from typing import Optional
 from flask import Flask, request
 from telegram import Update
 
-from config import DEBUG_MODE, PORT, RENDER_EXTERNAL_URL, TELEGRAM_BOT_TOKEN
+from config import DEBUG_MODE, METRICS_TOKEN, PORT, RENDER_EXTERNAL_URL, TELEGRAM_BOT_TOKEN
 from bot import bot
+from database import db
+from fanout import dispatcher as fanout_dispatcher
+from nlp_analyzer import nlp
+from nlp_service import analysis_service
 
 # הגדרת לוגר
 logging.basicConfig(
@@ -202,6 +208,54 @@ def health():
     return {"status": "healthy"}, 200
 
 
+_LOCAL_ADDRESSES = {"127.0.0.1", "::1"}
+
+
+def _metrics_authorized() -> bool:
+    """
+    גישה למדדים: כותרת X-Metrics-Token תואמת, או (כשאין טוקן מוגדר) בקשה מ-localhost בלבד
+    """
+    if not METRICS_TOKEN:
+        return request.remote_addr in _LOCAL_ADDRESSES
+    provided = request.headers.get("X-Metrics-Token", "")
+    return hmac.compare_digest(provided.encode(), METRICS_TOKEN.encode())
+
+
+@app.route('/metrics')
+def metrics():
+    """
+    מדדי ביצועים פנימיים (מטמון NLP וכו'). דורש X-Metrics-Token.
+    """
+    if not _metrics_authorized():
+        return {"status": "forbidden"}, 403
+    return {
+        "nlp": {
+            "cache": nlp.cache_stats(),
+            "executor": analysis_service.stats(),
+            "timings": nlp.stage_timings()
+        },
+        "database": {
+            "write_behind": db.write_behind_stats(),
+            "user_cache": db.user_cache_stats()
+        },
+        "fanout": fanout_dispatcher.stats()
+    }, 200
+
+
+@app.route('/metrics/nlp/timings')
+def nlp_timings():
+    """
+    זמני שלבי הניתוח (p50/p95/p99). ?reset=1 מאפס את ההיסטוגרמות.
+    דורש X-Metrics-Token (כמו /metrics) - כולל האיפוס.
+    """
+    if not _metrics_authorized():
+        return {"status": "forbidden"}, 403
+    timings = nlp.stage_timings()
+    if request.args.get("reset") == "1" and nlp.stage_timer:
+        nlp.stage_timer.reset()
+    return timings, 200
+
+
 WEBHOOK_PATH = f"/{TELEGRAM_BOT_TOKEN}" if TELEGRAM_BOT_TOKEN else "/webhook"
 if not TELEGRAM_BOT_TOKEN:
     logger.warning("⚠️ TELEGRAM_BOT_TOKEN לא מוגדר - משתמשים במסלול webhook ברירת מחדל '/webhook'")
@@ -329,6 +383,20 @@ def ensure_bot_initialized_sync(timeout: float = 30.0) -> bool:
     return result
 
 
+@atexit.register
+def _flush_bot_on_exit() -> None:
+    """
+    שמירת כתיבות ממתינות (מוני מילות מפתח וכו') וכיבוי מסודר כשה-worker נסגר.
+    """
+    if not (_bot_initialized.is_set() and _bot_loop and _bot_loop.is_running()):
+        return
+
+    try:
+        _run_on_bot_loop(bot.shutdown()).result(timeout=10)
+    except Exception:
+        logger.exception("⚠️ כשל בשמירת נתונים לפני כיבוי")
+
+
 def run_polling():
     """
     הרצה במצב polling (לפיתוח מקומי)
@@ -355,6 +423,8 @@ def run_polling():
             logger.info("🛑 עצירת הבוט...")
             await bot.application.stop()
             await bot.application.shutdown()
+        finally:
+            await bot.shutdown()
 
     asyncio.run(main())
 
@@ -0,0 +1,116 @@
+"""
+מדדי ביצועים פנימיים (in-process)
+היסטוגרמות זמנים עם אחוזונים עבור שלבי עיבוד
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def _default_bounds_us() -> List[float]:
+    """
+    גבולות דליים גיאומטריים (10 דליים לכל סדר גודל, כ-26% רזולוציה),
+    ממיקרו-שנייה אחת ועד 10 שניות
+    """
+    bounds = []
+    value = 1.0
+    while value <= 10_000_000:
+        bounds.append(round(value, 3))
+        value *= 10 ** 0.1
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    היסטוגרמת זמנים עם דליים קבועים (לוגריתמיים).
+    רישום הוא O(log דליים) וזיכרון קבוע; האחוזונים מוערכים לפי גבול הדלי העליון.
+    """
+
+    def __init__(self, bounds_us: Optional[List[float]] = None):
+        self.bounds_us = bounds_us or _default_bounds_us()
+        # דלי אחרון = חריגה מעבר לגבול העליון
+        self.counts = [0] * (len(self.bounds_us) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, seconds: float):
+        """רישום מדידה (בשניות)"""
+        value_us = seconds * 1_000_000
+        self.counts[bisect.bisect_left(self.bounds_us, value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, q: float) -> float:
+        """
+        הערכת אחוזון (במיקרו-שניות)
+
+        Args:
+            q: אחוזון בין 0 ל-100
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if i < len(self.bounds_us):
+                    return min(self.bounds_us[i], self.max_us)
+                return self.max_us
+        return self.max_us
+
+    def snapshot(self) -> Dict:
+        """סיכום ההיסטוגרמה"""
+        return {
+            "count": self.count,
+            "mean_us": round(self.total_us / self.count, 2) if self.count else 0.0,
+            "max_us": round(self.max_us, 2),
+            "p50_us": round(self.percentile(50), 2),
+            "p95_us": round(self.percentile(95), 2),
+            "p99_us": round(self.percentile(99), 2),
+        }
+
+
+class StageTimer:
+    """
+    אוסף היסטוגרמות לפי שם שלב, בטוח לשימוש ממספר threads
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        """רישום משך של שלב"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def lap(self, stage: str, started_at: float) -> float:
+        """
+        רישום הזמן שעבר מאז started_at והחזרת נקודת הזמן הנוכחית
+        (נוח למדידת שלבים עוקבים)
+        """
+        now = time.perf_counter()
+        self.record(stage, now - started_at)
+        return now
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """סיכום כל השלבים"""
+        with self._lock:
+            return {
+                stage: histogram.snapshot()
+                for stage, histogram in self._histograms.items()
+            }
+
+    def reset(self):
+        """איפוס כל ההיסטוגרמות"""
+        with self._lock:
+            self._histograms.clear()
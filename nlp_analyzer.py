@@ -3,32 +3,99 @@
 מזהה קטגוריות, נושאים ומילות מפתח בטקסט עברי
 """
 
-from typing import Dict, List, Set
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import pickle
 import re
 import logging
-from config import CATEGORIES, TOPICS
+import threading
+import time
+from config import (
+    CATEGORIES,
+    TOPICS,
+    NLP_CACHE_SIZE,
+    NLP_LEXICON_ARTIFACT,
+    NLP_LEXICON_FILE,
+    NLP_TIMING_ENABLED,
+)
+from metrics import StageTimer
+
+try:
+    import numpy as np  # type: ignore
+    _HAS_NUMPY = True
+except Exception:
+    np = None  # type: ignore
+    _HAS_NUMPY = False
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# מילים חיוביות (ניתוח רגש בסיסי)
+POSITIVE_WORDS = [
+    'שמח', 'טוב', 'נהדר', 'מצוין', 'כיף', 'אוהב', 'אהבתי',
+    'מעולה', 'מדהים', 'יפה', 'נחמד', 'כייף', 'גאה', 'אלוף',
+    'הצלחה', 'מצליח', 'בעד'
+]
 
-class NLPAnalyzer:
+# מילים שליליות (ניתוח רגש בסיסי)
+NEGATIVE_WORDS = [
+    'עצוב', 'רע', 'נורא', 'קשה', 'כואב', 'מפחיד', 'חרדה',
+    'לחץ', 'מתח', 'עייף', 'כעס', 'כועס', 'מתסכל', 'בעיה',
+    'אין לי כוח', 'נמאס', 'דאגה', 'דואג', 'פחד'
+]
+
+# מילות עצירה נפוצות בעברית (לא נחשבות מילות מפתח)
+STOP_WORDS = frozenset({
+    'את', 'של', 'על', 'אל', 'עם', 'כל', 'לא', 'זה', 'היה',
+    'או', 'אם', 'כי', 'מה', 'יש', 'רק', 'גם', 'אני', 'הוא',
+    'היא', 'אתה', 'הם', 'לי', 'אבל', 'כן', 'לו', 'יותר',
+    'עוד', 'פה', 'שם', 'אז', 'כמו', 'בין', 'פעם', 'אחד',
+    'שני', 'כמה', 'אחרי', 'לפני', 'תמיד', 'עכשיו', 'פתאום'
+})
+
+# סוגי התאמות במילון הביטויים
+HIT_CATEGORY = "category"
+HIT_TOPIC = "topic"
+HIT_SENTIMENT = "sentiment"
+
+# גרסת פורמט ה-artifact של המילון המקומפל
+LEXICON_ARTIFACT_VERSION = 2
+
+# טוקן = רצף תווי מילה (תואם לגבולות \b של הביטויים)
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class CompiledLexicon:
     """
-    מחלקה לניתוח טקסט וזיהוי קטגוריות/נושאים
+    מילון מקומפל - כל טבלאות ה-lookup שהמנתח צריך, באובייקט אחד
+    שניתן לשמור לקובץ artifact ולהחליף בבת אחת.
     """
     
-    def __init__(self):
-        """אתחול המנתח"""
-        self.categories = CATEGORIES
-        self.topics = TOPICS
-        
-        # בניית מילונים לחיפוש מהיר
-        self._build_lookup_tables()
-    
-    def _build_lookup_tables(self):
+    def __init__(
+        self,
+        categories: Dict,
+        topics: Dict,
+        positive_words: List[str] = POSITIVE_WORDS,
+        negative_words: List[str] = NEGATIVE_WORDS
+    ):
         """
-        בניית טבלאות lookup לביצועים טובים יותר
+        קומפילציה של המילון לטבלאות lookup
+        
+        Args:
+            categories: הגדרות קטגוריות (כמו config.CATEGORIES)
+            topics: הגדרות נושאים (כמו config.TOPICS)
+            positive_words: מילים חיוביות
+            negative_words: מילים שליליות
         """
+        self.categories = categories
+        self.topics = topics
+        self.source_hash = lexicon_source_hash(
+            categories, topics, positive_words, negative_words
+        )
+        
         # המרת כל הטריגרים לאותיות קטנות
         self.category_triggers = {}
         for category, data in self.categories.items():
@@ -42,13 +109,394 @@ class NLPAnalyzer:
             self.topic_keywords[topic] = [
                 keyword.lower() for keyword in data["keywords"]
             ]
+        
+        # מילון אחיד: ביטוי -> רשימת תוויות (סוג, שם, משקל).
+        # משקל ברירת המחדל הוא 1; ניתן לכוונן ביטוי דרך "weights" ב-config.
+        self.lexicon: Dict[str, List[Tuple[str, str, float]]] = {}
+        for category, triggers in self.category_triggers.items():
+            weights = self.categories[category].get("weights", {})
+            for trigger in triggers:
+                self.lexicon.setdefault(trigger, []).append(
+                    (HIT_CATEGORY, category, float(weights.get(trigger, 1.0)))
+                )
+        for topic, keywords in self.topic_keywords.items():
+            weights = self.topics[topic].get("weights", {})
+            for keyword in keywords:
+                self.lexicon.setdefault(keyword, []).append(
+                    (HIT_TOPIC, topic, float(weights.get(keyword, 1.0)))
+                )
+        for word in positive_words:
+            self.lexicon.setdefault(word.lower(), []).append((HIT_SENTIMENT, "positive", 1.0))
+        for word in negative_words:
+            self.lexicon.setdefault(word.lower(), []).append((HIT_SENTIMENT, "negative", 1.0))
+        
+        # אינדקס hash לביטויים שמורכבים ממילים שלמות מופרדות ברווח בודד.
+        # ההתאמה נעשית ב-lookup לכל n-gram בטקסט, ולכן העלות תלויה
+        # באורך ההודעה ולא בגודל המילון.
+        self.phrase_index: Dict[str, Tuple[Tuple[str, str, float], ...]] = {}
+        self.max_ngram = 1
+        irregular_phrases = []
+        for phrase, labels in self.lexicon.items():
+            tokens = phrase.split(' ')
+            if all(_TOKEN_PATTERN.fullmatch(token) for token in tokens):
+                self.phrase_index[phrase] = tuple(labels)
+                self.max_ngram = max(self.max_ngram, len(tokens))
+            else:
+                irregular_phrases.append(phrase)
+        
+        # ביטויים חריגים (עם סימני פיסוק וכו') נתפסים בביטוי רגולרי יחיד.
+        # ה-lookahead מאפשר התאמות חופפות, והמיון מהארוך לקצר מבטיח
+        # שבכל מיקום תיתפס ההתאמה הארוכה ביותר.
+        self.fallback_pattern = None
+        self.fallback_prefixes: Dict[str, Tuple[str, ...]] = {}
+        if irregular_phrases:
+            phrases = sorted(irregular_phrases, key=len, reverse=True)
+            alternation = "|".join(re.escape(phrase) for phrase in phrases)
+            self.fallback_pattern = re.compile(
+                r'(?<!\w)(?=(' + alternation + r')(?!\w))'
+            )
+            # ביטויים חריגים קצרים יותר שמתחילים באותו מיקום
+            irregular_set = set(irregular_phrases)
+            for phrase in irregular_phrases:
+                boundaries = [m.end() for m in re.finditer(r'\w(?!\w)', phrase)]
+                self.fallback_prefixes[phrase] = tuple(
+                    phrase[:end] for end in boundaries
+                    if phrase[:end] in irregular_set
+                )
+        
+        # סדר התוויות (לפי config) ומספור הביטויים
+        self.category_labels = list(self.category_triggers)
+        self.topic_labels = list(self.topic_keywords)
+        self.phrase_ids = {phrase: i for i, phrase in enumerate(self.lexicon)}
+        
+        # מטריצות משקלים (ביטוי x תווית) עבור ניתוח באצווה
+        self.build_batch_matrices()
+        
+        # טביעת אצבע של הטבלאות המקומפלות
+        self.fingerprint = hashlib.sha256(
+            json.dumps(self.lexicon, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+    
+    def build_batch_matrices(self):
+        """
+        בניית מטריצות NumPy שממפות כל ביטוי במילון לציוני קטגוריה,
+        נושא ורגש. מכפלה של מטריצת ההתאמות (מסמך x ביטוי) בהן נותנת
+        את כל הציונים של האצווה בפעולה אחת.
+        """
+        self.has_batch_matrices = _HAS_NUMPY
+        if not _HAS_NUMPY:
+            return
+        
+        category_ids = {label: i for i, label in enumerate(self.category_labels)}
+        topic_ids = {label: i for i, label in enumerate(self.topic_labels)}
+        sentiment_ids = {"positive": 0, "negative": 1}
+        
+        phrases_count = len(self.phrase_ids)
+        self.category_weights = np.zeros((phrases_count, len(category_ids)))
+        self.topic_weights = np.zeros((phrases_count, len(topic_ids)))
+        self.sentiment_weights = np.zeros((phrases_count, len(sentiment_ids)))
+        
+        for phrase, row in self.phrase_ids.items():
+            for kind, label, weight in self.lexicon[phrase]:
+                if kind == HIT_CATEGORY:
+                    self.category_weights[row, category_ids[label]] += weight
+                elif kind == HIT_TOPIC:
+                    self.topic_weights[row, topic_ids[label]] += weight
+                elif kind == HIT_SENTIMENT:
+                    self.sentiment_weights[row, sentiment_ids[label]] += weight
+    
+    def iter_phrases(self, text: str):
+        """
+        פיצול הטקסט לטוקנים והפקת כל ה-n-grams הרציפים (עד אורך הביטוי
+        הארוך במילון). טוקנים נחשבים רציפים רק כשביניהם רווח בודד.
+        
+        Args:
+            text: טקסט מנורמל
+        
+        Yields:
+            ביטויים מועמדים לחיפוש באינדקס
+        """
+        tokens = [(m.group(), m.start(), m.end()) for m in _TOKEN_PATTERN.finditer(text)]
+        max_ngram = self.max_ngram
+        
+        for i, (phrase, _, end) in enumerate(tokens):
+            yield phrase
+            for j in range(i + 1, min(i + max_ngram, len(tokens))):
+                next_token, next_start, next_end = tokens[j]
+                if next_start != end + 1 or text[end] != ' ':
+                    break
+                phrase = f"{phrase} {next_token}"
+                end = next_end
+                yield phrase
+    
+    def match_phrases(self, text: str) -> Set[str]:
+        """
+        איתור כל ביטויי המילון שמופיעים בטקסט (ללא התוויות)
+        
+        Args:
+            text: טקסט מנורמל
+        
+        Returns:
+            קבוצת הביטויים שנמצאו
+        """
+        index = self.phrase_index
+        matched: Set[str] = {
+            phrase for phrase in self.iter_phrases(text)
+            if phrase in index
+        }
+        
+        if self.fallback_pattern is not None:
+            for match in self.fallback_pattern.finditer(text):
+                matched.update(self.fallback_prefixes[match.group(1)])
+        
+        return matched
+
+
+def lexicon_source_hash(
+    categories: Dict,
+    topics: Dict,
+    positive_words: List[str] = POSITIVE_WORDS,
+    negative_words: List[str] = NEGATIVE_WORDS
+) -> str:
+    """
+    hash של מקור המילון (כולל גרסת פורמט ה-artifact)
+    
+    Returns:
+        מחרוזת hex
+    """
+    source = {
+        "version": LEXICON_ARTIFACT_VERSION,
+        "categories": categories,
+        "topics": topics,
+        "positive": positive_words,
+        "negative": negative_words,
+    }
+    return hashlib.sha256(
+        json.dumps(source, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def load_lexicon_source(path: str) -> Tuple[Dict, Dict]:
+    """
+    קריאת מקור המילון מקובץ JSON ({"categories": ..., "topics": ...})
+    
+    Args:
+        path: נתיב הקובץ
+    
+    Returns:
+        (categories, topics)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["categories"], data["topics"]
+
+
+def save_lexicon_artifact(lexicon: CompiledLexicon, path: str = NLP_LEXICON_ARTIFACT):
+    """
+    שמירת מילון מקומפל לקובץ artifact (כתיבה אטומית).
+    שורה ראשונה: כותרת JSON (גרסה, hash המקור, sha256 של התוכן) - נבדקת
+    לפני ה-unpickle. אחריה: ה-pickle של המילון.
+    
+    Args:
+        lexicon: המילון המקומפל
+        path: נתיב הקובץ
+    """
+    payload = pickle.dumps(lexicon, protocol=pickle.HIGHEST_PROTOCOL)
+    header = {
+        "version": LEXICON_ARTIFACT_VERSION,
+        "source_hash": lexicon.source_hash,
+        "payload_sha256": hashlib.sha256(payload).hexdigest(),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(payload)
+    os.replace(tmp_path, path)
+    logger.info(f"💾 artifact מילון נשמר: {path} ({len(lexicon.lexicon)} ביטויים)")
+
+
+def load_lexicon_artifact(
+    source_hash: str,
+    path: str = NLP_LEXICON_ARTIFACT
+) -> Optional[CompiledLexicon]:
+    """
+    טעינת מילון מקומפל מקובץ artifact.
+    הגרסה, hash המקור וה-sha256 של התוכן נבדקים לפני ה-unpickle - קובץ
+    ישן, לא תואם או פגום לא נטען בכלל. (unpickle מריץ קוד - ה-artifact
+    חייב להגיע משלב ה-build, לא ממקור חיצוני.)
+    
+    Args:
+        source_hash: ה-hash הצפוי של מקור המילון
+        path: נתיב הקובץ
+    
+    Returns:
+        המילון המקומפל, או None אם הקובץ חסר, פגום או לא תואם למקור
+    """
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            payload = f.read()
+    except Exception as e:
+        logger.warning(f"⚠️ artifact מילון לא נטען ({path}): {e}")
+        return None
+    
+    if (
+        not isinstance(header, dict)
+        or header.get("version") != LEXICON_ARTIFACT_VERSION
+        or header.get("source_hash") != source_hash
+    ):
+        logger.info(f"ℹ️ artifact מילון לא תואם למקור - מקמפלים מחדש ({path})")
+        return None
+    
+    if hashlib.sha256(payload).hexdigest() != header.get("payload_sha256"):
+        logger.warning(f"⚠️ artifact מילון פגום (sha256 לא תואם) - מקמפלים מחדש ({path})")
+        return None
+    
+    try:
+        lexicon = pickle.loads(payload)
+    except Exception as e:
+        logger.warning(f"⚠️ artifact מילון לא נטען ({path}): {e}")
+        return None
+    
+    if not isinstance(lexicon, CompiledLexicon) or lexicon.source_hash != source_hash:
+        logger.warning(f"⚠️ artifact מילון לא תקין - מקמפלים מחדש ({path})")
+        return None
+    
+    # artifact שנבנה בלי NumPy - משלימים את המטריצות מקומית
+    if _HAS_NUMPY and not lexicon.has_batch_matrices:
+        lexicon.build_batch_matrices()
+    return lexicon
+
+
+class NLPAnalyzer:
+    """
+    מחלקה לניתוח טקסט וזיהוי קטגוריות/נושאים
+    """
+    
+    def __init__(
+        self,
+        cache_size: int = NLP_CACHE_SIZE,
+        artifact_path: Optional[str] = NLP_LEXICON_ARTIFACT,
+        lexicon_file: Optional[str] = NLP_LEXICON_FILE
+    ):
+        """
+        אתחול המנתח
+        
+        Args:
+            cache_size: מקסימום ניתוחים שמורים במטמון LRU (0 = ללא מטמון)
+            artifact_path: נתיב artifact של מילון מקומפל (None = תמיד לקמפל)
+            lexicon_file: קובץ JSON של מקור המילון (None = CATEGORIES/TOPICS מ-config)
+        """
+        self.artifact_path = artifact_path
+        self.lexicon_file = lexicon_file
+        
+        # מטמון LRU לתוצאות ניתוח, לפי hash של הטקסט המנורמל
+        self.cache_size = max(cache_size, 0)
+        self._cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # מדידת זמנים לפי שלב (None = כבוי, ללא תקורה)
+        self.stage_timer: Optional[StageTimer] = None
+        self.set_timing_enabled(NLP_TIMING_ENABLED)
+        
+        # בניית מילונים לחיפוש מהיר
+        self._lexicon, self.lexicon_source = self._load_or_compile(*self._lexicon_source_data())
+    
+    @property
+    def categories(self) -> Dict:
+        return self._lexicon.categories
+    
+    @property
+    def topics(self) -> Dict:
+        return self._lexicon.topics
     
-    def analyze(self, text: str) -> Dict:
+    @property
+    def lexicon_fingerprint(self) -> str:
+        return self._lexicon.fingerprint
+    
+    def _lexicon_source_data(self) -> Tuple[Dict, Dict]:
+        """
+        מקור המילון: קובץ ה-JSON אם הוגדר, אחרת CATEGORIES/TOPICS מ-config
+        
+        Returns:
+            (categories, topics)
+        """
+        if self.lexicon_file:
+            return load_lexicon_source(self.lexicon_file)
+        return CATEGORIES, TOPICS
+    
+    def _load_or_compile(self, categories: Dict, topics: Dict) -> Tuple[CompiledLexicon, str]:
+        """
+        טעינת המילון מ-artifact תואם, או קומפילציה אם אין כזה
+        
+        Returns:
+            (מילון מקומפל, מקור: "artifact" / "compiled")
+        """
+        if self.artifact_path:
+            source_hash = lexicon_source_hash(categories, topics)
+            lexicon = load_lexicon_artifact(source_hash, self.artifact_path)
+            if lexicon is not None:
+                return lexicon, "artifact"
+        
+        return CompiledLexicon(categories, topics), "compiled"
+    
+    def reload_lexicon(
+        self,
+        categories: Optional[Dict] = None,
+        topics: Optional[Dict] = None
+    ) -> Dict:
+        """
+        טעינה מחדש של המילון בזמן ריצה והחלפה אטומית שלו.
+        
+        בלי פרמטרים - קורא מחדש רק את נתוני המילון מ-NLP_LEXICON_FILE
+        (config.py לא נטען מחדש; בלי קובץ - CATEGORIES/TOPICS הנוכחיים).
+        ניתוחים שרצים ממשיכים עם המילון הקודם; המטמון מתנקה כשהמילון השתנה.
+        
+        Args:
+            categories: הגדרות קטגוריות חדשות (אופציונלי)
+            topics: הגדרות נושאים חדשות (אופציונלי)
+        
+        Returns:
+            מילון עם פרטי המילון שנטען
+        """
+        if categories is None or topics is None:
+            source_categories, source_topics = self._lexicon_source_data()
+            categories = source_categories if categories is None else categories
+            topics = source_topics if topics is None else topics
+        
+        lexicon, source = self._load_or_compile(categories, topics)
+        changed = lexicon.fingerprint != self._lexicon.fingerprint
+        
+        # החלפה אטומית - כל ניתוח קורא את self._lexicon פעם אחת
+        self._lexicon, self.lexicon_source = lexicon, source
+        if changed:
+            self.clear_cache()
+        
+        logger.info(
+            f"🔄 מילון NLP נטען מחדש ({source}): {len(lexicon.lexicon)} ביטויים, "
+            f"{'השתנה' if changed else 'ללא שינוי'}"
+        )
+        
+        return {
+            "source": source,
+            "changed": changed,
+            "phrases": len(lexicon.lexicon),
+            "fingerprint": lexicon.fingerprint,
+        }
+    
+    def analyze(self, text: str, include_keywords: bool = True) -> Dict:
         """
         ניתוח מלא של טקסט
         
         Args:
             text: הטקסט לניתוח
+            include_keywords: האם לחלץ מילות מפתח (בשמירה הן מדורגות מחדש
+                לפי TF-IDF, ולכן הבוט מוותר עליהן)
         
         Returns:
             מילון עם תוצאות הניתוח:
@@ -60,36 +508,192 @@ class NLPAnalyzer:
                 "confidence": float
             }
         """
+        # analyze_total נמדד מהכניסה ועד היציאה בכל מסלול (כולל מטמון וטקסט ריק)
+        timer = self.stage_timer
+        if timer:
+            started_at = time.perf_counter()
+        
         if not text or not text.strip():
-            return self._empty_analysis()
+            analysis = self._empty_analysis()
+            if timer:
+                timer.lap("analyze_total", started_at)
+            return analysis
         
         # נירמול הטקסט
         normalized_text = self._normalize_text(text)
         
+        if timer:
+            timer.lap("normalize_text", started_at)
+        
+        # בדיקה במטמון - מחשבה שחוזרת על עצמה לא מנותחת שוב
+        cache_key = self._cache_key(normalized_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.debug(f"♻️ ניתוח מהמטמון: קטגוריה={cached['category']}")
+            if include_keywords:
+                cached["keywords"] = self._extract_keywords(normalized_text)
+            if timer:
+                elapsed = time.perf_counter() - started_at
+                timer.record("analyze_cache_hit", elapsed)
+                timer.record("analyze_total", elapsed)
+            return cached
+        
+        analysis = self._analyze_normalized(normalized_text)
+        self._cache_put(cache_key, analysis)
+        
+        logger.info(f"📊 ניתוח הושלם: קטגוריה={analysis['category']}, נושאים={analysis['topics']}")
+        
+        analysis = self._copy_analysis(analysis)
+        if include_keywords:
+            if timer:
+                lap_at = time.perf_counter()
+            analysis["keywords"] = self._extract_keywords(normalized_text)
+            if timer:
+                timer.lap("extract_keywords", lap_at)
+        if timer:
+            timer.lap("analyze_total", started_at)
+        return analysis
+    
+    def _analyze_normalized(self, normalized_text: str) -> Dict:
+        """
+        ניתוח טקסט שכבר עבר נירמול (ללא מטמון וללא מילות מפתח - הן מחולצות
+        לפי בקשה אחרי המטמון)
+        
+        Args:
+            normalized_text: טקסט מנורמל
+        
+        Returns:
+            מילון עם תוצאות הניתוח
+        """
+        timer = self.stage_timer
+        if timer:
+            started_at = lap_at = time.perf_counter()
+        
+        # סריקה יחידה של הטקסט מול כל המילון
+        hits = self._match_lexicon(normalized_text)
+        if timer:
+            lap_at = timer.lap("match_lexicon", lap_at)
+        
         # זיהוי קטגוריה
-        category, category_confidence = self._detect_category(normalized_text)
+        category, category_confidence = self._detect_category(normalized_text, hits)
+        if timer:
+            lap_at = timer.lap("detect_category", lap_at)
         
         # זיהוי נושאים
-        topics = self._detect_topics(normalized_text)
-        
-        # חילוץ מילות מפתח
-        keywords = self._extract_keywords(normalized_text)
+        topics = self._detect_topics(normalized_text, hits)
+        if timer:
+            lap_at = timer.lap("detect_topics", lap_at)
         
         # ניתוח רגש בסיסי
-        sentiment = self._basic_sentiment_analysis(normalized_text)
+        sentiment = self._basic_sentiment_analysis(normalized_text, hits)
+        if timer:
+            timer.lap("basic_sentiment_analysis", lap_at)
+            timer.lap("analyze_uncached", started_at)
         
         analysis = {
             "category": category,
             "topics": topics,
-            "keywords": keywords,
+            "keywords": [],
             "sentiment": sentiment,
             "confidence": category_confidence
         }
         
-        logger.info(f"📊 ניתוח הושלם: קטגוריה={category}, נושאים={topics}")
-        
         return analysis
     
+    # ===== מדידת זמנים =====
+    
+    def set_timing_enabled(self, enabled: bool):
+        """
+        הפעלה/כיבוי של מדידת זמנים לפי שלב
+        
+        Args:
+            enabled: האם למדוד
+        """
+        if enabled and self.stage_timer is None:
+            self.stage_timer = StageTimer()
+        elif not enabled:
+            self.stage_timer = None
+    
+    def stage_timings(self) -> Dict:
+        """
+        סיכום זמני השלבים (p50/p95/p99 במיקרו-שניות)
+        
+        Returns:
+            מילון {"enabled": bool, "stages": {שלב: סיכום}}
+        """
+        timer = self.stage_timer
+        return {
+            "enabled": timer is not None,
+            "stages": timer.snapshot() if timer else {},
+        }
+    
+    # ===== מטמון ניתוחים (LRU) =====
+    
+    def _cache_key(self, normalized_text: str) -> bytes:
+        """מפתח מטמון - hash של הטקסט המנורמל (בהקשר של גרסת המילון)"""
+        key = hashlib.blake2b(digest_size=16)
+        key.update(self._lexicon.fingerprint.encode("ascii"))
+        key.update(normalized_text.encode("utf-8"))
+        return key.digest()
+    
+    def _copy_analysis(self, analysis: Dict) -> Dict:
+        """העתקה של תוצאת ניתוח כדי שקוראים לא ישנו את העותק השמור"""
+        return {
+            **analysis,
+            "topics": list(analysis["topics"]),
+            "keywords": list(analysis["keywords"]),
+        }
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict]:
+        """שליפה מהמטמון (מעדכן מונים וסדר LRU)"""
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            analysis = self._cache.get(key)
+            if analysis is None:
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+        return self._copy_analysis(analysis)
+    
+    def _cache_put(self, key: bytes, analysis: Dict):
+        """הכנסה למטמון עם פינוי הפריט הישן ביותר"""
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = analysis
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """ניקוי מטמון הניתוחים"""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def cache_stats(self) -> Dict:
+        """
+        סטטיסטיקות מטמון הניתוחים
+        
+        Returns:
+            מילון עם גודל, מונים ויחס פגיעות
+        """
+        with self._cache_lock:
+            hits = self._cache_hits
+            misses = self._cache_misses
+            size = len(self._cache)
+        lookups = hits + misses
+        return {
+            "size": size,
+            "max_size": self.cache_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "lexicon_fingerprint": self.lexicon_fingerprint,
+            "lexicon_source": self.lexicon_source,
+        }
+    
     def _normalize_text(self, text: str) -> str:
         """
         נירמול טקסט - הסרת רווחים מיותרים, המרה לאותיות קטנות
@@ -108,32 +712,55 @@ class NLPAnalyzer:
         
         return text
     
-    def _detect_category(self, text: str) -> tuple[str, float]:
+    def _match_lexicon(self, text: str) -> List[Tuple[str, str, str, float]]:
+        """
+        מעבר יחיד על הטקסט ואיתור כל ביטויי המילון בעזרת האינדקס
+        
+        Args:
+            text: טקסט מנורמל
+        
+        Returns:
+            רשימת התאמות (ביטוי, סוג, תווית, משקל) - כל ביטוי פעם אחת
+        """
+        lexicon = self._lexicon
+        return [
+            (phrase, kind, label, weight)
+            for phrase in lexicon.match_phrases(text)
+            for kind, label, weight in lexicon.lexicon[phrase]
+        ]
+    
+    def _detect_category(
+        self,
+        text: str,
+        hits: Optional[List[Tuple[str, str, str, float]]] = None
+    ) -> tuple[str, float]:
         """
         זיהוי הקטגוריה המתאימה ביותר
         
         Args:
             text: טקסט מנורמל
+            hits: התאמות מילון שכבר חושבו (אופציונלי)
         
         Returns:
             (שם_קטגוריה, רמת_ביטחון)
         """
-        category_scores = {}
+        if hits is None:
+            hits = self._match_lexicon(text)
         
-        # חישוב ציון לכל קטגוריה
-        for category, triggers in self.category_triggers.items():
-            score = 0
-            matches = []
-            
-            for trigger in triggers:
-                # חיפוש המילה/ביטוי בטקסט
-                if self._word_in_text(trigger, text):
-                    score += 1
-                    matches.append(trigger)
-            
-            if score > 0:
+        matches_by_category: Dict[str, List[str]] = {}
+        weights_by_category: Dict[str, float] = {}
+        for phrase, kind, label, weight in hits:
+            if kind == HIT_CATEGORY:
+                matches_by_category.setdefault(label, []).append(phrase)
+                weights_by_category[label] = weights_by_category.get(label, 0.0) + weight
+        
+        # חישוב ציון לכל קטגוריה (לפי סדר ההגדרה ב-config)
+        category_scores = {}
+        for category in self._lexicon.category_labels:
+            matches = matches_by_category.get(category)
+            if matches:
                 category_scores[category] = {
-                    "score": score,
+                    "score": weights_by_category[category],
                     "matches": matches
                 }
         
@@ -158,34 +785,80 @@ class NLPAnalyzer:
         
         return category_name, confidence
     
-    def _detect_topics(self, text: str) -> List[str]:
+    def _detect_topics(
+        self,
+        text: str,
+        hits: Optional[List[Tuple[str, str, str, float]]] = None
+    ) -> List[str]:
         """
         זיהוי נושאים רלוונטיים
         
         Args:
             text: טקסט מנורמל
+            hits: התאמות מילון שכבר חושבו (אופציונלי)
         
         Returns:
             רשימת נושאים
         """
-        detected_topics = []
+        if hits is None:
+            hits = self._match_lexicon(text)
         
-        for topic, keywords in self.topic_keywords.items():
-            for keyword in keywords:
-                if self._word_in_text(keyword, text):
-                    detected_topics.append(topic)
-                    break  # מספיק match אחד לכל נושא
+        # מספיק match אחד לכל נושא
+        matched_topics = {label for _, kind, label, _ in hits if kind == HIT_TOPIC}
         
         # מיון לפי סדר חשיבות (לפי הגדרה ב-config)
-        detected_topics = sorted(
-            detected_topics,
-            key=lambda t: list(self.topics.keys()).index(t)
-        )
+        detected_topics = [
+            topic for topic in self._lexicon.topic_labels
+            if topic in matched_topics
+        ]
         
         logger.debug(f"🏷️ נושאים שזוהו: {detected_topics}")
         
         return detected_topics
     
+    def _keyword_tokens(self, text: str) -> List[str]:
+        """
+        פיצול טקסט מנורמל למילים וסינון מילות עצירה ומילים קצרות
+        
+        Args:
+            text: טקסט מנורמל
+        
+        Returns:
+            רשימת מילים (לפי סדר, כולל חזרות)
+        """
+        return [
+            word for word in _TOKEN_PATTERN.findall(text)
+            if word not in STOP_WORDS and len(word) > 2
+        ]
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        נירמול ופיצול טקסט גולמי למילים
+        
+        Args:
+            text: טקסט מקורי
+        
+        Returns:
+            רשימת מילים (לפי סדר)
+        """
+        if not text:
+            return []
+        return _TOKEN_PATTERN.findall(self._normalize_text(text))
+    
+    def keyword_candidates(self, text: str) -> List[str]:
+        """
+        מועמדים למילות מפתח מטקסט גולמי (לדירוג TF-IDF)
+        
+        Args:
+            text: טקסט מקורי
+        
+        Returns:
+            רשימת מילים (לפי סדר, כולל חזרות - לחישוב TF)
+        """
+        if not text:
+            return []
+        return self._keyword_tokens(self._normalize_text(text))
+    
     def _extract_keywords(self, text: str, max_keywords: int = 5) -> List[str]:
         """
         חילוץ מילות מפתח מהטקסט
@@ -197,23 +870,7 @@ class NLPAnalyzer:
         Returns:
             רשימת מילות מפתח
         """
-        # הסרת מילות עצירה נפוצות בעברית
-        stop_words = {
-            'את', 'של', 'על', 'אל', 'עם', 'כל', 'לא', 'זה', 'היה',
-            'או', 'אם', 'כי', 'מה', 'יש', 'רק', 'גם', 'אני', 'הוא',
-            'היא', 'אתה', 'הם', 'לי', 'אבל', 'כן', 'לו', 'יותר',
-            'עוד', 'פה', 'שם', 'אז', 'כמו', 'בין', 'פעם', 'אחד',
-            'שני', 'כמה', 'אחרי', 'לפני', 'תמיד', 'עכשיו', 'פתאום'
-        }
-        
-        # פיצול למילים
-        words = re.findall(r'\b\w+\b', text)
-        
-        # סינון מילות עצירה ומילים קצרות
-        keywords = [
-            word for word in words
-            if word not in stop_words and len(word) > 2
-        ]
+        keywords = self._keyword_tokens(text)
         
         # הסרת כפילויות תוך שמירה על סדר
         seen = set()
@@ -226,38 +883,32 @@ class NLPAnalyzer:
         # החזרת מקסימום X מילות מפתח
         return unique_keywords[:max_keywords]
     
-    def _basic_sentiment_analysis(self, text: str) -> str:
+    def _basic_sentiment_analysis(
+        self,
+        text: str,
+        hits: Optional[List[Tuple[str, str, str, float]]] = None
+    ) -> str:
         """
         ניתוח רגש בסיסי
         
         Args:
             text: טקסט מנורמל
+            hits: התאמות מילון שכבר חושבו (אופציונלי)
         
         Returns:
             'positive', 'negative', 'neutral'
         """
-        # מילים חיוביות
-        positive_words = [
-            'שמח', 'טוב', 'נהדר', 'מצוין', 'כיף', 'אוהב', 'אהבתי',
-            'מעולה', 'מדהים', 'יפה', 'נחמד', 'כייף', 'גאה', 'אלוף',
-            'הצלחה', 'מצליח', 'בעד'
-        ]
-        
-        # מילים שליליות
-        negative_words = [
-            'עצוב', 'רע', 'נורא', 'קשה', 'כואב', 'מפחיד', 'חרדה',
-            'לחץ', 'מתח', 'עייף', 'כעס', 'כועס', 'מתסכל', 'בעיה',
-            'אין לי כוח', 'נמאס', 'דאגה', 'דואג', 'פחד'
-        ]
+        if hits is None:
+            hits = self._match_lexicon(text)
         
         positive_count = sum(
-            1 for word in positive_words
-            if self._word_in_text(word, text)
+            weight for _, kind, label, weight in hits
+            if kind == HIT_SENTIMENT and label == "positive"
         )
         
         negative_count = sum(
-            1 for word in negative_words
-            if self._word_in_text(word, text)
+            weight for _, kind, label, weight in hits
+            if kind == HIT_SENTIMENT and label == "negative"
         )
         
         if positive_count > negative_count:
@@ -267,21 +918,6 @@ class NLPAnalyzer:
         else:
             return 'neutral'
     
-    def _word_in_text(self, word: str, text: str) -> bool:
-        """
-        בדיקה אם מילה קיימת בטקסט (כמילה שלמה)
-        
-        Args:
-            word: המילה לחיפוש
-            text: הטקסט לחיפוש בו
-        
-        Returns:
-            True אם המילה נמצאת
-        """
-        # חיפוש כמילה שלמה (עם גבולות מילה)
-        pattern = r'\b' + re.escape(word) + r'\b'
-        return bool(re.search(pattern, text))
-    
     def _empty_analysis(self) -> Dict:
         """
         תוצאת ניתוח ריקה
@@ -297,17 +933,135 @@ class NLPAnalyzer:
             "confidence": 0.0
         }
     
-    def batch_analyze(self, texts: List[str]) -> List[Dict]:
+    def batch_analyze(self, texts: List[str], include_keywords: bool = True) -> List[Dict]:
         """
         ניתוח של מספר טקסטים בבת אחת
         
         Args:
             texts: רשימת טקסטים
+            include_keywords: האם לחלץ מילות מפתח (כמו ב-analyze)
+        
+        Returns:
+            רשימת תוצאות ניתוח (באותו סדר)
+        """
+        results: List[Optional[Dict]] = [None] * len(texts)
+        # טקסטים שלא נמצאו במטמון, מקובצים לפי מפתח (כפילויות מנותחות פעם אחת)
+        pending: "OrderedDict[bytes, Tuple[str, List[int]]]" = OrderedDict()
+        normalized_texts: Dict[int, str] = {}
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = self._empty_analysis()
+                continue
+            
+            normalized_text = self._normalize_text(text)
+            normalized_texts[i] = normalized_text
+            cache_key = self._cache_key(normalized_text)
+            if cache_key in pending:
+                pending[cache_key][1].append(i)
+                continue
+            
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[cache_key] = (normalized_text, [i])
+        
+        if pending:
+            analyses = self._batch_analyze_normalized(
+                [normalized_text for normalized_text, _ in pending.values()]
+            )
+            for (cache_key, (_, indices)), analysis in zip(pending.items(), analyses):
+                self._cache_put(cache_key, analysis)
+                for i in indices:
+                    results[i] = self._copy_analysis(analysis)
+        
+        if include_keywords:
+            for i, normalized_text in normalized_texts.items():
+                results[i]["keywords"] = self._extract_keywords(normalized_text)
+        
+        logger.info(f"📊 ניתוח אצווה הושלם: {len(texts)} טקסטים ({len(pending)} חדשים)")
+        
+        return results
+    
+    def _batch_analyze_normalized(self, texts: List[str]) -> List[Dict]:
+        """
+        ניתוח וקטורי של טקסטים מנורמלים.
+        
+        בונה מטריצת התאמות דלילה (מסמך x ביטוי) בפורמט COO ומחשב ממנה
+        ציוני קטגוריות, נושאים ורגש כפעולות מטריציוניות.
+        
+        Args:
+            texts: טקסטים מנורמלים
         
         Returns:
             רשימת תוצאות ניתוח
         """
-        return [self.analyze(text) for text in texts]
+        lexicon = self._lexicon
+        if not lexicon.has_batch_matrices:
+            return [self._analyze_normalized(text) for text in texts]
+        
+        timer = self.stage_timer
+        if timer:
+            started_at = time.perf_counter()
+        
+        # מטריצת ההתאמות הדלילה: (מסמך, ביטוי) לכל התאמה
+        doc_ids: List[int] = []
+        phrase_ids: List[int] = []
+        for doc_id, text in enumerate(texts):
+            for phrase in lexicon.match_phrases(text):
+                doc_ids.append(doc_id)
+                phrase_ids.append(lexicon.phrase_ids[phrase])
+        
+        rows = np.asarray(doc_ids, dtype=np.intp)
+        cols = np.asarray(phrase_ids, dtype=np.intp)
+        docs_count = len(texts)
+        
+        # H @ W עבור H דלילה: צבירת שורות המשקלים של כל התאמה למסמך שלה
+        category_scores = np.zeros((docs_count, len(lexicon.category_labels)))
+        topic_scores = np.zeros((docs_count, len(lexicon.topic_labels)))
+        sentiment_scores = np.zeros((docs_count, 2))
+        np.add.at(category_scores, rows, lexicon.category_weights[cols])
+        np.add.at(topic_scores, rows, lexicon.topic_weights[cols])
+        np.add.at(sentiment_scores, rows, lexicon.sentiment_weights[cols])
+        
+        # argmax מחזיר את המופע הראשון - שומר על סדר העדיפויות של config
+        best_categories = category_scores.argmax(axis=1)
+        best_scores = category_scores[np.arange(docs_count), best_categories]
+        topic_members = topic_scores > 0
+        
+        analyses = []
+        for doc_id, text in enumerate(texts):
+            score = float(best_scores[doc_id])
+            if score > 0:
+                category = lexicon.category_labels[best_categories[doc_id]]
+                confidence = min(score / 3.0, 1.0)
+            else:
+                category, confidence = "הרהורים", 0.3
+            
+            positive_count, negative_count = sentiment_scores[doc_id]
+            if positive_count > negative_count:
+                sentiment = 'positive'
+            elif negative_count > positive_count:
+                sentiment = 'negative'
+            else:
+                sentiment = 'neutral'
+            
+            analyses.append({
+                "category": category,
+                "topics": [
+                    lexicon.topic_labels[j]
+                    for j in np.flatnonzero(topic_members[doc_id])
+                ],
+                "keywords": [],
+                "sentiment": sentiment,
+                "confidence": confidence
+            })
+        
+        if timer:
+            timer.lap("batch_analyze", started_at)
+        
+        return analyses
     
     def get_category_emoji(self, category: str) -> str:
         """
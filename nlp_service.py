@@ -0,0 +1,137 @@
+"""
+שירות הרצת ניתוחי NLP מחוץ ללולאת האירועים של הבוט
+טקסטים קצרים מנותחים במקום, טקסטים ארוכים ואצוות נשלחים ל-pool של threads.
+ה-pool משתף את המנתח הגלובלי (מטמון, מילון) עם שאר התהליך - אין pool של תהליכים.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+from typing import Callable, Dict, List, Optional
+
+from config import (
+    NLP_INLINE_MAX_CHARS,
+    NLP_EXECUTOR_WORKERS,
+    NLP_EXECUTOR_MAX_PENDING,
+)
+from nlp_analyzer import NLPAnalyzer, nlp
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisService:
+    """
+    שירות אסינכרוני לניתוח טקסטים בלי לחסום את לולאת האירועים
+    """
+    
+    def __init__(
+        self,
+        analyzer: NLPAnalyzer = nlp,
+        inline_max_chars: int = NLP_INLINE_MAX_CHARS,
+        max_workers: int = NLP_EXECUTOR_WORKERS,
+        max_pending: int = NLP_EXECUTOR_MAX_PENDING
+    ):
+        """
+        אתחול השירות
+        
+        Args:
+            analyzer: המנתח (משותף להרצה במקום ול-pool)
+            inline_max_chars: סף אורך (בתווים) להרצה במקום
+            max_workers: מספר ה-workers ב-pool
+            max_pending: עומק תור מקסימלי - מעבר לו קוראים ממתינים
+        """
+        self.analyzer = analyzer
+        self.inline_max_chars = inline_max_chars
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max(max_pending, 1)
+        
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        # נוצר בעצלות כדי להיקשר ללולאת האירועים של הבוט
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._inline_count = 0
+        self._offloaded_count = 0
+    
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """יצירת ה-pool בשימוש הראשון"""
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="nlp-worker"
+            )
+            logger.info(f"🧵 Pool ניתוח NLP הופעל ({self.max_workers} workers)")
+        return self._executor
+    
+    async def _submit(self, func: Callable, *args):
+        """שליחת עבודה ל-pool עם הגבלת עומק התור"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        
+        async with self._semaphore:
+            self._pending += 1
+            self._offloaded_count += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            finally:
+                self._pending -= 1
+    
+    async def analyze(self, text: str, include_keywords: bool = True) -> Dict:
+        """
+        ניתוח טקסט בודד
+        
+        Args:
+            text: הטקסט לניתוח
+            include_keywords: האם לחלץ מילות מפתח
+        
+        Returns:
+            תוצאות הניתוח (כמו NLPAnalyzer.analyze)
+        """
+        if len(text or "") <= self.inline_max_chars:
+            self._inline_count += 1
+            return self.analyzer.analyze(text, include_keywords)
+        
+        return await self._submit(self.analyzer.analyze, text, include_keywords)
+    
+    async def batch_analyze(self, texts: List[str], include_keywords: bool = True) -> List[Dict]:
+        """
+        ניתוח אצווה של טקסטים
+        
+        Args:
+            texts: רשימת טקסטים
+            include_keywords: האם לחלץ מילות מפתח
+        
+        Returns:
+            רשימת תוצאות ניתוח (באותו סדר)
+        """
+        total_chars = sum(len(text or "") for text in texts)
+        if total_chars <= self.inline_max_chars:
+            self._inline_count += 1
+            return self.analyzer.batch_analyze(texts, include_keywords)
+        
+        return await self._submit(self.analyzer.batch_analyze, texts, include_keywords)
+    
+    def stats(self) -> Dict:
+        """
+        סטטיסטיקות השירות
+        
+        Returns:
+            מילון עם מונים ועומק תור נוכחי
+        """
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "inline": self._inline_count,
+            "offloaded": self._offloaded_count,
+        }
+    
+    def shutdown(self, wait: bool = True):
+        """סגירת ה-pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# יצירת אובייקט גלובלי
+analysis_service = AnalysisService()
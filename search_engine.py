@@ -0,0 +1,245 @@
+"""
+מנוע חיפוש בזיכרון - אינדקס הפוך לכל משתמש
+תומך במילים חלקיות (התאמת קידומת) ובאותיות שימוש בעברית (ה/ו/ב/ל/כ/מ/ש),
+כך ש"בבית" ו"הבית" נמצאים גם בחיפוש "בית"
+"""
+
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import PREVIEW_TEXT_LENGTH, SEARCH_INDEX_MAX_USERS
+from nlp_analyzer import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# אותיות שימוש שיכולות להופיע בתחילת מילה
+HEBREW_PREFIX_LETTERS = frozenset("והבלכמש")
+# מקסימום אותיות שימוש רצופות (למשל "ושב" ב"ושבבית")
+_MAX_PREFIX_LETTERS = 3
+# אורך מינימלי למילה אחרי הסרת אותיות שימוש
+_MIN_STEM_LENGTH = 3
+
+# ניקוד להתאמה מלאה מול התאמת קידומת (מילה חלקית)
+_EXACT_MATCH_SCORE = 2.0
+_PREFIX_MATCH_SCORE = 1.0
+
+
+def term_variants(token: str) -> List[str]:
+    """
+    המילה עצמה + הגרסאות שלה בלי אותיות שימוש בתחילתה
+
+    Args:
+        token: מילה מנורמלת
+
+    Returns:
+        רשימת גרסאות (המילה המקורית ראשונה)
+    """
+    variants = [token]
+    stem = token
+    for _ in range(_MAX_PREFIX_LETTERS):
+        if len(stem) - 1 < _MIN_STEM_LENGTH or stem[0] not in HEBREW_PREFIX_LETTERS:
+            break
+        stem = stem[1:]
+        variants.append(stem)
+    return variants
+
+
+class _UserSearchIndex:
+    """אינדקס הפוך של משתמש בודד"""
+
+    __slots__ = ("postings", "vocabulary", "docs")
+
+    def __init__(self):
+        # מילה -> מזהי מחשבות
+        self.postings: Dict[str, Set[str]] = {}
+        # אוצר מילים ממוין (לחיפוש קידומת ב-bisect)
+        self.vocabulary: List[str] = []
+        # מזהה מחשבה -> (שדות תצוגה עם טקסט מקוצר, המילים שלה)
+        self.docs: Dict[str, tuple] = {}
+
+    def load(self, entries: Iterable[tuple]):
+        """
+        בנייה מלאה: רשימות ההופעה נבנות קודם ואוצר המילים ממוין פעם אחת
+        (insort לכל מילה חדשה היה O(V^2) בטעינה)
+        """
+        for thought_id, thought, terms in entries:
+            self.docs[thought_id] = (thought, terms)
+            for term in terms:
+                self.postings.setdefault(term, set()).add(thought_id)
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, thought_id: str, thought: Dict[str, Any], terms: Set[str]):
+        """הוספה בודדת (אחרי הטעינה) - insort שומר על המיון"""
+        self.remove(thought_id)
+        self.docs[thought_id] = (thought, terms)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = set()
+                bisect.insort(self.vocabulary, term)
+            posting.add(thought_id)
+
+    def remove(self, thought_id: str):
+        entry = self.docs.pop(thought_id, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.discard(thought_id)
+            if not posting:
+                del self.postings[term]
+                position = bisect.bisect_left(self.vocabulary, term)
+                if position < len(self.vocabulary) and self.vocabulary[position] == term:
+                    del self.vocabulary[position]
+
+    def prefix_terms(self, prefix: str) -> Iterable[str]:
+        position = bisect.bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            yield self.vocabulary[position]
+            position += 1
+
+
+class SearchIndex:
+    """
+    אינדקסים הפוכים לכל משתמש (טעינה עצלה, פינוי LRU).
+    מונגו נשאר מקור האמת - האינדקס מכיל רק מחשבות פעילות.
+    """
+
+    def __init__(self, max_users: int = SEARCH_INDEX_MAX_USERS):
+        """
+        Args:
+            max_users: מקסימום משתמשים בזיכרון
+        """
+        self.max_users = max(max_users, 1)
+        self._users: "OrderedDict[int, _UserSearchIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _document_terms(tokens: List[str]) -> Set[str]:
+        terms = set()
+        for token in tokens:
+            terms.update(term_variants(token))
+        return terms
+
+    @staticmethod
+    def _display_fields(thought: Dict[str, Any]) -> Dict[str, Any]:
+        """השדות שנשמרים בזיכרון להצגת תוצאות (תצוגה מקדימה, לא הטקסט המלא)"""
+        analysis = thought.get("nlp_analysis") or {}
+        return {
+            "_id": thought["_id"],
+            "raw_text": (thought.get("raw_text") or "")[:PREVIEW_TEXT_LENGTH],
+            "created_at": thought.get("created_at"),
+            "nlp_analysis": {"category": analysis.get("category")},
+        }
+
+    # ===== ניהול אינדקס =====
+
+    def is_user_loaded(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+    def load_user(self, user_id: int, thoughts: Iterable[tuple]):
+        """
+        בניית האינדקס של משתמש
+
+        Args:
+            user_id: מזהה המשתמש
+            thoughts: זוגות (מסמך מחשבה, מילים מנורמלות)
+        """
+        index = _UserSearchIndex()
+        index.load(
+            (str(thought["_id"]), self._display_fields(thought), self._document_terms(tokens))
+            for thought, tokens in thoughts
+        )
+
+        with self._lock:
+            self._users[user_id] = index
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+        logger.info(f"🔎 אינדקס חיפוש נטען למשתמש {user_id} ({len(index.docs)} מחשבות)")
+
+    def add(self, user_id: int, thought: Dict[str, Any], tokens: List[str]):
+        """הוספת מחשבה (רק אם האינדקס של המשתמש כבר טעון)"""
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                index.add(str(thought["_id"]), self._display_fields(thought), self._document_terms(tokens))
+
+    def remove(self, thought_ids: Iterable[str], user_id: Optional[int] = None):
+        """
+        הסרת מחשבות מהאינדקס (ארכוב/מחיקה)
+
+        Args:
+            thought_ids: מזהי המחשבות
+            user_id: מזהה המשתמש, או None לחיפוש בכל האינדקסים הטעונים
+        """
+        thought_ids = list(thought_ids)
+        with self._lock:
+            if user_id is not None:
+                indexes = [self._users[user_id]] if user_id in self._users else []
+            else:
+                indexes = list(self._users.values())
+            for index in indexes:
+                for thought_id in thought_ids:
+                    index.remove(thought_id)
+
+    def drop_user(self, user_id: int):
+        """הסרת כל האינדקס של המשתמש מהזיכרון"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    # ===== חיפוש =====
+
+    def search(self, user_id: int, query_tokens: List[str], limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        חיפוש מחשבות (OR בין המילים, מחשבות שמתאימות ליותר מילים מדורגות גבוה יותר)
+
+        Args:
+            user_id: מזהה המשתמש
+            query_tokens: מילות החיפוש המנורמלות
+            limit: מקסימום תוצאות
+
+        Returns:
+            מחשבות מתאימות (מהרלוונטית ביותר, ואז מהחדשה ביותר)
+        """
+        tokens = [token for token in query_tokens if token not in STOP_WORDS] or query_tokens
+
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None or not tokens:
+                return []
+            self._users.move_to_end(user_id)
+
+            scores: Dict[str, float] = {}
+            for token in dict.fromkeys(tokens):
+                token_scores: Dict[str, float] = {}
+                for variant in term_variants(token):
+                    for term in index.prefix_terms(variant):
+                        score = _EXACT_MATCH_SCORE if term == variant else _PREFIX_MATCH_SCORE
+                        for thought_id in index.postings[term]:
+                            if token_scores.get(thought_id, 0.0) < score:
+                                token_scores[thought_id] = score
+                for thought_id, score in token_scores.items():
+                    scores[thought_id] = scores.get(thought_id, 0.0) + score
+
+            ranked = sorted(
+                scores,
+                key=lambda thought_id: (
+                    scores[thought_id],
+                    index.docs[thought_id][0].get("created_at") or datetime.min
+                ),
+                reverse=True
+            )
+            return [dict(index.docs[thought_id][0]) for thought_id in ranked[:limit]]
+
+
+# יצירת אובייקט גלובלי
+search_index = SearchIndex()
@@ -0,0 +1,272 @@
+"""
+מנוע חיפוש מחשבות דומות - MinHash + LSH
+מחזיק לכל משתמש אינדקס bands בזיכרון, כך ששאילתת "חיפוש דומים"
+לא סורקת את כל המחשבות של המשתמש
+"""
+
+import hashlib
+import logging
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    SIMILARITY_NUM_PERM,
+    SIMILARITY_BANDS,
+    SIMILARITY_MAX_RESULTS,
+    SIMILARITY_MAX_USERS,
+)
+from nlp_analyzer import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# ראשוני מרסן (2^61 - 1) - כל ערכי החתימה נכנסים ב-int64 של מונגו
+_MERSENNE_PRIME = (1 << 61) - 1
+# זרע קבוע - חתימות שנשמרו במסד חייבות להישאר תואמות בין הפעלות
+_PERMUTATION_SEED = 1
+# סף דמיון מינימלי (Jaccard משוער) להצגת תוצאה
+_MIN_SIMILARITY = 0.1
+
+
+def text_shingles(tokens: List[str]) -> Set[str]:
+    """
+    בניית shingles ממילים מנורמלות: מילים בודדות (ללא מילות עצירה)
+    וזוגות מילים עוקבות
+
+    Args:
+        tokens: מילים לפי סדר
+
+    Returns:
+        קבוצת shingles
+    """
+    shingles = {token for token in tokens if token not in STOP_WORDS and len(token) > 1}
+    for first, second in zip(tokens, tokens[1:]):
+        shingles.add(f"{first} {second}")
+    return shingles
+
+
+class MinHasher:
+    """
+    חישוב חתימות MinHash עם פרמוטציות (a*x + b) mod p
+    """
+
+    def __init__(self, num_perm: int = SIMILARITY_NUM_PERM, seed: int = _PERMUTATION_SEED):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _hash_shingle(shingle: str) -> int:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % _MERSENNE_PRIME
+
+    def signature(self, shingles: Iterable[str]) -> Optional[List[int]]:
+        """
+        חתימת MinHash לקבוצת shingles
+
+        Returns:
+            רשימת num_perm ערכים, או None אם אין shingles
+        """
+        hashes = [self._hash_shingle(shingle) for shingle in shingles]
+        if not hashes:
+            return None
+
+        return [
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._permutations
+        ]
+
+
+class _UserIndex:
+    """אינדקס LSH של משתמש בודד"""
+
+    __slots__ = ("signatures", "buckets")
+
+    def __init__(self, bands: int):
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self.buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(bands)]
+
+
+class SimilarityIndex:
+    """
+    אינדקס LSH פר-משתמש (טעינה עצלה, פינוי LRU).
+    רק מחשבות פעילות נמצאות באינדקס.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = SIMILARITY_NUM_PERM,
+        bands: int = SIMILARITY_BANDS,
+        max_users: int = SIMILARITY_MAX_USERS
+    ):
+        """
+        Args:
+            num_perm: מספר הפרמוטציות בחתימה
+            bands: מספר ה-bands (num_perm חייב להתחלק בו)
+            max_users: מקסימום משתמשים בזיכרון
+        """
+        if num_perm % bands:
+            raise ValueError(f"SIMILARITY_NUM_PERM ({num_perm}) must be divisible by SIMILARITY_BANDS ({bands})")
+
+        self.hasher = MinHasher(num_perm)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_users = max(max_users, 1)
+
+        self._users: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== חתימות =====
+
+    def signature_for_tokens(self, tokens: List[str]) -> Optional[List[int]]:
+        """חתימת MinHash לטקסט מנורמל (רשימת מילים)"""
+        return self.hasher.signature(text_shingles(tokens))
+
+    def _is_valid(self, signature) -> bool:
+        return bool(signature) and len(signature) == self.num_perm
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    # ===== ניהול אינדקס =====
+
+    def is_user_loaded(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+    def load_user(self, user_id: int, entries: Iterable[Tuple[str, List[int]]]):
+        """
+        בניית האינדקס של משתמש מחתימות שמורות
+
+        Args:
+            user_id: מזהה המשתמש
+            entries: זוגות (מזהה מחשבה, חתימה)
+        """
+        index = _UserIndex(self.bands)
+        for thought_id, signature in entries:
+            if self._is_valid(signature):
+                self._insert(index, thought_id, tuple(signature))
+
+        with self._lock:
+            self._users[user_id] = index
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+        logger.info(f"🧬 אינדקס דמיון נטען למשתמש {user_id} ({len(index.signatures)} מחשבות)")
+
+    def _insert(self, index: _UserIndex, thought_id: str, signature: Tuple[int, ...]):
+        index.signatures[thought_id] = signature
+        for band, key in self._band_keys(signature):
+            index.buckets[band].setdefault(key, set()).add(thought_id)
+
+    def _remove(self, index: _UserIndex, thought_id: str):
+        signature = index.signatures.pop(thought_id, None)
+        if signature is None:
+            return
+        for band, key in self._band_keys(signature):
+            bucket = index.buckets[band].get(key)
+            if bucket is None:
+                continue
+            bucket.discard(thought_id)
+            if not bucket:
+                del index.buckets[band][key]
+
+    def add(self, user_id: int, thought_id: str, signature: Optional[List[int]]):
+        """הוספת מחשבה לאינדקס (רק אם האינדקס של המשתמש כבר טעון)"""
+        if not self._is_valid(signature):
+            return
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                self._insert(index, thought_id, tuple(signature))
+
+    def remove(self, thought_ids: Iterable[str], user_id: Optional[int] = None):
+        """
+        הסרת מחשבות מהאינדקס (ארכוב/מחיקה)
+
+        Args:
+            thought_ids: מזהי המחשבות
+            user_id: מזהה המשתמש, או None לחיפוש בכל האינדקסים הטעונים
+        """
+        thought_ids = list(thought_ids)
+        with self._lock:
+            if user_id is not None:
+                indexes = [self._users[user_id]] if user_id in self._users else []
+            else:
+                indexes = list(self._users.values())
+            for index in indexes:
+                for thought_id in thought_ids:
+                    self._remove(index, thought_id)
+
+    def drop_user(self, user_id: int):
+        """הסרת כל האינדקס של המשתמש מהזיכרון"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    # ===== שאילתות =====
+
+    def get_signature(self, user_id: int, thought_id: str) -> Optional[Tuple[int, ...]]:
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                return None
+            return index.signatures.get(thought_id)
+
+    def query(
+        self,
+        user_id: int,
+        signature: Optional[List[int]],
+        limit: int = SIMILARITY_MAX_RESULTS,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        חיפוש מחשבות דומות לפי התנגשויות ב-bands
+
+        Args:
+            user_id: מזהה המשתמש
+            signature: חתימת המחשבה המבוקשת
+            limit: מקסימום תוצאות
+            exclude: מזהה מחשבה להחרגה (המחשבה עצמה)
+
+        Returns:
+            רשימת (מזהה מחשבה, דמיון משוער) מהדומה ביותר
+        """
+        if not self._is_valid(signature):
+            return []
+        signature = tuple(signature)
+
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                return []
+            self._users.move_to_end(user_id)
+
+            candidates: Set[str] = set()
+            for band, key in self._band_keys(signature):
+                bucket = index.buckets[band].get(key)
+                if bucket:
+                    candidates.update(bucket)
+            candidates.discard(exclude)
+
+            scored = []
+            for thought_id in candidates:
+                other = index.signatures[thought_id]
+                matches = sum(1 for left, right in zip(signature, other) if left == right)
+                similarity = matches / self.num_perm
+                if similarity >= _MIN_SIMILARITY:
+                    scored.append((thought_id, similarity))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+
+# יצירת אובייקט גלובלי
+similarity_index = SimilarityIndex()
@@ -0,0 +1,8 @@
+"""
+הגדרות משותפות לבדיקות - המודולים נמצאים בשורש הריפו (לא כחבילה)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
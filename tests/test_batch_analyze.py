@@ -0,0 +1,83 @@
+"""
+בדיקות ל-batch_analyze: הניתוח הווקטורי (מטריצת COO x משקלים) חייב לתת
+את אותה תוצאה כמו ניתוח כל טקסט בנפרד
+"""
+
+import random
+
+import pytest
+
+import nlp_analyzer
+from config import CATEGORIES, TOPICS
+from nlp_analyzer import NEGATIVE_WORDS, POSITIVE_WORDS, NLPAnalyzer
+
+_PHRASES = (
+    [t for data in CATEGORIES.values() for t in data["triggers"]]
+    + [k for data in TOPICS.values() for k in data["keywords"]]
+    + POSITIVE_WORDS
+    + NEGATIVE_WORDS
+)
+
+
+def _corpus(size=300, seed=3):
+    rng = random.Random(seed)
+    filler = ["היום", "ממש", "אולי", "קצת", "של", "עם", "abc"]
+    texts = []
+    for _ in range(size):
+        words = [
+            rng.choice(_PHRASES) if rng.random() < 0.5 else rng.choice(filler)
+            for _ in range(rng.randint(0, 14))
+        ]
+        texts.append(" ".join(words))
+    # כפילויות, טקסטים ריקים ושינויי רווחים/אותיות
+    texts += ["", "   ", texts[0], texts[1].upper(), "  " + texts[2] + "\n"]
+    return texts
+
+
+def _single(analyzer, texts):
+    return [analyzer.analyze(text) for text in texts]
+
+
+def _assert_same(batch, single):
+    assert len(batch) == len(single)
+    for got, expected in zip(batch, single):
+        assert got["confidence"] == pytest.approx(expected["confidence"])
+        assert {**got, "confidence": 0} == {**expected, "confidence": 0}
+
+
+def test_batch_matches_single_text_path():
+    texts = _corpus()
+
+    batch = NLPAnalyzer(cache_size=0).batch_analyze(texts)
+    single = _single(NLPAnalyzer(cache_size=0), texts)
+
+    _assert_same(batch, single)
+
+
+def test_batch_with_weights_matches_single_text_path(monkeypatch):
+    rng = random.Random(5)
+    categories = {
+        name: {**data, "weights": {t: rng.choice([0.5, 1, 1.5, 2]) for t in data["triggers"]}}
+        for name, data in CATEGORIES.items()
+    }
+    monkeypatch.setattr(nlp_analyzer, "CATEGORIES", categories)
+    texts = _corpus(seed=9)
+
+    batch = NLPAnalyzer(cache_size=0).batch_analyze(texts)
+    single = _single(NLPAnalyzer(cache_size=0), texts)
+
+    _assert_same(batch, single)
+
+
+def test_batch_uses_and_fills_cache():
+    analyzer = NLPAnalyzer(cache_size=64)
+    texts = ["צריך לקנות חלב", "פגישה עם הבוס", "צריך לקנות חלב"]
+
+    analyzer.analyze(texts[1])
+    batch = analyzer.batch_analyze(texts)
+
+    _assert_same(batch, _single(NLPAnalyzer(cache_size=0), texts))
+    stats = analyzer.cache_stats()
+    # "פגישה עם הבוס" נשלף מהמטמון, הכפילות נותחה פעם אחת
+    assert stats["hits"] == 1
+    assert stats["size"] == 2
@@ -0,0 +1,41 @@
+"""
+בדיקות לקורפוס הסינתטי ולהרצת בנצ'מרק התפוקה
+"""
+
+import argparse
+
+from benchmarks.corpus import FILLER_WORDS, generate_corpus, lexicon_vocabulary
+from benchmarks.nlp_throughput import run_size
+
+
+def test_corpus_is_reproducible_by_seed():
+    assert generate_corpus(50, seed=7) == generate_corpus(50, seed=7)
+    assert generate_corpus(50, seed=7) != generate_corpus(50, seed=8)
+
+
+def test_corpus_respects_length_and_density():
+    corpus = generate_corpus(200, max_words=5, trigger_density=0.0)
+    assert len(corpus) == 200
+    assert all(1 <= len(text.split()) <= 5 for text in corpus)
+    assert all(word in FILLER_WORDS for text in corpus for word in text.split())
+
+    vocabulary = set(lexicon_vocabulary())
+    dense = generate_corpus(50, max_words=3, trigger_density=1.0, seed=1)
+    # בצפיפות מלאה כל "מילה" היא ביטוי מהמילון (ביטוי יכול להכיל כמה מילים)
+    assert all(text.startswith(tuple(vocabulary)) for text in dense)
+
+
+def test_run_size_reports_every_benchmark():
+    args = argparse.Namespace(
+        seed=42, mean_words=8.0, max_words=60, trigger_density=0.2,
+        batch_size=16, cache_size=0, no_memory=False,
+    )
+    results = run_size(40, args)
+
+    assert [r["benchmark"] for r in results] == [
+        "analyze", "batch_analyze", "format_analysis_summary"
+    ]
+    for result in results:
+        assert result["size"] == 40
+        assert result["messages_per_sec"] > 0
+        assert result["peak_memory_bytes"] > 0
@@ -0,0 +1,152 @@
+"""
+בדיקות לסשן dump: ניתוח ברקע בזמן השפיכה, המתנה ב-/done והשלמה באצווה
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import bot as bot_module
+from config import BOT_STATES, MESSAGES
+
+
+class _FakeMessage:
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.replies: list[str] = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def _update(user_id: int, text: str = ""):
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=user_id),
+        message=_FakeMessage(text),
+    )
+
+
+class _FakeDB:
+    def __init__(self):
+        self.saved: list[tuple[str, dict]] = []
+        self.stats_updates: list[int] = []
+
+    async def save_thought(self, user_id, raw_text, nlp_analysis, **kwargs):
+        self.saved.append((raw_text, nlp_analysis))
+        return str(len(self.saved))
+
+    async def save_thoughts_bulk(self, user_id, items):
+        ids = []
+        for raw_text, nlp_analysis, *_ in items:
+            self.saved.append((raw_text, nlp_analysis))
+            ids.append(str(len(self.saved)))
+        return {"inserted_ids": ids, "errors": []}
+
+    async def update_user_stats(self, user_id, *args, **kwargs):
+        self.stats_updates.append(user_id)
+
+
+class _FakeService:
+    """שירות ניתוח מבוקר: analyze ממתין לשחרור, ומחשבות מסומנות נכשלות"""
+
+    def __init__(self, fail_texts=()):
+        self.release = asyncio.Event()
+        self.fail_texts = set(fail_texts)
+        self.analyzed: list[str] = []
+        self.batches: list[list[str]] = []
+
+    @staticmethod
+    def _analysis(text: str) -> dict:
+        category = "task" if text.startswith("לעשות") else "idea"
+        return {"category": category, "topics": [], "text": text}
+
+    async def analyze(self, text, include_keywords=True):
+        self.analyzed.append(text)
+        await self.release.wait()
+        if text in self.fail_texts:
+            raise RuntimeError("analysis failed")
+        return self._analysis(text)
+
+    async def batch_analyze(self, texts, include_keywords=True):
+        self.batches.append(list(texts))
+        return [self._analysis(text) for text in texts]
+
+
+def _setup(monkeypatch, service):
+    fake_db = _FakeDB()
+    monkeypatch.setattr(bot_module, "db", fake_db)
+    monkeypatch.setattr(bot_module, "analysis_service", service)
+    monkeypatch.setattr(
+        bot_module, "reporter", SimpleNamespace(report_activity=lambda user_id: None)
+    )
+    return bot_module.BrainDumpBot(), fake_db
+
+
+def test_messages_are_analyzed_while_dumping_and_done_waits(monkeypatch):
+    async def scenario():
+        service = _FakeService()
+        brain_bot, fake_db = _setup(monkeypatch, service)
+        texts = ["לעשות כביסה", "רעיון לאפליקציה", "לעשות קניות"]
+
+        await brain_bot.dump_command(_update(1), None)
+        for text in texts:
+            update = _update(1, text)
+            await brain_bot.handle_text(update, None)
+            assert update.message.replies == [MESSAGES["dump_mode_active"]]
+
+        # הניתוחים התחילו כבר בזמן השפיכה, לפני /done
+        await asyncio.sleep(0)
+        assert service.analyzed == texts
+        assert fake_db.saved == []
+
+        done = asyncio.create_task(brain_bot.done_command(_update(1), None))
+        await asyncio.sleep(0)
+        assert not done.done()
+
+        service.release.set()
+        await done
+
+        assert [text for text, _ in fake_db.saved] == texts
+        assert [a["text"] for _, a in fake_db.saved] == texts
+        assert service.batches == []
+        assert fake_db.stats_updates == [1]
+        assert brain_bot.user_states[1] == BOT_STATES["NORMAL"]
+        assert 1 not in brain_bot.dump_sessions
+
+    asyncio.run(scenario())
+
+
+def test_failed_background_analyses_are_completed_in_one_batch(monkeypatch):
+    async def scenario():
+        service = _FakeService(fail_texts={"רעיון א", "לעשות ב"})
+        service.release.set()
+        brain_bot, fake_db = _setup(monkeypatch, service)
+        texts = ["לעשות א", "רעיון א", "לעשות ב", "רעיון ב"]
+
+        await brain_bot.dump_command(_update(7), None)
+        for text in texts:
+            await brain_bot.handle_text(_update(7, text), None)
+
+        session = brain_bot.dump_sessions[7]
+        await brain_bot._complete_dump_analyses(session)
+
+        assert service.batches == [["רעיון א", "לעשות ב"]]
+        assert [a["text"] for a in session["analyses"]] == texts
+        assert session["category_summary"] == {"task": 2, "idea": 2}
+
+    asyncio.run(scenario())
+
+
+def test_done_with_empty_session(monkeypatch):
+    async def scenario():
+        service = _FakeService()
+        brain_bot, fake_db = _setup(monkeypatch, service)
+
+        await brain_bot.dump_command(_update(3), None)
+        update = _update(3)
+        await brain_bot.done_command(update, None)
+
+        assert update.message.replies[-1] == MESSAGES["empty_dump"]
+        assert fake_db.saved == []
+        assert brain_bot.user_states[3] == BOT_STATES["NORMAL"]
+
+    asyncio.run(scenario())
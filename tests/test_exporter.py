@@ -0,0 +1,152 @@
+"""
+בדיקות לייצוא מחשבות (TXT / CSV / JSON)
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import exporter
+from config import TIMEZONE
+
+THOUGHTS = [
+    {
+        "created_at": datetime(2024, 3, 1, 10, 0),
+        "status": "active",
+        "raw_text": "צריך לקנות חלב, ולחם",
+        "nlp_analysis": {
+            "category": "משימות",
+            "topics": ["בית", "קניות"],
+            "keywords": ["חלב", "לחם"],
+            "sentiment": "neutral",
+        },
+    },
+    {
+        "created_at": datetime(2024, 3, 2, 22, 30),
+        "status": "archived",
+        "raw_text": 'שורה ראשונה\nשורה "שנייה"',
+        "nlp_analysis": {"category": "רעיונות"},
+    },
+    {
+        "created_at": None,
+        "status": "active",
+        "raw_text": None,
+    },
+]
+
+
+class _FakeDatabase:
+    def __init__(self, thoughts, batch_size=2):
+        self.thoughts = thoughts
+        self.batch_size = batch_size
+
+    async def iter_export_batches(self, user_id, limit):
+        rows = self.thoughts[:limit]
+        for i in range(0, len(rows), self.batch_size):
+            yield rows[i:i + self.batch_size]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = _FakeDatabase(THOUGHTS)
+    monkeypatch.setattr(exporter, "db", database)
+    return database
+
+
+def _export(fmt, compress=False, **kwargs):
+    result = asyncio.run(exporter.export_thoughts(1, fmt, compress=compress, **kwargs))
+    with result["file"] as f:
+        data = f.read()
+    assert len(data) == result["size"]
+    if compress:
+        data = gzip.decompress(data)
+    return result, data
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_json(fake_db, compress):
+    result, data = _export("json", compress)
+
+    rows = json.loads(data.decode("utf-8"))
+    assert result["count"] == 3
+    assert result["filename"].endswith(".json.gz" if compress else ".json")
+    assert [row["text"] for row in rows] == [t["raw_text"] or "" for t in THOUGHTS]
+    assert rows[0]["topics"] == ["בית", "קניות"]
+    assert rows[1]["topics"] == []
+    assert rows[2]["created_at"] == ""
+    assert list(rows[0]) == exporter._FIELDS
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_csv(fake_db, compress):
+    _, data = _export("csv", compress)
+
+    # BOM בתחילת הקובץ - כדי שאקסל יזהה UTF-8
+    assert data.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.DictReader(io.StringIO(data.decode("utf-8-sig"), newline="")))
+    assert len(rows) == 3
+    assert rows[0]["keywords"] == "חלב, לחם"
+    assert rows[0]["text"] == "צריך לקנות חלב, ולחם"
+    assert rows[1]["text"] == 'שורה ראשונה\nשורה "שנייה"'
+
+
+def test_txt(fake_db):
+    _, data = _export("txt")
+
+    text = data.decode("utf-8")
+    assert text.count("---\n") == 3
+    assert "נושאים: בית, קניות" in text
+    assert "(archived)" in text
+
+
+def test_created_at_in_local_timezone(fake_db):
+    _, data = _export("json")
+
+    # created_at נשמר כ-UTC נאיבי
+    expected = THOUGHTS[0]["created_at"].replace(tzinfo=timezone.utc).astimezone(ZoneInfo(TIMEZONE))
+    assert json.loads(data)[0]["created_at"] == expected.isoformat(timespec="seconds")
+
+
+def test_progress_and_limit(fake_db):
+    reported = []
+
+    async def progress(count):
+        reported.append(count)
+
+    result, data = _export("json", progress=progress, limit=2)
+
+    assert result["count"] == 2
+    assert len(json.loads(data)) == 2
+    assert reported == [2]
+
+
+def test_empty_export(monkeypatch):
+    monkeypatch.setattr(exporter, "db", _FakeDatabase([]))
+
+    result, data = _export("json")
+
+    assert result["count"] == 0
+    assert json.loads(data) == []
+
+
+def test_unsupported_format(fake_db):
+    with pytest.raises(ValueError):
+        asyncio.run(exporter.export_thoughts(1, "xml"))
+
+
+def test_failed_batch_closes_file(monkeypatch):
+    class _BrokenDatabase:
+        async def iter_export_batches(self, user_id, limit):
+            yield THOUGHTS[:1]
+            raise RuntimeError("cursor lost")
+
+    monkeypatch.setattr(exporter, "db", _BrokenDatabase())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(exporter.export_thoughts(1, "csv"))
@@ -0,0 +1,195 @@
+"""
+בדיקות ל-fan-out: token bucket, ניסיונות חוזרים ואצוות נמענים
+"""
+
+import asyncio
+import time
+
+import pytest
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+import fanout
+from fanout import FanOutDispatcher, TokenBucket
+
+
+def _elapsed(coro) -> float:
+    started = time.monotonic()
+    asyncio.run(coro)
+    return time.monotonic() - started
+
+
+def test_bucket_rate():
+    bucket = TokenBucket(rate=50)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    # האסימון הראשון זמין מיד, 5 הבאים בקצב 50 לשנייה
+    assert _elapsed(take(6)) >= 0.09
+
+
+def test_bucket_burst_capacity():
+    bucket = TokenBucket(rate=1, capacity=5)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    assert _elapsed(take(5)) < 0.5
+
+
+def test_bucket_pause():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.1)
+
+    assert _elapsed(bucket.acquire()) >= 0.09
+
+
+async def _recipients(items):
+    for item in items:
+        yield item
+
+
+def _dispatcher(**kwargs):
+    defaults = dict(
+        max_concurrency=4,
+        global_rate=10000,
+        per_chat_interval=0,
+        max_retries=2,
+        chunk_size=3,
+        progress_seconds=3600,
+    )
+    defaults.update(kwargs)
+    return FanOutDispatcher(**defaults)
+
+
+def _run(dispatcher, recipients, send, chunks=None):
+    async def on_chunk(chunk):
+        chunks.append(list(chunk))
+
+    return asyncio.run(dispatcher.run(
+        "test",
+        _recipients(recipients),
+        chat_id_of=lambda r: r,
+        send=send,
+        on_chunk=on_chunk if chunks is not None else None,
+    ))
+
+
+def test_all_delivered_in_chunks():
+    sent, chunks = [], []
+
+    async def send(recipient):
+        sent.append(recipient)
+
+    summary = _run(_dispatcher(), range(10), send, chunks)
+
+    assert sorted(sent) == list(range(10))
+    assert (summary["sent"], summary["failed"], summary["retries"]) == (10, 0, 0)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert sorted(r for chunk in chunks for r in chunk) == list(range(10))
+
+
+def test_retry_after_then_success():
+    attempts = {}
+
+    async def send(recipient):
+        attempts[recipient] = attempts.get(recipient, 0) + 1
+        if recipient == 1 and attempts[recipient] == 1:
+            raise RetryAfter(0)
+
+    summary = _run(_dispatcher(), [0, 1, 2], send)
+
+    assert attempts[1] == 2
+    assert (summary["sent"], summary["failed"], summary["retries"]) == (3, 0, 1)
+
+
+def test_forbidden_and_bad_request_are_not_retried():
+    attempts = []
+    chunks = []
+
+    async def send(recipient):
+        attempts.append(recipient)
+        if recipient == 1:
+            raise Forbidden("bot was blocked by the user")
+        if recipient == 2:
+            raise BadRequest("chat not found")
+
+    summary = _run(_dispatcher(), [0, 1, 2, 3], send, chunks)
+
+    assert sorted(attempts) == [0, 1, 2, 3]
+    assert (summary["sent"], summary["failed"], summary["retries"]) == (2, 2, 0)
+    # רק מי שההודעה נמסרה לו מגיע ל-on_chunk
+    assert sorted(r for chunk in chunks for r in chunk) == [0, 3]
+
+
+def test_network_errors_give_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(fanout, "_NETWORK_BACKOFF_SECONDS", 0.001)
+    attempts = []
+
+    async def send(recipient):
+        attempts.append(recipient)
+        raise NetworkError("connection reset")
+
+    summary = _run(_dispatcher(max_retries=2), [5], send)
+
+    assert attempts == [5, 5, 5]
+    assert (summary["sent"], summary["failed"], summary["retries"]) == (0, 1, 3)
+
+
+def test_unexpected_error_fails_one_recipient():
+    async def send(recipient):
+        if recipient == 0:
+            raise ValueError("boom")
+
+    summary = _run(_dispatcher(), [0, 1], send)
+
+    assert (summary["sent"], summary["failed"]) == (1, 1)
+
+
+def test_on_chunk_error_does_not_stop_the_run():
+    async def send(recipient):
+        pass
+
+    async def on_chunk(chunk):
+        raise RuntimeError("db down")
+
+    summary = asyncio.run(_dispatcher(chunk_size=1).run(
+        "test", _recipients(range(3)), lambda r: r, send, on_chunk
+    ))
+
+    assert summary["sent"] == 3
+
+
+def test_concurrency_is_bounded():
+    active = 0
+    peak = 0
+
+    async def send(recipient):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    _run(_dispatcher(max_concurrency=3), range(12), send)
+
+    assert peak == 3
+
+
+def test_per_chat_interval():
+    sent_at = []
+
+    async def send(recipient):
+        sent_at.append(time.monotonic())
+
+    _run(_dispatcher(per_chat_interval=0.05), [7, 7, 7], send)
+
+    gaps = [b - a for a, b in zip(sent_at, sent_at[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+@pytest.mark.parametrize("retry_after", [3, 3.0])
+def test_retry_after_seconds(retry_after):
+    assert fanout._retry_after_seconds(RetryAfter(retry_after)) == 3.0
@@ -0,0 +1,77 @@
+"""
+בדיקות להעברת האינדקסים הישנים (חד-פעמית, הסרה רק אחרי שהמחליף קיים)
+"""
+
+import asyncio
+
+from database import Database, LEGACY_THOUGHT_INDEXES
+
+
+class _FakeIndexedCollection:
+    def __init__(self, names=(), fail_create=()):
+        self.indexes = {"_id_": {}} | {name: {} for name in names}
+        self.fail_create = set(fail_create)
+        self.calls = []
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def create_index(self, keys, name, **options):
+        self.calls.append(("create", name))
+        if name in self.fail_create:
+            raise RuntimeError("create failed")
+        self.indexes[name] = {"key": keys, **options}
+
+    async def drop_index(self, name):
+        self.calls.append(("drop", name))
+        self.indexes.pop(name)
+
+
+def _db(thoughts, users=None):
+    database = Database()
+    database.thoughts_collection = thoughts
+    database.users_collection = users or _FakeIndexedCollection()
+    return database
+
+
+def test_legacy_indexes_dropped_after_replacements_exist():
+    thoughts = _FakeIndexedCollection(LEGACY_THOUGHT_INDEXES)
+    asyncio.run(_db(thoughts)._create_indexes())
+
+    assert set(thoughts.indexes) == {
+        "_id_", "user_status_created", "active_user_created", "active_created", "user_raw_text"
+    }
+    # אינדקס ישן מוסר רק אחרי יצירת המחליף (אינדקס הטקסט מוחלף במקום - אחד לאוסף)
+    for legacy_index, replacement in LEGACY_THOUGHT_INDEXES.items():
+        if legacy_index != "raw_text_text":
+            assert thoughts.calls.index(("create", replacement)) < thoughts.calls.index(("drop", legacy_index))
+
+
+def test_migration_runs_once():
+    thoughts = _FakeIndexedCollection(LEGACY_THOUGHT_INDEXES)
+    database = _db(thoughts)
+    asyncio.run(database._create_indexes())
+    thoughts.calls.clear()
+
+    asyncio.run(database._create_indexes())
+
+    assert not [call for call in thoughts.calls if call[0] == "drop"]
+    assert ("create", "user_raw_text") not in thoughts.calls
+
+
+def test_failed_replacement_keeps_legacy_index():
+    thoughts = _FakeIndexedCollection(
+        LEGACY_THOUGHT_INDEXES, fail_create={"user_status_created", "user_raw_text"}
+    )
+    asyncio.run(_db(thoughts)._create_indexes())
+
+    # המחליף לא נוצר - האינדקסים הישנים נשארים (אינדקס הטקסט משוחזר)
+    assert {"user_id_1_created_at_-1", "nlp_analysis.category_1", "status_1", "raw_text_text"} <= set(thoughts.indexes)
+    assert "user_raw_text" not in thoughts.indexes
+
+
+def test_users_index_is_not_unique():
+    users = _FakeIndexedCollection()
+    asyncio.run(_db(_FakeIndexedCollection(), users)._create_indexes())
+
+    assert users.indexes["user_id"] == {"key": [("user_id", 1)]}
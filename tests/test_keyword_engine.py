@@ -0,0 +1,143 @@
+"""
+בדיקות למנוע מילות המפתח (TF-IDF)
+"""
+
+from collections import Counter
+
+from keyword_engine import KeywordEngine
+
+
+def _engine(**kwargs):
+    engine = KeywordEngine(max_keywords=3, **kwargs)
+    engine.load_global(100)
+    return engine
+
+
+def test_rank_prefers_rare_and_frequent_terms():
+    engine = _engine()
+    engine.load_global_terms(["חלב", "לחם", "מכונית"], {"חלב": 90, "לחם": 90, "מכונית": 1})
+
+    # מילה נדירה גוברת על מילה נפוצה
+    assert engine.rank(1, ["חלב", "מכונית"])[0] == "מכונית"
+    # tf גבוה יותר גובר בשכיחות שווה
+    assert engine.rank(1, ["לחם", "חלב", "חלב"])[0] == "חלב"
+    # שוויון - לפי המיקום בטקסט
+    assert engine.rank(1, ["לחם", "חלב"]) == ["לחם", "חלב"]
+    assert engine.rank(1, []) == []
+    assert len(engine.rank(1, ["א", "ב", "ג", "ד"])) == 3
+
+
+def test_user_idf_changes_ranking():
+    engine = _engine()
+    engine.load_global_terms(["עבודה", "ריצה"], {"עבודה": 10, "ריצה": 10})
+    engine.load_user(1, 50)
+    engine.load_user_terms(1, ["עבודה", "ריצה"], {"עבודה": 50})
+
+    # "עבודה" מופיעה בכל המחשבות של המשתמש - פחות מאפיינת
+    assert engine.rank(1, ["עבודה", "ריצה"]) == ["ריצה", "עבודה"]
+    # למשתמש אחר אין היסטוריה - שוויון נשבר לפי המיקום
+    assert engine.rank(2, ["עבודה", "ריצה"]) == ["עבודה", "ריצה"]
+
+
+def test_observe_updates_only_loaded_counters():
+    engine = _engine()
+    engine.load_global_terms(["חלב"], {"חלב": 5})
+    engine.load_user(1, 3)
+    engine.load_user_terms(1, ["חלב"], {"חלב": 1})
+
+    engine.observe(1, ["חלב", "לחם", "חלב"])
+    engine.observe(2, ["חלב"])
+
+    assert engine.global_docs == 102
+    assert engine.global_df["חלב"] == 7
+    # מילה שלא במטמון לא נוצרת עם ערך חלקי
+    assert "לחם" not in engine.global_df
+    assert engine._users[1] == (4, Counter({"חלב": 2}))
+    assert engine.is_user_loaded(1)
+    assert not engine.is_user_loaded(2)
+
+    global_docs, global_df, users = engine.drain_deltas()
+    assert global_docs == 2
+    assert global_df == Counter({"חלב": 2, "לחם": 1})
+    assert users[1] == (1, Counter({"חלב": 1, "לחם": 1}))
+    assert users[2] == (1, Counter({"חלב": 1}))
+    assert not engine.has_pending()
+
+
+def test_pending_deltas_added_on_load():
+    engine = _engine()
+    engine.observe(7, ["ים", "חוף"])
+
+    # הערכים במסד עדיין לא כוללים את המחשבה שנצפתה
+    engine.load_global_terms(["ים", "הר"], {"ים": 4})
+    engine.load_user(7, 10)
+    engine.load_user_terms(7, ["ים", "חוף"], {"ים": 2})
+
+    assert engine.global_df["ים"] == 5
+    assert engine.global_df["הר"] == 0
+    assert engine.missing_global_terms(["ים", "חוף"]) == ["חוף"]
+    docs, user_df = engine._users[7]
+    assert docs == 11
+    assert user_df == Counter({"ים": 3, "חוף": 1})
+
+
+def test_load_global_keeps_earlier_observations():
+    engine = KeywordEngine()
+    engine.observe(1, ["א"])
+    engine.load_global(10)
+    engine.load_global(99)
+
+    assert engine.global_docs == 11
+
+
+def test_global_terms_lru_bound():
+    engine = _engine(max_global_terms=2)
+    engine.load_global_terms(["א", "ב"], {"א": 1, "ב": 1})
+    # שימוש ב-"א" מזיז אותה לסוף ה-LRU
+    engine.rank(1, ["א"])
+    engine.load_global_terms(["ג"], {"ג": 1})
+
+    assert list(engine.global_df) == ["א", "ג"]
+
+
+def test_users_lru_keeps_pending_users():
+    engine = _engine(max_users=1)
+    engine.load_user(1, 1)
+    engine.observe(1, ["א"])
+    engine.load_user(2, 1)
+
+    # למשתמש 1 יש שינויים שטרם נשמרו - לא מפנים אותו
+    assert engine.is_user_loaded(1)
+    assert not engine.is_user_loaded(2)
+
+    engine.drain_deltas()
+    engine.load_user(2, 1)
+    assert not engine.is_user_loaded(1)
+    assert engine.is_user_loaded(2)
+
+
+def test_restore_deltas_merges_with_new_changes():
+    engine = _engine()
+    engine.observe(1, ["א"])
+    deltas = engine.drain_deltas()
+    engine.observe(1, ["ב"])
+
+    engine.restore_deltas(*deltas)
+
+    global_docs, global_df, users = engine.drain_deltas()
+    assert global_docs == 2
+    assert global_df == Counter({"א": 1, "ב": 1})
+    assert users[1] == (2, Counter({"א": 1, "ב": 1}))
+
+
+def test_user_terms_need_loaded_user():
+    engine = _engine()
+    engine.load_user_terms(3, ["א"], {"א": 4})
+    assert not engine.is_user_loaded(3)
+    assert engine.missing_user_terms(3, ["א"]) == ["א"]
+
+    engine.load_user(3, 5)
+    engine.load_user_terms(3, ["א"], {"א": 4})
+    # טעינה חוזרת לא דורסת ערך שכבר במטמון
+    engine.load_user_terms(3, ["א"], {"א": 1})
+    assert engine._users[3] == (5, Counter({"א": 4}))
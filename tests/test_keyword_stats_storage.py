@@ -0,0 +1,155 @@
+"""
+בדיקות לשמירת מוני מילות המפתח: מסמך לכל (משתמש, מילה) וטעינה לפי מילה
+"""
+
+import asyncio
+import re
+from collections import Counter
+
+import database as database_module
+from database import Database
+from keyword_engine import KeywordEngine
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    """אוסף בזיכרון עם $inc / $max / $setOnInsert / $unset ברמה העליונה"""
+
+    def __init__(self, docs=None):
+        self.docs = {doc["_id"]: dict(doc) for doc in (docs or [])}
+        self.queries = []
+
+    @staticmethod
+    def _matches(doc, query):
+        id_query = query.get("_id")
+        if isinstance(id_query, dict):
+            if "$in" in id_query and doc["_id"] not in id_query["$in"]:
+                return False
+            if "$regex" in id_query and not re.match(id_query["$regex"], str(doc["_id"])):
+                return False
+        elif id_query is not None and doc["_id"] != id_query:
+            return False
+        for field, condition in query.items():
+            if field != "_id" and isinstance(condition, dict) and "$exists" in condition:
+                if (field in doc) != condition["$exists"]:
+                    return False
+        return True
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return _Cursor([dict(doc) for doc in self.docs.values() if self._matches(doc, query)])
+
+    async def find_one(self, query, projection=None):
+        self.queries.append(query)
+        return next((dict(doc) for doc in self.docs.values() if self._matches(doc, query)), None)
+
+    def _apply(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        for field, delta in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + delta
+        for field, value in update.get("$max", {}).items():
+            doc[field] = max(doc.get(field, value), value)
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self._apply(request._filter, request._doc)
+
+    async def update_one(self, query, update, upsert=False):
+        self._apply(query, update)
+
+
+def _db(monkeypatch, stats=(), user_df=(), global_df=()):
+    engine = KeywordEngine(max_keywords=3)
+    monkeypatch.setattr(database_module, "keyword_engine", engine)
+    database = Database()
+    database.write_behind = None
+    database.keyword_stats_collection = _Collection(stats)
+    database.keyword_user_df_collection = _Collection(user_df)
+    database.keyword_df_collection = _Collection(global_df)
+    return database, engine
+
+
+def test_loads_only_requested_user_terms(monkeypatch):
+    database, engine = _db(
+        monkeypatch,
+        stats=[{"_id": "global", "docs": 100}, {"_id": "user:1", "docs": 20}],
+        user_df=[
+            {"_id": "1:עבודה", "user_id": 1, "df": 20},
+            {"_id": "1:ריצה", "user_id": 1, "df": 2},
+            {"_id": "2:עבודה", "user_id": 2, "df": 5},
+        ],
+    )
+
+    asyncio.run(database._ensure_keyword_stats_loaded(1, ["עבודה", "ים", "עבודה"]))
+
+    docs, user_df = engine._users[1]
+    assert docs == 20
+    # רק המילים שבטקסט נטענו; מילה שאין לה מסמך נטענת כ-0
+    assert user_df == Counter({"עבודה": 20, "ים": 0})
+    assert engine.missing_user_terms(1, ["עבודה", "ריצה"]) == ["ריצה"]
+    # מסמך המשתמש נשלף בלי מפת שכיחויות
+    user_query = database.keyword_stats_collection.queries[-1]
+    assert user_query == {"_id": "user:1"}
+
+
+def test_persist_writes_one_document_per_user_term(monkeypatch):
+    database, engine = _db(
+        monkeypatch,
+        stats=[{"_id": "user:1", "docs": 3}],
+        user_df=[{"_id": "1:חלב", "user_id": 1, "df": 2}],
+    )
+    engine.observe(1, ["חלב", "לחם", "חלב"])
+    engine.observe(2, ["חלב"])
+
+    written = asyncio.run(database.persist_keyword_stats())
+
+    assert written == 8
+    stats = database.keyword_stats_collection.docs
+    assert stats["user:1"] == {"_id": "user:1", "docs": 4}
+    assert stats["user:2"]["docs"] == 1
+    assert stats["global"]["docs"] == 2
+    user_df = database.keyword_user_df_collection.docs
+    assert user_df["1:חלב"]["df"] == 3
+    assert user_df["1:לחם"] == {"_id": "1:לחם", "user_id": 1, "df": 1}
+    assert user_df["2:חלב"] == {"_id": "2:חלב", "user_id": 2, "df": 1}
+    assert database.keyword_df_collection.docs["חלב"]["df"] == 2
+    assert not engine.has_pending()
+
+
+def test_legacy_user_df_map_is_migrated_once(monkeypatch):
+    database, _ = _db(
+        monkeypatch,
+        stats=[
+            {"_id": "global", "docs": 10},
+            {"_id": "user:5", "docs": 4, "df": {"ים": 3, "הר": 1}},
+            {"_id": "user:6", "docs": 1},
+        ],
+        # ריצה קודמת שנקטעה באמצע כבר כתבה חלק מהמילים
+        user_df=[{"_id": "5:ים", "user_id": 5, "df": 3}],
+    )
+
+    asyncio.run(database._migrate_user_keyword_df())
+    asyncio.run(database._migrate_user_keyword_df())
+
+    assert database.keyword_stats_collection.docs["user:5"] == {"_id": "user:5", "docs": 4}
+    user_df = database.keyword_user_df_collection.docs
+    assert user_df["5:ים"]["df"] == 3
+    assert user_df["5:הר"] == {"_id": "5:הר", "user_id": 5, "df": 1}
+    assert len(user_df) == 2
@@ -0,0 +1,121 @@
+"""
+בדיקות למילון המקומפל ול-artifact שלו
+"""
+
+import json
+
+import nlp_analyzer
+from nlp_analyzer import (
+    HIT_SENTIMENT,
+    HIT_TOPIC,
+    CompiledLexicon,
+    NLPAnalyzer,
+    lexicon_source_hash,
+    load_lexicon_artifact,
+    save_lexicon_artifact,
+)
+
+CATEGORIES = {
+    "משימות": {"triggers": ["צריך", "לא לשכוח", "Call"]},
+    "שאלות": {"triggers": ["למה", "to-do"]},
+}
+TOPICS = {
+    "עבודה": {"keywords": ["פגישה", "בוס"], "weights": {"בוס": 2.0}},
+}
+
+
+def _lexicon():
+    return CompiledLexicon(CATEGORIES, TOPICS, ["שמח"], ["עצוב"])
+
+
+def test_match_phrases():
+    lexicon = _lexicon()
+
+    assert lexicon.match_phrases("לא לשכוח פגישה עם הבוס") == {"לא לשכוח", "פגישה"}
+    # טריגרים מנורמלים לאותיות קטנות
+    assert lexicon.match_phrases("call mom") == {"call"}
+    # ביטוי עם סימן פיסוק עובר דרך ה-fallback
+    assert lexicon.match_phrases("my to-do list, למה") == {"to-do", "למה"}
+    # רק מילים שלמות
+    assert lexicon.match_phrases("צריכה") == set()
+
+
+def test_weights_and_labels():
+    lexicon = _lexicon()
+
+    assert lexicon.lexicon["בוס"] == [(HIT_TOPIC, "עבודה", 2.0)]
+    assert lexicon.lexicon["פגישה"] == [(HIT_TOPIC, "עבודה", 1.0)]
+    assert lexicon.lexicon["שמח"] == [(HIT_SENTIMENT, "positive", 1.0)]
+
+
+def test_fingerprint_is_deterministic():
+    assert _lexicon().fingerprint == _lexicon().fingerprint
+    assert _lexicon().source_hash == lexicon_source_hash(CATEGORIES, TOPICS, ["שמח"], ["עצוב"])
+
+    changed = CompiledLexicon(CATEGORIES, {"עבודה": {"keywords": ["פגישה"]}}, ["שמח"], ["עצוב"])
+    assert changed.fingerprint != _lexicon().fingerprint
+
+
+def test_artifact_round_trip(tmp_path):
+    lexicon = _lexicon()
+    path = str(tmp_path / "lexicon.pkl")
+
+    save_lexicon_artifact(lexicon, path)
+    loaded = load_lexicon_artifact(lexicon.source_hash, path)
+
+    assert loaded is not None
+    assert loaded.fingerprint == lexicon.fingerprint
+    assert loaded.match_phrases("לא לשכוח פגישה") == {"לא לשכוח", "פגישה"}
+
+
+def test_artifact_mismatch_or_missing(tmp_path):
+    lexicon = _lexicon()
+    path = str(tmp_path / "lexicon.pkl")
+
+    assert load_lexicon_artifact(lexicon.source_hash, path) is None
+
+    save_lexicon_artifact(lexicon, path)
+    assert load_lexicon_artifact("other-hash", path) is None
+
+    (tmp_path / "lexicon.pkl").write_bytes(b"not a pickle")
+    assert load_lexicon_artifact(lexicon.source_hash, path) is None
+
+
+def _fail_unpickle(*args, **kwargs):
+    raise AssertionError("unpickled an artifact that should have been rejected")
+
+
+def test_header_checked_before_unpickle(tmp_path, monkeypatch):
+    lexicon = _lexicon()
+    path = str(tmp_path / "lexicon.pkl")
+    save_lexicon_artifact(lexicon, path)
+
+    monkeypatch.setattr(nlp_analyzer.pickle, "loads", _fail_unpickle)
+    assert load_lexicon_artifact("other-hash", path) is None
+
+
+def test_tampered_payload_is_rejected(tmp_path, monkeypatch):
+    lexicon = _lexicon()
+    path = tmp_path / "lexicon.pkl"
+    save_lexicon_artifact(lexicon, str(path))
+    header, payload = path.read_bytes().split(b"\n", 1)
+    path.write_bytes(header + b"\n" + payload[:-1] + b"!")
+
+    monkeypatch.setattr(nlp_analyzer.pickle, "loads", _fail_unpickle)
+    assert load_lexicon_artifact(lexicon.source_hash, str(path)) is None
+
+
+def test_reload_reads_only_the_lexicon_file(tmp_path):
+    source = tmp_path / "lexicon.json"
+    source.write_text(json.dumps({"categories": CATEGORIES, "topics": TOPICS}), encoding="utf-8")
+    analyzer = NLPAnalyzer(cache_size=4, artifact_path=None, lexicon_file=str(source))
+    assert analyzer.analyze("צריך לקנות")["category"] == "משימות"
+
+    source.write_text(json.dumps({
+        "categories": {"שאלות": {"triggers": ["צריך"]}},
+        "topics": TOPICS,
+    }), encoding="utf-8")
+    result = analyzer.reload_lexicon()
+
+    assert result["changed"]
+    assert analyzer.analyze("צריך לקנות")["category"] == "שאלות"
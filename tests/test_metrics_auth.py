@@ -0,0 +1,49 @@
+"""
+בדיקות להרשאת הגישה ל-/metrics
+"""
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def client():
+    return main.app.test_client()
+
+
+def test_requires_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+    assert client.get("/metrics", headers={"X-Metrics-Token": "s3cret"}).status_code == 200
+
+
+def test_bot_token_is_not_accepted(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+    monkeypatch.setattr(main, "TELEGRAM_BOT_TOKEN", "123:bot")
+
+    assert client.get("/metrics", headers={"X-Metrics-Token": "123:bot"}).status_code == 403
+
+
+def test_localhost_only_without_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.1.2.3"}).status_code == 403
+
+
+def test_timings_endpoint_and_reset_require_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+    resets = []
+    monkeypatch.setattr(
+        main.nlp, "stage_timer", type("Timer", (), {"reset": lambda self: resets.append(1)})()
+    )
+    monkeypatch.setattr(main.nlp, "stage_timings", lambda: {})
+
+    assert client.get("/metrics/nlp/timings?reset=1").status_code == 403
+    assert resets == []
+    response = client.get("/metrics/nlp/timings?reset=1", headers={"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200
+    assert resets == [1]
@@ -0,0 +1,81 @@
+"""
+בדיקות למטמון הניתוחים של NLPAnalyzer
+"""
+
+from nlp_analyzer import NLPAnalyzer
+
+
+def _analyzer(cache_size=16):
+    return NLPAnalyzer(cache_size=cache_size)
+
+
+def test_whitespace_and_case_share_cache_entry():
+    analyzer = _analyzer()
+
+    first = analyzer.analyze("צריך לקנות חלב לבית")
+    second = analyzer.analyze("  צריך   לקנות\nחלב לבית  ")
+
+    assert first == second
+    stats = analyzer.cache_stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_key_depends_on_text_and_lexicon():
+    analyzer = _analyzer()
+
+    key = analyzer._cache_key(analyzer._normalize_text("Hello   World"))
+    assert key == analyzer._cache_key(analyzer._normalize_text("hello world"))
+    assert key != analyzer._cache_key(analyzer._normalize_text("hello world!"))
+
+
+def test_returned_result_is_a_copy():
+    analyzer = _analyzer()
+
+    result = analyzer.analyze("פגישה עם הבוס מחר")
+    result["topics"].append("זבל")
+    result["category"] = "זבל"
+
+    cached = analyzer.analyze("פגישה עם הבוס מחר")
+    assert "זבל" not in cached["topics"]
+    assert cached["category"] != "זבל"
+
+
+def test_lru_bound_and_clear():
+    analyzer = _analyzer(cache_size=2)
+
+    for text in ("מחשבה ראשונה", "מחשבה שנייה", "מחשבה שלישית"):
+        analyzer.analyze(text)
+    assert analyzer.cache_stats()["size"] == 2
+
+    # הראשונה פונתה
+    analyzer.analyze("מחשבה ראשונה")
+    assert analyzer.cache_stats()["misses"] == 4
+
+    analyzer.clear_cache()
+    assert analyzer.cache_stats()["size"] == 0
+
+
+def test_cache_disabled():
+    analyzer = _analyzer(cache_size=0)
+
+    analyzer.analyze("צריך לקנות חלב")
+    analyzer.analyze("צריך לקנות חלב")
+    assert analyzer.cache_stats()["size"] == 0
+    assert analyzer.cache_stats()["hits"] == 0
+
+
+def test_keywords_are_optional_and_not_cached():
+    analyzer = _analyzer()
+    text = "צריך לקנות חלב לבית"
+
+    without = analyzer.analyze(text, include_keywords=False)
+    with_keywords = analyzer.analyze(text)
+
+    # מסלול השמירה מוותר על מילות המפתח; הערך מהמטמון משלים אותן לפי בקשה
+    assert without["keywords"] == []
+    assert with_keywords["keywords"] == analyzer._extract_keywords(analyzer._normalize_text(text))
+    assert {**with_keywords, "keywords": []} == without
+    assert analyzer.batch_analyze([text, ""], include_keywords=False)[0]["keywords"] == []
+    assert analyzer.cache_stats()["hits"] == 2
@@ -0,0 +1,103 @@
+"""
+בדיקות להתאמת המילון ב-NLPAnalyzer: סריקה אחת של הטקסט צריכה לתת
+בדיוק את מה שנותן חיפוש נפרד של כל ביטוי כמילה שלמה
+"""
+
+import random
+import re
+
+from config import CATEGORIES, TOPICS
+from nlp_analyzer import NEGATIVE_WORDS, POSITIVE_WORDS, nlp
+
+_FILLER = ["אני", "היום", "קצת", "ממש", "אולי", "בבוקר", "עם", "של", "abc", "123"]
+
+
+def _word_in_text(word: str, text: str) -> bool:
+    return bool(re.search(r'\b' + re.escape(word) + r'\b', text))
+
+
+def _reference(text: str):
+    """הניתוח כפי שנעשה לפני המילון המאוחד - חיפוש נפרד לכל ביטוי"""
+    normalized = re.sub(r'\s+', ' ', text).lower().strip()
+
+    scores = {}
+    for category, data in CATEGORIES.items():
+        score = sum(1 for trigger in data["triggers"] if _word_in_text(trigger.lower(), normalized))
+        if score:
+            scores[category] = score
+    if scores:
+        category = max(scores, key=scores.get)
+        confidence = min(scores[category] / 3.0, 1.0)
+    else:
+        category, confidence = "הרהורים", 0.3
+
+    topics = [
+        topic for topic, data in TOPICS.items()
+        if any(_word_in_text(keyword.lower(), normalized) for keyword in data["keywords"])
+    ]
+
+    positive = sum(1 for word in POSITIVE_WORDS if _word_in_text(word, normalized))
+    negative = sum(1 for word in NEGATIVE_WORDS if _word_in_text(word, normalized))
+    if positive > negative:
+        sentiment = "positive"
+    elif negative > positive:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+
+    return category, topics, sentiment, confidence
+
+
+def _corpus(size=400, seed=7):
+    rng = random.Random(seed)
+    phrases = (
+        [t for data in CATEGORIES.values() for t in data["triggers"]]
+        + [k for data in TOPICS.values() for k in data["keywords"]]
+        + POSITIVE_WORDS
+        + NEGATIVE_WORDS
+    )
+    texts = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(1, 12)):
+            if rng.random() < 0.5:
+                word = rng.choice(phrases)
+                # תחיליות וסיומות - אסור שיתאימו כמילה שלמה
+                roll = rng.random()
+                if roll < 0.15:
+                    word = "ו" + word
+                elif roll < 0.25:
+                    word = word + "ים"
+                elif roll < 0.35:
+                    word = word.upper()
+            else:
+                word = rng.choice(_FILLER)
+            words.append(word + rng.choice(["", "", ",", ".", "!", "?"]))
+        texts.append(rng.choice([" ", "  ", "\n"]).join(words))
+    return texts
+
+
+def _analysis(text: str):
+    result = nlp.analyze(text)
+    return result["category"], result["topics"], result["sentiment"], result["confidence"]
+
+
+def test_matches_per_phrase_search():
+    for text in _corpus():
+        assert _analysis(text) == _reference(text), text
+
+
+def test_overlapping_and_multi_word_phrases():
+    # "אין לי כוח" (ביטוי של כמה מילים) יחד עם ביטויים שחופפים לו
+    for text in ["אין לי כוח היום", "טוב לי, אבל אין לי כוח", "לא לשכוח לקנות חלב"]:
+        assert _analysis(text) == _reference(text)
+
+
+def test_whole_words_only():
+    category, topics, sentiment, _ = _analysis("ועבודהים טובים")
+    assert topics == []
+    assert sentiment == "neutral"
+
+
+def test_empty_text():
+    assert nlp.analyze("   ")["category"] == "הרהורים"
@@ -0,0 +1,75 @@
+"""
+בדיקות לשירות הניתוח (הרצה במקום / ב-pool של threads)
+"""
+
+import asyncio
+
+from nlp_analyzer import NLPAnalyzer
+from nlp_service import AnalysisService
+
+
+def _service(**kwargs):
+    return AnalysisService(analyzer=NLPAnalyzer(cache_size=0), **kwargs)
+
+
+def test_short_text_runs_inline_long_text_in_pool():
+    service = _service(inline_max_chars=20, max_workers=2)
+    short_text = "צריך לקנות חלב"
+    long_text = "פגישה עם הבוס על הפרויקט " * 5
+
+    async def scenario():
+        return await service.analyze(short_text), await service.analyze(long_text)
+
+    try:
+        short_result, long_result = asyncio.run(scenario())
+    finally:
+        service.shutdown()
+
+    assert short_result == service.analyzer.analyze(short_text)
+    assert long_result == service.analyzer.analyze(long_text)
+    stats = service.stats()
+    assert (stats["inline"], stats["offloaded"], stats["pending"]) == (1, 1, 0)
+
+
+def test_batch_in_pool_keeps_order():
+    service = _service(inline_max_chars=10, max_workers=2)
+    texts = ["פגישה עם הבוס מחר", "", "צריך לקנות חלב ולחם"]
+
+    try:
+        results = asyncio.run(service.batch_analyze(texts))
+    finally:
+        service.shutdown()
+
+    assert results == service.analyzer.batch_analyze(texts)
+    assert service.stats()["offloaded"] == 1
+
+
+def test_pending_is_bounded():
+    service = _service(inline_max_chars=0, max_workers=4, max_pending=2)
+    peak = 0
+    analyze = service.analyzer.analyze
+
+    def tracked(text, include_keywords=True):
+        nonlocal peak
+        peak = max(peak, service.stats()["pending"])
+        return analyze(text, include_keywords)
+
+    service.analyzer.analyze = tracked
+
+    async def scenario():
+        await asyncio.gather(*(service.analyze(f"מחשבה {i}") for i in range(10)))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        service.shutdown()
+
+    assert peak <= 2
+
+
+def test_shutdown_is_idempotent():
+    service = _service(inline_max_chars=0)
+    asyncio.run(service.analyze("טקסט"))
+
+    service.shutdown()
+    service.shutdown()
@@ -0,0 +1,78 @@
+"""
+בדיקות לאינדקס ה-n-gram של המילון: אותן התאמות כמו ביטוי רגולרי אחד
+על כל המילון, ומשקלים מה-config שמשפיעים על הציונים
+"""
+
+import random
+import re
+
+import nlp_analyzer
+from config import CATEGORIES, TOPICS
+from nlp_analyzer import NEGATIVE_WORDS, POSITIVE_WORDS, NLPAnalyzer, nlp
+
+_PHRASES = sorted(
+    {
+        phrase.lower()
+        for phrase in (
+            [t for data in CATEGORIES.values() for t in data["triggers"]]
+            + [k for data in TOPICS.values() for k in data["keywords"]]
+            + POSITIVE_WORDS
+            + NEGATIVE_WORDS
+        )
+    },
+    key=len,
+    reverse=True,
+)
+_PATTERN = re.compile(r'(?<!\w)(?=(' + "|".join(re.escape(p) for p in _PHRASES) + r')(?!\w))')
+
+
+def _regex_phrases(text: str):
+    """כל ביטויי המילון שמופיעים בטקסט, כולל ביטויים חופפים וקצרים יותר באותו מיקום"""
+    found = set()
+    for match in _PATTERN.finditer(text):
+        longest = match.group(1)
+        for end in (m.end() for m in re.finditer(r'\w(?!\w)', longest)):
+            if longest[:end] in _PHRASES:
+                found.add(longest[:end])
+    return found
+
+
+def _index_phrases(text: str):
+    return {phrase for phrase, *_ in nlp._match_lexicon(text)}
+
+
+def test_index_matches_regex():
+    rng = random.Random(11)
+    filler = ["היום", "ממש", "לי", "כוח", "אין", "טוב", "של", "x", "42"]
+    for _ in range(500):
+        words = [
+            rng.choice(_PHRASES) if rng.random() < 0.4 else rng.choice(filler)
+            for _ in range(rng.randint(1, 15))
+        ]
+        text = nlp._normalize_text(" ".join(w + rng.choice(["", "", ",", "!"]) for w in words))
+        assert _index_phrases(text) == _regex_phrases(text), text
+
+
+def test_multi_word_phrase_and_its_prefix():
+    text = nlp._normalize_text("אין לי כוח לזה")
+    assert {"אין לי כוח"} <= _index_phrases(text)
+    assert _index_phrases(text) == _regex_phrases(text)
+
+
+def test_phrase_broken_by_punctuation_is_not_matched():
+    assert "אין לי כוח" not in _index_phrases(nlp._normalize_text("אין לי, כוח"))
+
+
+def test_config_weights(monkeypatch):
+    categories = {
+        "א": {"emoji": "1", "triggers": ["אחת", "שתיים"]},
+        "ב": {"emoji": "2", "triggers": ["שלוש"], "weights": {"שלוש": 3}},
+    }
+    monkeypatch.setattr(nlp_analyzer, "CATEGORIES", categories)
+    analyzer = NLPAnalyzer()
+
+    result = analyzer.analyze("אחת שתיים שלוש")
+    assert result["category"] == "ב"
+    assert result["confidence"] == 1.0
+
+    assert analyzer.analyze("אחת שתיים")["category"] == "א"
@@ -0,0 +1,112 @@
+"""
+בדיקות לתיקון מוני המחשבות של המשתמשים (אצוות + compare-and-set)
+"""
+
+import asyncio
+import copy
+from types import SimpleNamespace
+
+from config import THOUGHT_STATUS
+from database import Database
+
+ACTIVE = THOUGHT_STATUS["ACTIVE"]
+ARCHIVED = THOUGHT_STATUS["ARCHIVED"]
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Users:
+    def __init__(self, users):
+        self.docs = {user["_id"]: user for user in users}
+
+    def find(self, filter_, projection=None, **kwargs):
+        return _Cursor([copy.deepcopy(user) for user in self.docs.values()])
+
+    async def bulk_write(self, requests, ordered=True):
+        modified = 0
+        for request in requests:
+            query, update = request._filter, request._doc
+            doc = self.docs[query["_id"]]
+            stats = doc.get("stats") or {}
+            if stats.get("total_thoughts") != query["stats.total_thoughts"]:
+                continue
+            if stats.get("by_status") != query["stats.by_status"]:
+                continue
+            doc.setdefault("stats", {})
+            doc["stats"]["total_thoughts"] = update["$set"]["stats.total_thoughts"]
+            doc["stats"]["by_status"] = update["$set"]["stats.by_status"]
+            modified += 1
+        return SimpleNamespace(modified_count=modified)
+
+
+class _Thoughts:
+    def __init__(self, counts, on_aggregate=None):
+        self.counts = counts
+        self.on_aggregate = on_aggregate
+        self.batches = []
+
+    def aggregate(self, pipeline):
+        user_ids = pipeline[0]["$match"]["user_id"]["$in"]
+        self.batches.append(list(user_ids))
+        if self.on_aggregate:
+            self.on_aggregate()
+        return _Cursor([
+            {"_id": {"user_id": user_id, "status": status}, "count": count}
+            for (user_id, status), count in self.counts.items()
+            if user_id in user_ids
+        ])
+
+
+def _user(user_id, total, by_status):
+    return {"_id": user_id, "user_id": user_id, "stats": {"total_thoughts": total, "by_status": by_status}}
+
+
+def _db(users, thoughts):
+    database = Database()
+    database.write_behind = None
+    database.users_collection = users
+    database.thoughts_collection = thoughts
+    return database
+
+
+def test_drift_is_fixed_in_batches():
+    users = _Users([
+        _user(1, 5, {ACTIVE: 5}),
+        _user(2, 3, {ACTIVE: 3}),
+        _user(3, 0, {}),
+    ])
+    thoughts = _Thoughts({(1, ACTIVE): 4, (1, ARCHIVED): 1, (2, ACTIVE): 3})
+
+    corrected = asyncio.run(_db(users, thoughts).reconcile_user_stats(batch_size=2))
+
+    assert corrected == 1
+    assert thoughts.batches == [[1, 2], [3]]
+    assert users.docs[1]["stats"] == {"total_thoughts": 4, "by_status": {ACTIVE: 4, ARCHIVED: 1}}
+    assert users.docs[2]["stats"] == {"total_thoughts": 3, "by_status": {ACTIVE: 3}}
+
+
+def test_concurrent_inc_is_not_overwritten():
+    users = _Users([_user(1, 5, {ACTIVE: 5})])
+
+    def concurrent_save():
+        # $inc ממחשבה חדשה שנכתבה בין קריאת המונים לכתיבה
+        users.docs[1]["stats"] = {"total_thoughts": 6, "by_status": {ACTIVE: 6}}
+
+    thoughts = _Thoughts({(1, ACTIVE): 4}, on_aggregate=concurrent_save)
+
+    corrected = asyncio.run(_db(users, thoughts).reconcile_user_stats())
+
+    assert corrected == 0
+    assert users.docs[1]["stats"] == {"total_thoughts": 6, "by_status": {ACTIVE: 6}}
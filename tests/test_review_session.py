@@ -0,0 +1,129 @@
+"""
+בדיקות לסשן סקירה שבועית עצל (שליפה בעמודים מסמן keyset)
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import bot as bot_module
+from bot import BrainDumpBot
+
+
+class _FakeDatabase:
+    """עמודי מחשבות מרשימה בזיכרון + תיעוד השליפות"""
+
+    def __init__(self, count):
+        self.thoughts = [
+            {
+                "_id": ObjectId(),
+                "raw_text": f"מחשבה {i}",
+                "created_at": datetime(2024, 1, 1),
+                "nlp_analysis": {"category": "רעיונות"},
+            }
+            for i in range(count)
+        ]
+        self.page_requests = []
+
+    async def get_thoughts_page(self, user_id, page_token=None, page_size=10, **kwargs):
+        self.page_requests.append((page_token, page_size, kwargs.get("from_date")))
+        start = int(page_token or 0)
+        end = start + page_size
+        next_token = str(end) if end < len(self.thoughts) else None
+        return self.thoughts[start:end], next_token
+
+    async def count_user_thoughts(self, user_id, from_date=None, **kwargs):
+        return len(self.thoughts)
+
+
+class _FakeQuery:
+    def __init__(self):
+        self.messages = []
+
+    async def edit_message_text(self, text, **kwargs):
+        self.messages.append(text)
+
+    async def answer(self, text=None, **kwargs):
+        pass
+
+
+def _setup(monkeypatch, count, page_size=5):
+    database = _FakeDatabase(count)
+    monkeypatch.setattr(bot_module, "db", database)
+    monkeypatch.setattr(bot_module, "WEEKLY_REVIEW_PAGE_SIZE", page_size)
+    return BrainDumpBot(), database, _FakeQuery()
+
+
+def test_session_fetches_one_page_at_a_time(monkeypatch):
+    brain_bot, database, query = _setup(monkeypatch, count=12)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        session = brain_bot.review_sessions[1]
+        assert len(database.page_requests) == 1
+        assert len(session["buffer"]) == 5
+
+        for _ in range(5):
+            await brain_bot._review_handle_decision(query, 1, "keep")
+        # העמוד השני נשלף רק כשהחלון התרוקן, מהסמן ובאותו חלון זמן
+        assert [token for token, _, _ in database.page_requests] == [None, "5"]
+        assert len({from_date for _, _, from_date in database.page_requests}) == 1
+        assert session["position"] == 5
+
+        for _ in range(7):
+            await brain_bot._review_handle_decision(query, 1, "skip")
+
+    asyncio.run(scenario())
+
+    assert [token for token, _, _ in database.page_requests] == [None, "5", "10"]
+    assert 1 not in brain_bot.review_sessions
+    assert "נשארו: 5" in query.messages[-1]
+
+
+def test_decision_for_stale_item_does_not_advance(monkeypatch):
+    brain_bot, database, query = _setup(monkeypatch, count=3)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await brain_bot._review_handle_decision(query, 1, "keep", thought_id=str(ObjectId()))
+
+    asyncio.run(scenario())
+
+    session = brain_bot.review_sessions[1]
+    assert session["position"] == 0
+    assert session["kept"] == 0
+
+
+def test_no_thoughts_no_session(monkeypatch):
+    brain_bot, database, query = _setup(monkeypatch, count=0)
+
+    asyncio.run(brain_bot._review_show_current(query, 1))
+
+    assert 1 not in brain_bot.review_sessions
+    assert query.messages == ["לא נמצאו מחשבות מהשבוע האחרון. תוסיפו כמה ונחזור לזה! 😊"]
+
+
+def test_weekly_review_command_only_counts(monkeypatch):
+    brain_bot, database, _ = _setup(monkeypatch, count=4)
+    monkeypatch.setattr(
+        bot_module, "reporter", SimpleNamespace(report_activity=lambda user_id: None)
+    )
+    # סשן ישן מסקירה קודמת
+    asyncio.run(brain_bot._review_show_current(_FakeQuery(), 1))
+    database.page_requests.clear()
+    replies = []
+
+    async def reply_text(text, **kwargs):
+        replies.append(text)
+
+    update = SimpleNamespace(
+        effective_user=SimpleNamespace(id=1),
+        message=SimpleNamespace(reply_text=reply_text),
+    )
+    asyncio.run(brain_bot.weekly_review_command(update, None))
+
+    assert database.page_requests == []
+    assert 1 not in brain_bot.review_sessions
+    assert "*4*" in replies[0]
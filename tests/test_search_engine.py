@@ -0,0 +1,81 @@
+"""
+בדיקות לאינדקס החיפוש ההפוך בזיכרון
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from config import PREVIEW_TEXT_LENGTH
+from search_engine import SearchIndex, term_variants
+
+
+def _thought(text, days_ago=0):
+    return {
+        "_id": ObjectId(),
+        "raw_text": text,
+        "created_at": datetime(2024, 1, 10) - timedelta(days=days_ago),
+        "nlp_analysis": {"category": "רעיונות", "keywords": ["x"]},
+    }
+
+
+def _load(index, user_id, thoughts):
+    index.load_user(user_id, [(thought, thought["raw_text"].split()) for thought in thoughts])
+
+
+def test_term_variants_strip_prefix_letters():
+    assert term_variants("ובבית") == ["ובבית", "בבית", "בית"]
+    assert term_variants("בית") == ["בית"]
+
+
+def test_prefix_and_hebrew_prefix_matching():
+    index = SearchIndex()
+    home = _thought("נשארתי בבית כל היום")
+    work = _thought("פגישה בעבודה מחר", days_ago=1)
+    _load(index, 1, [home, work])
+
+    assert [r["_id"] for r in index.search(1, ["בית"])] == [home["_id"]]
+    # מילה חלקית
+    assert [r["_id"] for r in index.search(1, ["פגי"])] == [work["_id"]]
+    # OR בין מילים - מחשבה שמתאימה ליותר מילים ראשונה
+    assert [r["_id"] for r in index.search(1, ["מחר", "בית", "היום"])] == [home["_id"], work["_id"]]
+    assert index.search(2, ["בית"]) == []
+
+
+def test_bulk_load_vocabulary_matches_incremental_adds():
+    thoughts = [_thought(f"מילה{i % 7} עוד{i % 3} שונה{i}") for i in range(50)]
+
+    bulk = SearchIndex()
+    _load(bulk, 1, thoughts)
+
+    incremental = SearchIndex()
+    _load(incremental, 1, [])
+    for thought in thoughts:
+        incremental.add(1, thought, thought["raw_text"].split())
+
+    bulk_index, incremental_index = bulk._users[1], incremental._users[1]
+    assert bulk_index.vocabulary == sorted(bulk_index.postings)
+    assert bulk_index.vocabulary == incremental_index.vocabulary
+    assert bulk_index.postings == incremental_index.postings
+
+
+def test_index_keeps_only_a_preview():
+    index = SearchIndex()
+    long_thought = _thought("ארוך " * 200)
+    _load(index, 1, [long_thought])
+
+    stored, _ = index._users[1].docs[str(long_thought["_id"])]
+    assert len(stored["raw_text"]) == PREVIEW_TEXT_LENGTH
+    assert stored["nlp_analysis"] == {"category": "רעיונות"}
+
+
+def test_remove_drops_unused_terms():
+    index = SearchIndex()
+    first, second = _thought("חלב ולחם"), _thought("חלב")
+    _load(index, 1, [first, second])
+
+    index.remove([str(first["_id"])], user_id=1)
+
+    assert index.search(1, ["לחם"]) == []
+    assert "לחם" not in index._users[1].vocabulary
+    assert [r["_id"] for r in index.search(1, ["חלב"])] == [second["_id"]]
@@ -0,0 +1,78 @@
+"""
+בדיקות לחתימות MinHash ולאינדקס ה-LSH של מחשבות דומות
+"""
+
+import pytest
+
+from similarity_engine import MinHasher, SimilarityIndex, text_shingles
+
+
+def _tokens(text: str):
+    return text.split()
+
+
+def _jaccard(left, right):
+    return len(left & right) / len(left | right)
+
+
+def test_shingles_skip_stop_words_and_keep_pairs():
+    shingles = text_shingles(["צריך", "לקנות", "חלב"])
+    assert {"צריך", "לקנות", "חלב", "צריך לקנות", "לקנות חלב"} <= shingles
+    assert text_shingles([]) == set()
+
+
+def test_signature_is_deterministic_and_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    assert hasher.signature([]) is None
+    assert hasher.signature({"א", "ב"}) == MinHasher(num_perm=256).signature({"ב", "א"})
+
+    left = {f"s{i}" for i in range(40)}
+    right = {f"s{i}" for i in range(20, 60)}
+    sig_left, sig_right = hasher.signature(left), hasher.signature(right)
+    estimate = sum(a == b for a, b in zip(sig_left, sig_right)) / 256
+
+    assert estimate == pytest.approx(_jaccard(left, right), abs=0.1)
+
+
+def test_query_finds_near_duplicates_only():
+    index = SimilarityIndex(num_perm=64, bands=32, max_users=4)
+    texts = {
+        "a": "צריך לקנות חלב ולחם בסופר מחר בבוקר",
+        "b": "צריך לקנות חלב ולחם בסופר מחר בערב",
+        "c": "רעיון לאפליקציה שמנהלת תקציב משפחתי חודשי",
+    }
+    index.load_user(1, [(tid, index.signature_for_tokens(_tokens(t))) for tid, t in texts.items()])
+
+    results = index.query(1, index.get_signature(1, "a"), exclude="a")
+    assert [thought_id for thought_id, _ in results] == ["b"]
+    assert 0 < results[0][1] < 1
+
+    # מחשבה שהוסרה (ארכוב) לא חוזרת בתוצאות
+    index.remove(["b"], user_id=1)
+    assert index.query(1, index.get_signature(1, "a"), exclude="a") == []
+    # משתמש שלא נטען - אין תוצאות
+    assert index.query(2, index.get_signature(1, "a")) == []
+
+
+def test_add_only_to_loaded_users_and_lru_eviction():
+    index = SimilarityIndex(num_perm=8, bands=4, max_users=2)
+    signature = index.signature_for_tokens(["מילה", "אחרת"])
+
+    index.add(1, "x", signature)
+    assert not index.is_user_loaded(1)
+
+    index.load_user(1, [])
+    index.add(1, "x", signature)
+    index.add(1, "bad", [1, 2, 3])
+    assert index.get_signature(1, "x") == tuple(signature)
+    assert index.get_signature(1, "bad") is None
+
+    index.load_user(2, [])
+    index.load_user(3, [])
+    assert not index.is_user_loaded(1)
+    assert index.is_user_loaded(2) and index.is_user_loaded(3)
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        SimilarityIndex(num_perm=10, bands=3)
@@ -0,0 +1,32 @@
+"""
+בדיקות למדידת זמני הניתוח לפי שלב
+"""
+
+from nlp_analyzer import NLPAnalyzer
+
+
+def _counts(analyzer):
+    return {stage: data["count"] for stage, data in analyzer.stage_timings()["stages"].items()}
+
+
+def test_total_covers_every_path_and_cache_hits_are_labelled():
+    analyzer = NLPAnalyzer(cache_size=8, artifact_path=None)
+    analyzer.set_timing_enabled(True)
+
+    analyzer.analyze("צריך לקנות חלב מחר")
+    analyzer.analyze("צריך לקנות חלב מחר")
+    analyzer.analyze("   ")
+
+    counts = _counts(analyzer)
+    assert counts["analyze_total"] == 3
+    assert counts["analyze_cache_hit"] == 1
+    assert counts["analyze_uncached"] == 1
+    assert counts["normalize_text"] == 2
+    assert counts["match_lexicon"] == 1
+
+
+def test_timing_disabled_records_nothing():
+    analyzer = NLPAnalyzer(cache_size=8, artifact_path=None)
+    analyzer.analyze("רעיון חדש")
+
+    assert analyzer.stage_timings() == {"enabled": False, "stages": {}}
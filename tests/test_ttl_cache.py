@@ -0,0 +1,190 @@
+"""
+בדיקות למטמון ה-read-through (AsyncTTLCache)
+"""
+
+import asyncio
+
+import pytest
+
+import database
+from database import AsyncTTLCache
+
+
+class _Loader:
+    """loader שסופר קריאות ויכול להמתין לאות לפני שהוא מחזיר ערך"""
+
+    def __init__(self, value=None):
+        self.value = value if value is not None else {"name": "דנה", "tags": ["a"]}
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return self.value
+
+
+def test_hit_after_miss():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    loader = _Loader()
+
+    async def scenario():
+        await cache.get(1, loader)
+        return await cache.get(1, loader)
+
+    assert asyncio.run(scenario()) == loader.value
+    assert loader.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    loader = _Loader()
+
+    async def scenario():
+        loader.release = asyncio.Event()
+        tasks = [asyncio.create_task(cache.get(1, loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+
+    assert loader.calls == 1
+    assert all(result == loader.value for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_returned_values_are_copies():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    loader = _Loader()
+
+    async def scenario():
+        first = await cache.get(1, loader)
+        first["tags"].append("changed")
+        return await cache.get(1, loader)
+
+    assert asyncio.run(scenario())["tags"] == ["a"]
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    cache = AsyncTTLCache(ttl_seconds=30, max_size=10)
+    loader = _Loader()
+
+    asyncio.run(cache.get(1, loader))
+    now[0] += 29
+    asyncio.run(cache.get(1, loader))
+    assert loader.calls == 1
+
+    now[0] += 2
+    asyncio.run(cache.get(1, loader))
+    assert loader.calls == 2
+
+
+def test_lru_bound():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=2)
+    loader = _Loader()
+
+    async def scenario():
+        await cache.get(1, loader)
+        await cache.get(2, loader)
+        # 1 בשימוש אחרון - 2 הוא שיפונה
+        await cache.get(1, loader)
+        await cache.get(3, loader)
+        await cache.get(1, loader)
+        await cache.get(2, loader)
+
+    asyncio.run(scenario())
+
+    assert loader.calls == 4
+    assert cache.stats()["size"] == 2
+
+
+def test_invalidate_during_load_does_not_store_stale_value():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    stale = _Loader({"version": 1})
+    fresh = _Loader({"version": 2})
+
+    async def scenario():
+        stale.release = asyncio.Event()
+        task = asyncio.create_task(cache.get(1, stale))
+        await asyncio.sleep(0)
+        # כתיבה במקביל לטעינה
+        cache.invalidate(1)
+        stale.release.set()
+        assert await task == {"version": 1}
+        return await cache.get(1, fresh)
+
+    assert asyncio.run(scenario()) == {"version": 2}
+    assert fresh.calls == 1
+
+
+def test_put_replaces_entry():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    loader = _Loader()
+    value = {"name": "נועה"}
+
+    async def scenario():
+        await cache.get(1, loader)
+        cache.put(1, value)
+        value["name"] = "changed"
+        return await cache.get(1, loader)
+
+    assert asyncio.run(scenario()) == {"name": "נועה"}
+    assert loader.calls == 1
+
+
+def test_loader_error_is_not_cached():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        raise RuntimeError("mongo down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.get(1, failing)
+        with pytest.raises(RuntimeError):
+            await cache.get(1, failing)
+
+    asyncio.run(scenario())
+
+    assert len(attempts) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_loader_error_reaches_coalesced_waiters():
+    cache = AsyncTTLCache(ttl_seconds=60, max_size=10)
+    release = None
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("mongo down")
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(cache.get(1, failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_zero_ttl_disables_caching():
+    cache = AsyncTTLCache(ttl_seconds=0, max_size=10)
+    loader = _Loader()
+
+    asyncio.run(cache.get(1, loader))
+    asyncio.run(cache.get(1, loader))
+
+    assert loader.calls == 2
+    assert cache.stats()["size"] == 0
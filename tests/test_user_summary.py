@@ -0,0 +1,127 @@
+"""
+בדיקות לעדכוני $inc של מסמך הסיכום המצטבר (קטגוריות/נושאים)
+"""
+
+import asyncio
+
+from bson import ObjectId
+
+from config import THOUGHT_STATUS
+from database import Database
+
+
+class _FakeCollection:
+    """אוסף בזיכרון שתומך ב-$inc עם מפתחות מנוקדים"""
+
+    def __init__(self, docs=None, fail=False):
+        self.docs = {doc["_id"]: doc for doc in (docs or [])}
+        self.fail = fail
+        self.updates = []
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        if self.fail:
+            raise RuntimeError("write failed")
+        self.updates.append((query, update))
+        doc = self.docs.get(query.get("_id"))
+        if doc is None:
+            return
+        for path, delta in update.get("$inc", {}).items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = target.get(leaf, 0) + delta
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **doc}
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+def _db(summaries):
+    database = Database()
+    database.write_behind = None
+    database.summaries_collection = summaries
+    database.users_collection = _FakeCollection()
+    return database
+
+
+def _analysis(category, topics=()):
+    return {"category": category, "topics": list(topics)}
+
+
+def test_inc_adds_and_removes_counts():
+    summaries = _FakeCollection([{"_id": 1, "categories": {"task": 1}, "topics": {}}])
+    database = _db(summaries)
+
+    async def scenario():
+        await database._inc_user_summary(
+            1, [_analysis("task", ["work", "work"]), _analysis("idea", ["work", "home"]), None], 1
+        )
+        await database._inc_user_summary(1, [_analysis("idea", ["home"])], -1)
+        return await database.get_user_summary(1)
+
+    summary = asyncio.run(scenario())
+
+    # נושא שחוזר באותה מחשבה נספר פעם אחת; ספירה שירדה ל-0 לא מוצגת
+    assert summary == {"categories": {"task": 2}, "topics": {"work": 2}}
+
+
+def test_missing_summary_is_rebuilt_from_thoughts():
+    summaries = _FakeCollection()
+    database = _db(summaries)
+
+    async def categories(user_id):
+        return {"task": 3}
+
+    async def topics(user_id):
+        return {"work": 2}
+
+    database.get_category_summary = categories
+    database.get_topic_summary = topics
+
+    summary = asyncio.run(database.get_user_summary(5))
+
+    assert summary == {"categories": {"task": 3}, "topics": {"work": 2}}
+    assert summaries.docs[5]["categories"] == {"task": 3}
+
+
+def test_inc_without_document_does_not_create_partial_summary():
+    summaries = _FakeCollection()
+    asyncio.run(_db(summaries)._inc_user_summary(1, [_analysis("task")], 1))
+
+    assert summaries.docs == {}
+
+
+def test_failed_inc_invalidates_summary():
+    summaries = _FakeCollection([{"_id": 1, "categories": {"task": 1}}], fail=True)
+    asyncio.run(_db(summaries)._inc_user_summary(1, [_analysis("task")], 1))
+
+    assert 1 not in summaries.docs
+
+
+def test_status_change_moves_counts_out_of_summary():
+    thought_id = ObjectId()
+    summaries = _FakeCollection([{"_id": 1, "categories": {"task": 2}, "topics": {"work": 1}}])
+    database = _db(summaries)
+
+    class _Thoughts:
+        async def find_one_and_update(self, query, update, projection=None):
+            return {
+                "_id": thought_id,
+                "user_id": 1,
+                "status": THOUGHT_STATUS["ACTIVE"],
+                "nlp_analysis": _analysis("task", ["work"]),
+            }
+
+    database.thoughts_collection = _Thoughts()
+
+    async def scenario():
+        assert await database.update_thought_status(str(thought_id), THOUGHT_STATUS["ARCHIVED"])
+        return await database.get_user_summary(1)
+
+    assert asyncio.run(scenario()) == {"categories": {"task": 1}, "topics": {}}
@@ -0,0 +1,197 @@
+"""
+בדיקות ליומן החלטות הארכוב בסקירה השבועית (כתיבה באצוות)
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import bot as bot_module
+from bot import BrainDumpBot
+
+
+class _FakeDatabase:
+    """עמודי מחשבות מרשימה בזיכרון + תיעוד קריאות archive_thoughts_bulk"""
+
+    def __init__(self, count):
+        self.thoughts = [
+            {
+                "_id": ObjectId(),
+                "raw_text": f"מחשבה {i}",
+                "created_at": datetime(2024, 1, 1),
+                "nlp_analysis": {"category": "רעיונות"},
+            }
+            for i in range(count)
+        ]
+        self.page_calls = 0
+        self.archive_calls = []
+
+    async def get_thoughts_page(self, user_id, page_token=None, page_size=10, **kwargs):
+        self.page_calls += 1
+        start = int(page_token or 0)
+        end = start + page_size
+        next_token = str(end) if end < len(self.thoughts) else None
+        return self.thoughts[start:end], next_token
+
+    async def archive_thoughts_bulk(self, user_id, thought_ids):
+        self.archive_calls.append(list(thought_ids))
+        return len(thought_ids)
+
+
+class _FakeQuery:
+    def __init__(self):
+        self.messages = []
+
+    async def edit_message_text(self, text, **kwargs):
+        self.messages.append(text)
+
+    async def answer(self, text=None, **kwargs):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bot_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _setup(monkeypatch, count, threshold=10, flush_seconds=60, page_size=5):
+    database = _FakeDatabase(count)
+    monkeypatch.setattr(bot_module, "db", database)
+    monkeypatch.setattr(bot_module, "WEEKLY_REVIEW_ARCHIVE_FLUSH_THRESHOLD", threshold)
+    monkeypatch.setattr(bot_module, "WEEKLY_REVIEW_ARCHIVE_FLUSH_SECONDS", flush_seconds)
+    monkeypatch.setattr(bot_module, "WEEKLY_REVIEW_PAGE_SIZE", page_size)
+    return BrainDumpBot(), database, _FakeQuery()
+
+
+async def _decide(brain_bot, query, action, times):
+    for _ in range(times):
+        await brain_bot._review_handle_decision(query, 1, action)
+
+
+def test_archives_flushed_at_threshold(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=25, threshold=10)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "archive", 9)
+        assert database.archive_calls == []
+        await _decide(brain_bot, query, "archive", 1)
+        assert [len(ids) for ids in database.archive_calls] == [10]
+        await _decide(brain_bot, query, "archive", 15)
+
+    asyncio.run(scenario())
+
+    # 10 בסף, 10 בסף, 5 בסיום הסקירה
+    assert [len(ids) for ids in database.archive_calls] == [10, 10, 5]
+    archived = [thought_id for ids in database.archive_calls for thought_id in ids]
+    assert archived == [str(t["_id"]) for t in database.thoughts]
+    assert 1 not in brain_bot.review_sessions
+    assert "ארכבו: 25" in query.messages[-1]
+    # הפריטים נשלפים בעמודים לפי הצורך
+    assert database.page_calls == 5
+
+
+def test_keep_and_skip_do_not_write(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=4)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "keep", 2)
+        await _decide(brain_bot, query, "skip", 2)
+
+    asyncio.run(scenario())
+
+    assert database.archive_calls == []
+    assert "נשארו: 2" in query.messages[-1]
+
+
+def test_pending_archives_flushed_after_timeout(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=10, threshold=100, flush_seconds=60)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "archive", 2)
+        clock[0] += 30
+        await _decide(brain_bot, query, "archive", 1)
+        assert database.archive_calls == []
+        # ההחלטה הבאה אחרי שעבר הזמן כותבת גם את כל מה שנצבר
+        clock[0] += 31
+        await _decide(brain_bot, query, "keep", 1)
+
+    asyncio.run(scenario())
+
+    assert [len(ids) for ids in database.archive_calls] == [3]
+    assert brain_bot.review_sessions[1]["pending_since"] is None
+
+
+def test_finish_flushes_pending(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=10)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "archive", 3)
+        await brain_bot._review_finish(query, 1)
+
+    asyncio.run(scenario())
+
+    assert [len(ids) for ids in database.archive_calls] == [3]
+    assert 1 not in brain_bot.review_sessions
+
+
+def test_sweep_flushes_waiting_decisions(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=10, threshold=100, flush_seconds=60)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "archive", 2)
+        await brain_bot._sweep_review_sessions()
+        assert database.archive_calls == []
+        clock[0] += 60
+        await brain_bot._sweep_review_sessions()
+
+    asyncio.run(scenario())
+
+    assert [len(ids) for ids in database.archive_calls] == [2]
+    # הסשן עדיין פעיל - רק ההחלטות נכתבו
+    assert 1 in brain_bot.review_sessions
+
+
+def test_sweep_drops_idle_sessions(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=10, threshold=100, flush_seconds=10 ** 6)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await _decide(brain_bot, query, "archive", 1)
+        clock[0] += bot_module.WEEKLY_REVIEW_SESSION_IDLE_MINUTES * 60
+        await brain_bot._sweep_review_sessions()
+
+    asyncio.run(scenario())
+
+    assert [len(ids) for ids in database.archive_calls] == [1]
+    assert 1 not in brain_bot.review_sessions
+
+
+def test_stale_button_does_not_archive(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=3)
+
+    async def scenario():
+        await brain_bot._review_show_current(query, 1)
+        await brain_bot._review_handle_decision(query, 1, "archive", thought_id=str(ObjectId()))
+        await brain_bot._review_finish(query, 1)
+
+    asyncio.run(scenario())
+
+    assert database.archive_calls == []
+
+
+def test_empty_week(monkeypatch, clock):
+    brain_bot, database, query = _setup(monkeypatch, count=0)
+
+    asyncio.run(brain_bot._review_show_current(query, 1))
+
+    assert 1 not in brain_bot.review_sessions
+    assert "לא נמצאו מחשבות" in query.messages[-1]
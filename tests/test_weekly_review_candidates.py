@@ -0,0 +1,85 @@
+"""
+בדיקות לשליפת המועמדים לתזכורת הסקירה השבועית (ספירה מקובצת + סמן משתמשים)
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from config import THOUGHT_STATUS
+from database import Database, weekly_review_counts_pipeline, weekly_review_users_filter
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Thoughts:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return _Cursor(self.rows)
+
+
+class _Users:
+    def __init__(self, users):
+        self.users = users
+        self.filters = []
+
+    def find(self, filter_, projection=None, **kwargs):
+        self.filters.append(filter_)
+        return _Cursor(self.users)
+
+
+def test_candidates_join_counts_with_users():
+    prompted_at = datetime(2024, 1, 1)
+    database = Database()
+    database.thoughts_collection = _Thoughts([{"_id": 1, "count": 4}, {"_id": 3, "count": 2}])
+    database.users_collection = _Users([
+        {"user_id": 1},
+        {"user_id": 2, "settings": {"weekly_review": {"last_prompted_at": prompted_at}}},
+    ])
+
+    async def collect():
+        return [row async for row in database.iter_weekly_review_candidates(36)]
+
+    rows = asyncio.run(collect())
+
+    # משתמש 3 ב-cooldown (לא הוחזר מ-users) - הספירה שלו לא נשלחת
+    assert rows == [
+        {"user_id": 1, "last_prompted_at": None, "recent_count": 4},
+        {"user_id": 2, "last_prompted_at": prompted_at, "recent_count": 0},
+    ]
+    # שאילתה אחת לכל אוסף
+    assert len(database.thoughts_collection.pipelines) == 1
+    assert len(database.users_collection.filters) == 1
+
+
+def test_counts_pipeline_has_no_per_user_lookup():
+    now = datetime(2024, 1, 8)
+    pipeline = weekly_review_counts_pipeline(days_back=7, now=now)
+
+    assert pipeline[0] == {"$match": {
+        "status": THOUGHT_STATUS["ACTIVE"],
+        "created_at": {"$gte": now - timedelta(days=7)},
+    }}
+    assert not any("$lookup" in stage for stage in pipeline)
+
+
+def test_users_filter_cooldown():
+    now = datetime(2024, 1, 8)
+    filter_ = weekly_review_users_filter(36, now=now)
+
+    assert {"settings.weekly_review.last_prompted_at": {"$lt": now - timedelta(hours=36)}} in filter_["$or"]
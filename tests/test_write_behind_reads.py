@@ -0,0 +1,171 @@
+"""
+בדיקות לכתיבת חוצץ ה-write-behind לפני פעולות שחייבות לראות מחשבות חדשות
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+import database as database_module
+from config import THOUGHT_STATUS
+from database import Database, WriteBehindBuffer
+from search_engine import SearchIndex
+
+ACTIVE = THOUGHT_STATUS["ACTIVE"]
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._rows)
+
+    def __aiter__(self):
+        self._iter = iter(self._rows)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Thoughts:
+    """אוסף מחשבות בזיכרון שרושם כל פעולה ביומן משותף"""
+
+    def __init__(self, events):
+        self.docs = {}
+        self.events = events
+
+    def _match(self, doc, query):
+        for field, condition in query.items():
+            value = doc.get(field)
+            if isinstance(condition, dict):
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+                if "$ne" in condition and value == condition["$ne"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        self.events.append("find")
+        return _Cursor([dict(doc) for doc in self.docs.values() if self._match(doc, query)])
+
+    async def find_one_and_update(self, query, update, projection=None):
+        self.events.append("find_one_and_update")
+        doc = next((doc for doc in self.docs.values() if self._match(doc, query)), None)
+        if doc is None:
+            return None
+        previous = dict(doc)
+        doc.update(update["$set"])
+        return previous
+
+    async def update_many(self, query, update):
+        self.events.append("update_many")
+        modified = 0
+        for doc in self.docs.values():
+            if self._match(doc, query):
+                doc.update(update["$set"])
+                modified += 1
+        return SimpleNamespace(modified_count=modified)
+
+
+def _db(monkeypatch):
+    monkeypatch.setattr(database_module, "search_index", SearchIndex())
+    events = []
+    database = Database()
+    thoughts = _Thoughts(events)
+    database.thoughts_collection = thoughts
+
+    async def flush_batch(batch):
+        events.append("flush")
+        for thought, _ in batch:
+            thoughts.docs[thought["_id"]] = thought
+
+    # מרווח ארוך - רק flush מפורש כותב בבדיקות
+    database.write_behind = WriteBehindBuffer(flush_batch, flush_interval_ms=60_000)
+
+    async def noop(*args, **kwargs):
+        return None
+
+    database._inc_user_counters = noop
+    database._inc_user_summary = noop
+    return database, events
+
+
+async def _buffer_thought(database, user_id, text="לקנות חלב"):
+    thought = {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "raw_text": text,
+        "status": ACTIVE,
+        "nlp_analysis": {"category": "משימות", "topics": []},
+    }
+    await database.write_behind.put((thought, []))
+    return thought
+
+
+def test_list_and_search_see_buffered_thoughts(monkeypatch):
+    database, events = _db(monkeypatch)
+
+    async def scenario():
+        thought = await _buffer_thought(database, 1)
+        listed = await database.get_user_thoughts(1)
+        found = await database.search_thoughts(1, "חלב")
+        await database.write_behind.close()
+        return thought, listed, found
+
+    thought, listed, found = asyncio.run(scenario())
+
+    assert events[:2] == ["flush", "find"]
+    assert [doc["_id"] for doc in listed] == [thought["_id"]]
+    assert [doc["_id"] for doc in found] == [thought["_id"]]
+
+
+def test_status_update_and_archive_apply_to_buffered_thoughts(monkeypatch):
+    database, events = _db(monkeypatch)
+
+    async def scenario():
+        first = await _buffer_thought(database, 1, "ראשונה")
+        updated = await database.update_thought_status(str(first["_id"]), THOUGHT_STATUS["TASK_CREATED"])
+        second = await _buffer_thought(database, 1, "שנייה")
+        archived = await database.archive_thoughts_bulk(1, [str(second["_id"])])
+        await database.write_behind.close()
+        return first, second, updated, archived
+
+    first, second, updated, archived = asyncio.run(scenario())
+
+    assert updated and archived == 1
+    assert events == ["flush", "find_one_and_update", "flush", "find", "update_many"]
+    docs = database.thoughts_collection.docs
+    assert docs[first["_id"]]["status"] == THOUGHT_STATUS["TASK_CREATED"]
+    assert docs[second["_id"]]["status"] == THOUGHT_STATUS["ARCHIVED"]
+
+
+def test_unrelated_buffered_thoughts_are_not_flushed(monkeypatch):
+    database, events = _db(monkeypatch)
+
+    async def scenario():
+        await _buffer_thought(database, 2)
+        await database.get_user_thoughts(1)
+        await database.update_thought_status(str(ObjectId()), THOUGHT_STATUS["ARCHIVED"])
+        pending = database.write_behind.has_pending(lambda item: True)
+        await database.write_behind.close()
+        return pending
+
+    assert asyncio.run(scenario())
+    assert events[:2] == ["find", "find_one_and_update"]
@@ -0,0 +1,213 @@
+"""
+בדיקת תוכניות השאילתות (explain) מול סט האינדקסים
+מריץ explain לכל צורת שאילתה של database.py ונכשל אם יש COLLSCAN או מיון בזיכרון
+
+שימוש:
+    python verify_indexes.py [--user-id 123456]
+
+שאילתה חדשה ב-database.py צריכה להתווסף גם לרשימה כאן.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+
+from config import CATEGORIES, TOPICS, THOUGHT_STATUS, WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS
+from database import (
+    EXPORT_STATUSES,
+    db,
+    weekly_review_counts_pipeline,
+    weekly_review_users_filter,
+)
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+ACTIVE = THOUGHT_STATUS["ACTIVE"]
+
+
+def query_shapes(user_id: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    פקודות explain לכל צורות השאילתות (שם, פקודת explain)
+    """
+    sample_ids = [ObjectId(), ObjectId()]
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    category = next(iter(CATEGORIES))
+    topic = next(iter(TOPICS))
+    newest_first = {"created_at": -1, "_id": -1}
+
+    def find(filter_: Dict, sort: Dict = None, projection: Dict = None, collection: str = "thoughts") -> Dict:
+        command = {"find": collection, "filter": filter_}
+        if sort:
+            command["sort"] = sort
+        if projection:
+            command["projection"] = projection
+        return command
+
+    def aggregate(pipeline: List[Dict], collection: str = "thoughts") -> Dict:
+        return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+    return [
+        ("get_user_thoughts", find({"user_id": user_id, "status": ACTIVE}, newest_first)),
+        ("get_user_thoughts(status=archived)", find({"user_id": user_id, "status": THOUGHT_STATUS["ARCHIVED"]}, newest_first)),
+        ("get_user_thoughts(category)", find({"user_id": user_id, "status": ACTIVE, "nlp_analysis.category": category}, newest_first)),
+        ("get_user_thoughts(topic)", find({"user_id": user_id, "status": ACTIVE, "nlp_analysis.topics": topic}, newest_first)),
+        ("get_thoughts_page(keyset)", find(
+            {"user_id": user_id, "status": ACTIVE, "$or": [
+                {"created_at": {"$lt": week_ago}},
+                {"created_at": week_ago, "_id": {"$lt": sample_ids[0]}},
+            ]},
+            newest_first,
+        )),
+        ("count_user_thoughts", {"count": "thoughts", "query": {"user_id": user_id, "status": ACTIVE, "created_at": {"$gte": week_ago}}}),
+        ("get_thoughts_by_date_range", find({"user_id": user_id, "status": ACTIVE, "created_at": {"$gte": week_ago}}, newest_first)),
+        ("iter_export_batches", find({"user_id": user_id, "status": {"$in": EXPORT_STATUSES}}, newest_first)),
+        ("count_export_thoughts", {"count": "thoughts", "query": {"user_id": user_id, "status": {"$in": EXPORT_STATUSES}}}),
+        ("get_thought_by_id", find({"_id": sample_ids[0], "user_id": user_id, "status": {"$ne": THOUGHT_STATUS["DELETED"]}})),
+        ("_ensure_search_index_loaded", find({"user_id": user_id, "status": ACTIVE}, projection={"raw_text": 1})),
+        ("_text_search_thoughts", find(
+            {"user_id": user_id, "status": ACTIVE, "$text": {"$search": "עבודה"}},
+            {"score": {"$meta": "textScore"}},
+            {"score": {"$meta": "textScore"}},
+        )),
+        ("get_category_summary", aggregate([
+            {"$match": {"user_id": user_id, "status": ACTIVE}},
+            {"$group": {"_id": "$nlp_analysis.category", "count": {"$sum": 1}}},
+        ])),
+        ("get_topic_summary", aggregate([
+            {"$match": {"user_id": user_id, "status": ACTIVE}},
+            {"$unwind": "$nlp_analysis.topics"},
+            {"$group": {"_id": "$nlp_analysis.topics", "count": {"$sum": 1}}},
+        ])),
+        ("reconcile_user_stats", aggregate([
+            {"$sort": {"user_id": 1, "status": 1}},
+            {"$group": {"_id": {"user_id": "$user_id", "status": "$status"}, "count": {"$sum": 1}}},
+        ])),
+        ("_ensure_similarity_index_loaded", find({"user_id": user_id, "status": ACTIVE, "minhash": {"$exists": True}}, projection={"minhash": 1})),
+        ("_deactivate_thoughts", find({"_id": {"$in": sample_ids}, "user_id": user_id, "status": ACTIVE})),
+        ("_deactivate_thoughts(update)", {"update": "thoughts", "updates": [{
+            "q": {"_id": {"$in": sample_ids}, "user_id": user_id, "status": ACTIVE},
+            "u": {"$set": {"status": THOUGHT_STATUS["ARCHIVED"]}},
+            "multi": True,
+        }]}),
+        ("update_thought_status", {"findAndModify": "thoughts",
+            "query": {"_id": sample_ids[0], "status": {"$ne": THOUGHT_STATUS["ARCHIVED"]}},
+            "update": {"$set": {"status": THOUGHT_STATUS["ARCHIVED"]}},
+        }),
+        ("delete_all_user_thoughts", {"delete": "thoughts", "deletes": [{"q": {"user_id": user_id}, "limit": 0}]}),
+        ("get_or_create_user", find({"user_id": user_id}, collection="users")),
+        ("list_all_user_ids", find({"user_id": {"$ne": None}}, projection={"user_id": 1, "_id": 0}, collection="users")),
+        ("iter_weekly_review_candidates(counts)", aggregate(weekly_review_counts_pipeline())),
+        ("iter_weekly_review_candidates(users)", find(
+            weekly_review_users_filter(WEEKLY_REVIEW_REPROMPT_COOLDOWN_HOURS),
+            projection={"_id": 0, "user_id": 1, "settings.weekly_review.last_prompted_at": 1},
+            collection="users"
+        )),
+        ("set_weekly_review_prompted", {"update": "users", "updates": [{
+            "q": {"user_id": user_id},
+            "u": {"$set": {"settings.weekly_review.last_prompted_at": datetime.utcnow()}},
+        }]}),
+    ]
+
+
+def _plan_stages(node: Any, stages: List[Dict]):
+    """איסוף כל השלבים בעץ תוכנית"""
+    if isinstance(node, dict):
+        if "stage" in node:
+            stages.append(node)
+        for key, value in node.items():
+            if key != "rejectedPlans":
+                _plan_stages(value, stages)
+    elif isinstance(node, list):
+        for item in node:
+            _plan_stages(item, stages)
+
+
+def _winning_plans(node: Any, plans: List[Any]):
+    """איסוף כל ה-winningPlan מתוך פלט explain (כולל shards ו-aggregate)"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "winningPlan":
+                plans.append(value)
+            elif key != "rejectedPlans":
+                _winning_plans(value, plans)
+    elif isinstance(node, list):
+        for item in node:
+            _winning_plans(item, plans)
+
+
+def plan_problems(explain: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Returns:
+        (שמות השלבים בתוכנית הנבחרת, בעיות שנמצאו)
+    """
+    plans: List[Any] = []
+    _winning_plans(explain, plans)
+
+    stages: List[Dict] = []
+    for plan in plans:
+        _plan_stages(plan, stages)
+
+    problems = []
+    for stage in stages:
+        name = stage["stage"]
+        if name == "COLLSCAN":
+            problems.append("COLLSCAN")
+        elif name == "SORT" and "$meta" not in str(stage.get("sortPattern", "")):
+            # מיון לפי textScore תמיד נעשה בזיכרון - מותר
+            problems.append(f"in-memory SORT {stage.get('sortPattern')}")
+
+    return [stage["stage"] for stage in stages], problems
+
+
+async def verify(user_id: int) -> bool:
+    if not await db.connect():
+        logger.error("❌ אין חיבור למונגו")
+        return False
+
+    try:
+        if user_id is None:
+            user = await db.users_collection.find_one({}, {"user_id": 1})
+            user_id = (user or {}).get("user_id", 0)
+
+        ok = True
+        for name, command in query_shapes(user_id):
+            explain = await db.db.command({"explain": command, "verbosity": "queryPlanner"})
+            stages, problems = plan_problems(explain)
+            plan = " → ".join(stages) or "?"
+            if problems:
+                ok = False
+                logger.error(f"❌ {name}: {', '.join(problems)} [{plan}]")
+            else:
+                logger.info(f"✅ {name}: {plan}")
+
+        return ok
+
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="בדיקת תוכניות שאילתה מול האינדקסים")
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        default=None,
+        help="מזהה משתמש לדוגמה (ברירת מחדל: משתמש כלשהו מהמסד)"
+    )
+    args = parser.parse_args()
+
+    if not asyncio.run(verify(args.user_id)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()